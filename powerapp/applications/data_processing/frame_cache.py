@@ -0,0 +1,19 @@
+import weakref
+import pandas as pd
+from typing import Any, Callable, Dict, Tuple
+
+# (id of frame, kind) -> structure built from that frame, dropped together with the frame
+_FRAME_CACHE: Dict[Tuple[int, str], Any] = {}
+
+
+def frame_cached(df: pd.DataFrame, kind: str, builder: Callable[[pd.DataFrame], Any]) -> Any:
+    """Returns the structure of the given kind built from 'df', calling builder(df) on first use. Structures are tied to the frame object, so frames must not be modified in place once cached; memoized LoadShedding frames are replaced rather than modified when their inputs change."""
+    key = (id(df), kind)
+    value = _FRAME_CACHE.get(key)
+
+    if value is None:
+        value = builder(df)
+        _FRAME_CACHE[key] = value
+        weakref.finalize(df, _FRAME_CACHE.pop, key, None)
+
+    return value
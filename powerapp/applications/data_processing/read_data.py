@@ -1,6 +1,8 @@
 import pandas as pd
 import re
 from io import BytesIO
+from typing import Optional
+from applications.data_processing.search_index import indexed_search
 
 
 def find_correct_header(uploaded_file, required_keywords, optional_groups=None):
@@ -109,13 +111,11 @@ def find_project_root(start_path, folder_name):
     )
 
 
-def df_search_filter(df: pd.DataFrame, query: str) -> pd.DataFrame:
+def df_search_filter(
+    df: pd.DataFrame, query: str, base: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """Rows of 'df' with a cell containing 'query' (case-insensitive, as str.contains). Pass the unfiltered frame as 'base' when 'df' is a filtered view of it so its search index is reused."""
     if not query:
         return df
 
-    df_str = df.astype(str)
-    mask = df_str.apply(
-        lambda row: row.str.contains(query, case=False, na=False).any(), axis=1
-    )
-
-    return df[mask]
+    return indexed_search(df, query, base)
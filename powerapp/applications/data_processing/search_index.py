@@ -0,0 +1,161 @@
+import re
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Dict, Optional
+from applications.data_processing.frame_cache import frame_cached
+
+# characters that make str.contains treat the query as a real pattern
+REGEX_CHARS = set(".^$*+?{}[]\\|()")
+NGRAM = 3
+QUERY_CACHE_SIZE = 32
+VERIFY_DIRECTLY = 256
+
+
+class SearchIndex:
+    """Keyword index over the cell text of a frame, matching df.astype(str) + str.contains(query, case=False) per cell.
+
+    Every distinct cell text is stored once in a vocabulary. Queries are matched against the vocabulary (through a trigram inverted index for plain keywords) and the hits are mapped back to rows through a vocabulary -> row posting list.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        n_rows, n_cols = df.shape
+        vocab_ids: Dict[str, int] = {}
+        codes = np.empty((n_rows, n_cols), dtype=np.int64)
+
+        for col_pos in range(n_cols):
+            col_codes, uniques = pd.factorize(df.iloc[:, col_pos].astype(str))
+            global_ids = np.array(
+                [vocab_ids.setdefault(text, len(vocab_ids)) for text in uniques],
+                dtype=np.int64,
+            )
+            codes[:, col_pos] = global_ids[col_codes] if len(global_ids) else col_codes
+
+        self.vocab = np.array(list(vocab_ids), dtype=object)
+        self.vocab_lower = [text.lower() for text in self.vocab]
+        self.columns = df.columns
+        self.codes = codes
+        self.n_rows = n_rows
+
+        # vocabulary id -> rows holding it (CSR layout)
+        flat = codes.ravel()
+        order = np.argsort(flat, kind="stable")
+        self.posting_rows = order // max(n_cols, 1)
+        self.posting_ptr = np.searchsorted(flat[order], np.arange(len(self.vocab) + 1))
+
+        grams: Dict[str, list] = {}
+        for vocab_id, text in enumerate(self.vocab_lower):
+            for gram in {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}:
+                grams.setdefault(gram, []).append(vocab_id)
+        self.grams = {gram: np.array(ids, dtype=np.int64) for gram, ids in grams.items()}
+
+        self._queries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def vocab_matches(self, query: str) -> np.ndarray:
+        """Returns the ids of the vocabulary entries containing 'query' (case-insensitive). Recent queries are answered from a small cache."""
+        hits = self._queries.get(query)
+        if hits is not None:
+            self._queries.move_to_end(query)
+            return hits
+
+        hits = self._match(query)
+
+        self._queries[query] = hits
+        if len(self._queries) > QUERY_CACHE_SIZE:
+            self._queries.popitem(last=False)
+
+        return hits
+
+    def _match(self, query: str) -> np.ndarray:
+        if REGEX_CHARS.intersection(query):
+            try:
+                pattern = re.compile(query, flags=re.IGNORECASE)
+            except re.error:
+                # not a valid pattern, search it as plain text
+                pattern = None
+
+            if pattern is not None:
+                return np.array(
+                    [i for i, text in enumerate(self.vocab) if pattern.search(text)],
+                    dtype=np.int64,
+                )
+
+        needle = query.lower()
+
+        if len(needle) < NGRAM:
+            candidates = range(len(self.vocab_lower))
+        else:
+            postings = []
+            for gram in {needle[i:i + NGRAM] for i in range(len(needle) - NGRAM + 1)}:
+                ids = self.grams.get(gram)
+                if ids is None:
+                    return np.empty(0, dtype=np.int64)
+                postings.append(ids)
+
+            # start from the rarest gram; once few candidates are left the
+            # substring check below is cheaper than more intersections
+            postings.sort(key=len)
+            candidates = postings[0]
+            for ids in postings[1:]:
+                if len(candidates) <= VERIFY_DIRECTLY:
+                    break
+                candidates = np.intersect1d(candidates, ids, assume_unique=True)
+
+        return np.array(
+            [i for i in candidates if needle in self.vocab_lower[i]], dtype=np.int64
+        )
+
+    def mask(
+        self,
+        query: str,
+        rows: Optional[np.ndarray] = None,
+        columns: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Boolean mask for 'query' over all indexed rows, or over the given row / column positions only."""
+        hits = self.vocab_matches(query)
+
+        if rows is not None or columns is not None:
+            is_hit = np.zeros(len(self.vocab), dtype=bool)
+            is_hit[hits] = True
+            codes = self.codes if rows is None else self.codes[rows]
+            if columns is not None:
+                codes = codes[:, columns]
+            return is_hit[codes].any(axis=1)
+
+        starts = self.posting_ptr[hits]
+        lengths = self.posting_ptr[hits + 1] - starts
+
+        # expand the posting ranges of all hits into one row array
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        row_hits = self.posting_rows[offsets + np.arange(lengths.sum())]
+
+        row_mask = np.zeros(self.n_rows, dtype=bool)
+        row_mask[row_hits] = True
+
+        return row_mask
+
+
+def search_index(df: pd.DataFrame) -> SearchIndex:
+    """Returns the index of 'df', building it on first use."""
+    return frame_cached(df, "search_index", SearchIndex)
+
+
+def indexed_search(
+    df: pd.DataFrame, query: str, base: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """Rows of 'df' containing 'query' in any cell.
+
+    When 'df' is a row/column subset of 'base' with the same cell values (e.g. a filtered view of a memoized frame), the index of 'base' is reused instead of indexing 'df'. Otherwise 'df' itself is indexed.
+    """
+    if (
+        base is not None
+        and base is not df
+        and base.index.is_unique
+        and base.columns.is_unique
+    ):
+        rows = base.index.get_indexer(df.index)
+        columns = base.columns.get_indexer(df.columns)
+        if (rows >= 0).all() and (columns >= 0).all():
+            return df[search_index(base).mask(query, rows, columns)]
+
+    return df[search_index(df).mask(query)]
@@ -1,48 +1,25 @@
-import os
-import sys
-from warnings import filters
 import pandas as pd
 import numpy as np
-import streamlit as st
 from functools import reduce
-from typing import Optional, Dict, List
+from typing import Dict, List, Tuple
 
-from applications.load_shedding.helper import columns_list
-from pages.load_shedding.helper import join_unique_non_empty
+from applications.load_shedding.helper import (
+    groupby_agg,
+    UNIQUE_JOIN,
+)
 from applications.load_shedding.ufls_setting import UFLS_SETTING
 from applications.load_shedding.uvls_setting import UVLS_SETTING
-
-
-def read_ls_data(file_path: str) -> Optional[pd.DataFrame]:
-    try:
-        df = pd.read_excel(file_path)
-
-        # Clean column names
-        df.columns = (
-            df.columns.astype(str).str.replace(r"[\"']", "", regex=True).str.strip()
-        )
-
-        # Clean only non-null string values in object columns
-        obj_cols = df.select_dtypes(include="object").columns
-        for col in obj_cols:
-            df[col] = df[col].str.strip().str.replace(r"[\"']", "", regex=True)
-
-        return df
-
-    except FileNotFoundError:
-        log_error(f"File not found: {file_path}")
-    except Exception as e:
-        log_error(f"Error processing file '{file_path}': {e}")
-
-    return None
-
-
-def log_error(message: str) -> None:
-    print(f"[ERROR] {message}", file=sys.stderr)
-
-
-def get_path(filename: str, data_dir: str = "data") -> str:
-    return os.path.join(data_dir, filename)
+from applications.load_shedding.reference_data import (
+    get_path,
+    load_reference_data,
+    load_reference_batch,
+)
+from applications.load_shedding.derivation import DerivationGraph, derived
+from applications.load_shedding.filter_index import (
+    active_filters,
+    filter_index,
+    take_rows,
+)
 
 
 def loadshedding_masterlist(ls_df, scheme):
@@ -57,37 +34,103 @@ def loadshedding_masterlist(ls_df, scheme):
     return ls_assignment
 
 
-class LoadShedding:
-    def __init__(self, load_df: pd.DataFrame, filedir: str = "data") -> None:
+class LoadShedding(DerivationGraph):
+    # input attribute -> reference workbook in the data dir
+    REFERENCE_FILES = {
+        "ufls_assignment": "assignment_ufls.xlsx",
+        "uvls_assignment": "assignment_uvls.xlsx",
+        "emls_assignment": "assignment_emls.xlsx",
+        # delivery_point.xlsx = one-to-one mirror to load profile file to match load with assignment. to update reqularly as system updated
+        "delivery_point": "delivery_point.xlsx",
+        "pocket_assign": "pocket_assign.xlsx",
+        # rly_pocket.xlsx = associted breakers where the pocket loads are disconnected
+        "rly_pocket": "rly_pocket.xlsx",
+        # rly_lvcb.xlsx = UFLS & UVLS relay bay assignment installed for incomer (LVCB)
+        "rly_incomer": "rly_incomer.xlsx",
+        "flaglist": "flaglist.xlsx",
+        "substations": "substations.xlsx",
+    }
+    TRACKED_INPUTS = ("load_profile",) + tuple(REFERENCE_FILES)
+
+    def __init__(
+        self,
+        load_df: pd.DataFrame,
+        filedir: str = "data",
+        preload: bool = False,
+        parallel: bool = False,
+    ) -> None:
         self.load_profile = load_df
+        self.filedir = filedir
 
         self.ufls_filepath = get_path("assignment_ufls.xlsx", filedir)
         self.uvls_filepath = get_path("assignment_uvls.xlsx", filedir)
         self.emls_filepath = get_path("assignment_emls.xlsx", filedir)
 
-        self.ufls_assignment = read_ls_data(self.ufls_filepath)
-        self.uvls_assignment = read_ls_data(self.uvls_filepath)
-        self.emls_assignment = read_ls_data(self.emls_filepath)
         self.ufls_setting = pd.DataFrame(UFLS_SETTING)
         self.uvls_setting = pd.DataFrame(UVLS_SETTING)
 
-        # delivery_point.xlsx = one-to-one mirror to load profile file to match load with assignment. to update reqularly as system updated
-        self.delivery_point = read_ls_data(get_path("delivery_point.xlsx", filedir))
+        # reference workbooks are loaded on first access, see __getattr__
+        if preload:
+            self.preload(parallel=parallel)
 
-        self.pocket_assign = read_ls_data(get_path("pocket_assign.xlsx", filedir))
+        self.LOADSHED_SCHEME = ["UFLS", "UVLS", "EMLS"]
 
-        # rly_pocket.xlsx = associted breakers where the pocket loads are disconnected
-        self.rly_pocket = read_ls_data(get_path("rly_pocket.xlsx", filedir))
+    def __getattr__(self, name: str):
+        # only reached when the attribute is not set yet, i.e. a dataset that was never touched
+        if name in type(self).REFERENCE_FILES:
+            df = load_reference_data(self.dataset_path(name))
+            setattr(self, name, df)
+            return df
 
-        # rly_lvcb.xlsx = UFLS & UVLS relay bay assignment installed for incomer (LVCB)
-        self.rly_incomer = read_ls_data(get_path("rly_incomer.xlsx", filedir))
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
-        self.flaglist = read_ls_data(get_path("flaglist.xlsx", filedir))
+    def dataset_path(self, name: str) -> str:
+        return get_path(self.REFERENCE_FILES[name], self.filedir)
 
-        self.substations = read_ls_data(get_path("substations.xlsx", filedir))
+    def _load_datasets(self, names: List[str], parallel: bool) -> None:
+        file_paths = {name: self.dataset_path(name) for name in names}
 
-        self.LOADSHED_SCHEME = ["UFLS", "UVLS", "EMLS"]
+        if parallel:
+            frames = load_reference_batch(file_paths)
+        else:
+            frames = {
+                name: load_reference_data(file_path)
+                for name, file_path in file_paths.items()
+            }
 
+        for name, df in frames.items():
+            setattr(self, name, df)
+
+    def refresh(self, parallel: bool = False) -> None:
+        """Re-syncs the resident reference workbooks with the process-wide store. Unchanged files hand back the same frame, so only the derived nodes downstream of a modified workbook are recomputed. Datasets not touched yet stay unloaded."""
+        resident = [name for name in self.REFERENCE_FILES if name in self.__dict__]
+        self._load_datasets(resident, parallel)
+
+    def preload(self, parallel: bool = False) -> None:
+        """Loads every reference workbook up front, e.g. to warm the store before the first render. With 'parallel', workbooks missing from the store are parsed concurrently in a process pool."""
+        self._load_datasets(list(self.REFERENCE_FILES), parallel)
+
+    def resident_datasets(self) -> pd.DataFrame:
+        """Lists the reference datasets, whether this object has loaded them, and their in-memory size. Loaded frames are shared with other sessions through the process-wide store."""
+        rows = []
+        for name, filename in self.REFERENCE_FILES.items():
+            df = self.__dict__.get(name)
+            resident = name in self.__dict__ and df is not None
+            rows.append(
+                {
+                    "dataset": name,
+                    "file": filename,
+                    "resident": resident,
+                    "rows": len(df) if resident else 0,
+                    "memory (MB)": (
+                        df.memory_usage(deep=True).sum() / 1e6 if resident else 0.0
+                    ),
+                }
+            )
+
+        return pd.DataFrame(rows)
+
+    @derived("substations")
     def subs_meta(self):
         if self.substations is None:
             return pd.DataFrame()
@@ -113,6 +156,7 @@ class LoadShedding:
 
         return df
 
+    @derived("load_profile", "subs_meta")
     def loadprofile_df(self):
         if self.load_profile is None or self.subs_meta().empty:
             return pd.DataFrame()
@@ -148,6 +192,7 @@ class LoadShedding:
 
         return df
 
+    @derived("loadprofile_df")
     def profile_metadata(self):
         df_raw = self.loadprofile_df()
 
@@ -171,13 +216,20 @@ class LoadShedding:
 
         return df_unique
 
-    def zone_load_profile(self, zone):
+    @derived("loadprofile_df")
+    def zone_loads(self) -> pd.Series:
         loadprofile_df = self.loadprofile_df()
-        zone_df = loadprofile_df.loc[loadprofile_df["zone"] == zone]
-        zone_mw = zone_df["Load (MW)"].sum()
+        if loadprofile_df.empty:
+            return pd.Series(dtype=float)
+
+        return loadprofile_df.groupby("zone")["Load (MW)"].sum()
+
+    def zone_load_profile(self, zone):
+        zone_mw = self.zone_loads().get(zone, 0)
 
         return zone_mw
 
+    @derived("delivery_point", "load_profile", "flaglist", "profile_metadata")
     def load_dp(self) -> pd.DataFrame:
         if (
             self.delivery_point is None
@@ -221,13 +273,17 @@ class LoadShedding:
 
         return df_flaglist
 
+    @derived("load_dp")
     def flaglist_subs(self):
-        if self.load_dp().empty:
+        load_dp = self.load_dp()
+
+        if load_dp.empty:
             return pd.DataFrame()
 
-        flaglist = self.load_dp().loc[self.load_dp()["critical_list"].notna()].copy()
+        flaglist = load_dp.loc[load_dp["critical_list"].notna()].copy()
 
-        flaglist_grp = flaglist.groupby(
+        flaglist_grp = groupby_agg(
+            flaglist,
             [
                 "local_trip_id",
                 "mnemonic",
@@ -241,19 +297,18 @@ class LoadShedding:
                 "short_text",
                 "long_text",
             ],
-            as_index=False,
-            dropna=False,
-        ).agg(
             {
                 "Load (MW)": "sum",
-                "feeder_id": lambda x: ", ".join(x.astype(str).unique()),
-                "breaker_id": lambda x: ", ".join(x.astype(str).unique()),
-            }
+                "feeder_id": UNIQUE_JOIN,
+                "breaker_id": UNIQUE_JOIN,
+            },
+            as_index=False,
         )
         flaglist_grp["critical_list"] = flaglist_grp["critical_list"].str.upper()
 
         return flaglist_grp
 
+    @derived("pocket_assign", "load_dp")
     def load_pocket(self) -> pd.DataFrame:
         load_dp = self.load_dp()
 
@@ -264,6 +319,7 @@ class LoadShedding:
 
         return df
 
+    @derived("load_dp", "load_pocket")
     def assignment_loadquantum(self) -> pd.DataFrame:
         load_dp = self.load_dp()
         load_pocket = self.load_pocket()
@@ -287,6 +343,7 @@ class LoadShedding:
 
         return df
 
+    @derived("rly_pocket", "profile_metadata")
     def pocket_relay(self):
         if self.rly_pocket is None or self.profile_metadata().empty:
             return pd.DataFrame()
@@ -313,6 +370,7 @@ class LoadShedding:
 
         return df
 
+    @derived("rly_incomer", "load_dp")
     def incomer_relay(self):
         if self.rly_incomer is None or self.load_dp().empty:
             return pd.DataFrame()
@@ -322,6 +380,12 @@ class LoadShedding:
 
         return df
 
+    @derived(
+        "ufls_assignment",
+        "uvls_assignment",
+        "emls_assignment",
+        "assignment_loadquantum",
+    )
     def ls_assignment_masterlist(self):
         ufls = loadshedding_masterlist(self.ufls_assignment, "UFLS")
         uvls = loadshedding_masterlist(self.uvls_assignment, "UVLS")
@@ -351,6 +415,79 @@ class LoadShedding:
 
         return df
 
+    @derived("ls_assignment_masterlist")
+    def searchable_masterlist(self) -> pd.DataFrame:
+        """The masterlist with 'nan' / '#na' stages blanked the way filtered_data presents them, so the search index of this frame can serve any filtered view of it."""
+        df = self.ls_assignment_masterlist().copy()
+
+        scheme_cols = [
+            col for col in df.columns
+            if any(keyword in col for keyword in self.LOADSHED_SCHEME)
+        ]
+        df[scheme_cols] = df[scheme_cols].mask(lambda df: df.isin(["nan", "#na"]))
+
+        return df
+
+    @derived("ls_assignment_masterlist", "incomer_relay")
+    def potential_ls_candidate(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Automatic load shedding candidates: the UFLS/UVLS masterlist joined with the incomer relays, one row per assignment/feeder group. Returns (raw, with_crit, without_crit), split on whether the assignment touches a critical substation."""
+        masterlist = self.ls_assignment_masterlist()
+        # node results are shared, dp_type is added on a copy
+        incomer = self.incomer_relay().copy()
+
+        id_col = incomer["local_trip_id"].fillna("na").astype(str)
+        conditions = [
+            id_col.str.contains("132|275"),
+            id_col.str.contains("230"),
+            id_col.str.contains("11|22|33"),
+            id_col.str.contains("na"),
+        ]
+        choices = ["LPC", "Interconnector", "Local_Load", ""]
+
+        incomer["dp_type"] = np.select(conditions, choices, default="Pocket")
+
+        ls_cols = [
+            col for col in masterlist.columns
+            if str(col).lower().startswith(tuple(k.lower() for k in self.LOADSHED_SCHEME))
+        ]
+
+        auto_ls_cols = [
+            col for col in ls_cols if not str(col).lower().startswith('emls')
+        ]
+
+        auto_ls_master = masterlist.dropna(subset=auto_ls_cols, how="all")
+        required_cols = ["assignment_id", "local_trip_id", "state", "zone",
+                         "gm_subzone", "mnemonic", "critical_list", "dp_type", 'kV', 'breaker_id', 'substation_name', 'coordinate']
+
+        df_all = pd.merge(
+            auto_ls_master,
+            incomer,
+            on=required_cols + ["Load (MW)", "feeder_id"],
+            how="outer"
+        )
+
+        df_raw_cand = groupby_agg(
+            df_all,
+            ls_cols + required_cols,
+            {
+                "Load (MW)": "sum",
+                "feeder_id": UNIQUE_JOIN,
+            },
+            as_index=False,
+        )
+
+        critical_list = df_raw_cand.loc[df_raw_cand["critical_list"].notna()]
+        critical_assign_ids = critical_list["assignment_id"].unique().tolist()
+
+        cand_with_crit = df_raw_cand.loc[df_raw_cand["assignment_id"].isin(
+            critical_assign_ids)]
+
+        cand_without_crit = df_raw_cand.loc[
+            ~df_raw_cand["assignment_id"].isin(critical_assign_ids)
+        ]
+
+        return df_raw_cand, cand_with_crit, cand_without_crit
+
     def filtered_data(self, filters: Dict, df: pd.DataFrame) -> pd.DataFrame:
         """Applies filtering on the loadshedding assignments based on the provided filter criteria in the 'filters' dictionary. It merges the load shedding assignments with the substation metadata for enriched filtering."""
 
@@ -360,25 +497,21 @@ class LoadShedding:
         if df is None or df.empty or scheme is None:
             return pd.DataFrame()
 
-        filtered_df = df.copy()
         selected_inp_scheme = filters.get("scheme", [])
         selected_ls_cols_dict = {}
 
-        available_scheme = set(selected_inp_scheme).intersection(
-            set(filtered_df.columns)
-        )
+        available_scheme = set(selected_inp_scheme).intersection(set(df.columns))
 
         if len(available_scheme) == 0:
             return pd.DataFrame()
 
         drop_cols = [
             col
-            for col in filtered_df.columns
+            for col in df.columns
             if any(keyword in col for keyword in self.LOADSHED_SCHEME)
             and col not in available_scheme
         ]
-
-        filtered_df = filtered_df.drop(columns=drop_cols, axis=1, errors="ignore")
+        keep_cols = [col for col in df.columns if col not in drop_cols]
 
         for ls_review in available_scheme:
             selected_ls_cols_dict[ls_review] = op_stage
@@ -386,22 +519,23 @@ class LoadShedding:
         filters.update(selected_ls_cols_dict)
 
         ## Data Filteration #######
-        for col, selected in filters.items():
-            if selected is None or selected == [] or col not in filtered_df.columns:
-                continue
-            if isinstance(selected, (list, tuple, set)):
-                filtered_df = filtered_df[filtered_df[col].isin(selected)]
-            else:
-                filtered_df = filtered_df[filtered_df[col] == selected]
-
-        if filtered_df.empty:
+        # rows are resolved on the filter index of 'df' and materialized once at the end
+        index = filter_index(df)
+        rows = index.rows(active_filters(filters, pd.Index(keep_cols)))
+
+        if len(rows) == 0:
             return pd.DataFrame()
 
         available_scheme_list = list(available_scheme)
-        filtered_df[available_scheme_list] = filtered_df[available_scheme_list].mask(
-            lambda df: df.isin(["nan", "#na"])
+        rows = rows[~index.all_in(rows, available_scheme_list, ["nan", "#na"])]
+
+        filtered_df = take_rows(df, rows, keep_cols)
+        filtered_df = filtered_df.assign(
+            **{
+                col: filtered_df[col].mask(filtered_df[col].isin(["nan", "#na"]))
+                for col in available_scheme_list
+            }
         )
-        filtered_df = filtered_df.dropna(subset=available_scheme_list, how="all")
 
         return filtered_df
 
@@ -409,17 +543,9 @@ class LoadShedding:
         if df is None or df.empty:
             return pd.DataFrame()
 
-        data = df.copy()
-
-        for col, selected in filters.items():
-            if selected is None or selected == [] or col not in data.columns:
-                continue
-            if isinstance(selected, (list, tuple, set)):
-                data = data[data[col].isin(selected)]
-            else:
-                data = data[data[col] == selected]
+        rows = filter_index(df).rows(active_filters(filters, df.columns))
 
-        if data.empty:
+        if len(rows) == 0:
             return pd.DataFrame()
 
-        return data
+        return take_rows(df, rows)
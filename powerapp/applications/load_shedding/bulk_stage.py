@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from applications.load_shedding.filter_index import ColumnPostings, active_filters
+
+BULK_ACTIONS = ["set", "shift", "clear", "swap"]
+NO_STAGE = -1
+OUTSIDE_SCHEME = -2
+
+
+class BulkStageEdit:
+    """Selects simulator assignments by their candidate attributes and current stage, and moves every selected assignment in one step.
+
+    Attribute columns (zone, dp_type, kV, ...) are matched on the candidate rows: an assignment passes when any of its feeders holds one of the selected values. Stages are handled as positions in 'stages', so a shift moves every assignment by the same number of stages at once.
+    """
+
+    def __init__(
+        self,
+        raw_candidate: pd.DataFrame,
+        assignments: Iterable,
+        stages: List,
+        assignment_col: str = "assignment_id",
+        critical_col: str = "critical_list",
+    ):
+        self.raw_candidate = raw_candidate
+        self.assignments = pd.Index(assignments)
+        self.stages = pd.Index(stages)
+
+        # candidate rows of assignments outside the simulator are never selected
+        assign_codes = self.assignments.get_indexer(raw_candidate[assignment_col])
+        self._known = assign_codes >= 0
+        self._assign_codes = assign_codes[self._known]
+        self._postings: Dict[str, ColumnPostings] = {}
+
+        critical = raw_candidate[critical_col]
+        critical_row = (
+            critical.notna() & ~critical.astype(str).str.strip().isin(["", "nan", "NaN"])
+        ).to_numpy()[self._known]
+        self.critical = self._any_row(critical_row)
+
+    def _any_row(self, row_hit: np.ndarray) -> np.ndarray:
+        hit = np.zeros(len(self.assignments), dtype=bool)
+        hit[self._assign_codes[row_hit]] = True
+        return hit
+
+    def column(self, col: str) -> ColumnPostings:
+        postings = self._postings.get(col)
+        if postings is None:
+            postings = ColumnPostings(self.raw_candidate[col][self._known].reset_index(drop=True))
+            self._postings[col] = postings
+        return postings
+
+    def stage_codes(self, current) -> np.ndarray:
+        """Position of every current stage in 'stages': -1 for no stage, -2 for a stage outside the scheme."""
+        current = pd.Index(current, dtype=object)
+        codes = self.stages.get_indexer(current)
+        codes[(codes < 0) & current.notna()] = OUTSIDE_SCHEME
+        return codes
+
+    def mask(
+        self,
+        current,
+        filters: Optional[Dict[str, Any]] = None,
+        stage: Any = None,
+        critical: Optional[bool] = None,
+    ) -> np.ndarray:
+        """Boolean per assignment passing every filter. 'filters' maps candidate columns to selected values (empty selections are ignored), 'stage' selects current stages (None in a list selects assignments without one) and 'critical' keeps only critical (True) or non-critical (False) assignments."""
+        mask = np.ones(len(self.assignments), dtype=bool)
+
+        for col, selected in active_filters(filters or {}, self.raw_candidate.columns):
+            postings = self.column(col)
+            mask &= self._any_row(postings.selected(selected)[postings.codes])
+
+        if not (stage is None or stage == []):
+            selected = pd.Index(list(stage) if isinstance(stage, (list, tuple, set)) else [stage], dtype=object)
+            wanted = self.stages.get_indexer(selected[selected.notna()])
+            wanted = wanted[wanted >= 0]
+            if selected.isna().any():
+                wanted = np.append(wanted, NO_STAGE)
+            mask &= np.isin(self.stage_codes(current), wanted)
+
+        if critical is not None:
+            mask &= self.critical == critical
+
+        return mask
+
+    def apply(
+        self,
+        current,
+        mask: np.ndarray,
+        action: str,
+        stage: Any = None,
+        other: Any = None,
+        offset: int = 0,
+    ) -> Tuple[np.ndarray, np.ndarray, int]:
+        """(positions, stage labels, skipped) of 'action' on the selected assignments.
+
+        'set' moves them to 'stage', 'clear' removes their stage, 'shift' moves them 'offset' stages along the scheme and 'swap' exchanges 'stage' and 'other'. Assignments a shift would push past the first or last stage, or that have no stage to shift, stay where they are and are counted as skipped.
+        """
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"Unknown bulk action: {action}. Expected one of {BULK_ACTIONS}")
+
+        codes = self.stage_codes(current)
+        new = codes.copy()
+        skipped = 0
+
+        if action == "set":
+            new[mask] = self._code(stage)
+        elif action == "clear":
+            new[mask] = NO_STAGE
+        elif action == "shift":
+            shifted = codes + int(offset)
+            movable = mask & (codes >= 0) & (shifted >= 0) & (shifted < len(self.stages))
+            new[movable] = shifted[movable]
+            skipped = int((mask & ~movable).sum())
+        else:
+            first, second = self._code(stage), self._code(other)
+            new[mask & (codes == first)] = second
+            new[mask & (codes == second)] = first
+
+        positions = np.flatnonzero(new != codes)
+        labels = np.array(self.stages.tolist() + [None], dtype=object)
+        return positions, labels[new[positions]], skipped
+
+    def _code(self, stage) -> int:
+        if stage is None or (not isinstance(stage, str) and pd.isna(stage)):
+            return NO_STAGE
+        code = self.stages.get_loc(stage)
+        if not isinstance(code, (int, np.integer)):
+            raise ValueError(f"Stage is not unique in the scheme: {stage}")
+        return int(code)
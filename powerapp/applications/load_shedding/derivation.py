@@ -0,0 +1,108 @@
+import pandas as pd
+from functools import wraps
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def derived(*depends_on: str) -> Callable:
+    """Marks a method as a node of the derivation graph. 'depends_on' lists the tracked input attributes and/or other derived methods the node reads. The result is memoized per version of its upstream inputs and must be treated as read-only by callers."""
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(self):
+            return self._evaluate_node(func.__name__, func)
+
+        wrapper.depends_on = depends_on
+        return wrapper
+
+    return decorator
+
+
+class DerivationGraph:
+    """Base class holding the memo and input versions for @derived nodes.
+
+    Subclasses list the attributes feeding the graph in TRACKED_INPUTS. Assigning a different object to one of them bumps its version, which invalidates every node downstream of it on the next call.
+    """
+
+    TRACKED_INPUTS: Tuple[str, ...] = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.TRACKED_INPUTS and self.__dict__.get(name, None) is not value:
+            versions = self.__dict__.setdefault("_input_versions", {})
+            versions[name] = versions.get(name, 0) + 1
+        super().__setattr__(name, value)
+
+    def _graph_state(self) -> Tuple[Dict, Dict]:
+        memo = self.__dict__.setdefault("_memo", {})
+        stats = self.__dict__.setdefault("_memo_stats", {})
+        return memo, stats
+
+    @classmethod
+    def node_inputs(cls, name: str) -> Tuple[str, ...]:
+        """Resolves the tracked inputs a node depends on, directly or through upstream nodes."""
+        resolved = cls.__dict__.get("_resolved_inputs")
+        if resolved is None:
+            resolved = {}
+            setattr(cls, "_resolved_inputs", resolved)
+
+        if name not in resolved:
+            inputs: List[str] = []
+            for dep in getattr(cls, name).depends_on:
+                upstream = getattr(cls, dep, None)
+                dep_inputs = (
+                    cls.node_inputs(dep) if hasattr(upstream, "depends_on") else (dep,)
+                )
+                inputs.extend(i for i in dep_inputs if i not in inputs)
+            resolved[name] = tuple(inputs)
+
+        return resolved[name]
+
+    def _evaluate_node(self, name: str, func: Callable) -> Any:
+        memo, stats = self._graph_state()
+        inputs = type(self).node_inputs(name)
+
+        # touch the inputs first so lazily loaded ones get their version before keying
+        for input_name in inputs:
+            getattr(self, input_name)
+
+        versions = self.__dict__.get("_input_versions", {})
+        key = tuple(versions.get(i, 0) for i in inputs)
+        counter = stats.setdefault(name, {"hits": 0, "misses": 0})
+
+        cached = memo.get(name)
+        if cached is not None and cached[0] == key:
+            counter["hits"] += 1
+            return cached[1]
+
+        counter["misses"] += 1
+        value = func(self)
+        memo[name] = (key, value)
+
+        return value
+
+    def invalidate(self, *inputs: str) -> None:
+        """Forces a new version of the given inputs (all tracked inputs when none given)."""
+        versions = self.__dict__.setdefault("_input_versions", {})
+        for name in inputs or self.TRACKED_INPUTS:
+            versions[name] = versions.get(name, 0) + 1
+
+    def memo_stats(self) -> pd.DataFrame:
+        """Returns hit/miss counts per derived node together with its direct upstream dependencies."""
+        _, stats = self._graph_state()
+        cls = type(self)
+
+        rows = []
+        for name in dir(cls):
+            node = getattr(cls, name, None)
+            if not hasattr(node, "depends_on"):
+                continue
+            counter = stats.get(name, {"hits": 0, "misses": 0})
+            rows.append(
+                {
+                    "node": name,
+                    "depends_on": ", ".join(node.depends_on),
+                    "hits": counter["hits"],
+                    "misses": counter["misses"],
+                }
+            )
+
+        return pd.DataFrame(rows, columns=["node", "depends_on", "hits", "misses"])
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+NO_STAGE = -1
+
+
+class EditEntry:
+    """One recorded change: the assignment positions it touched with their stage codes before and after."""
+
+    __slots__ = ("label", "positions", "old", "new")
+
+    def __init__(self, label: str, positions: np.ndarray, old: np.ndarray, new: np.ndarray):
+        self.label = label
+        self.positions = positions
+        self.old = old
+        self.new = new
+
+
+class EditHistory:
+    """Undo / redo log of simulator stage edits.
+
+    The base stage vector is stored once as codes into 'labels' (-1 for no stage); every change is kept as the positions it touched with their old and new codes, so memory grows with the number of edited cells rather than with frame copies. Any point of the log is rebuilt by replaying it onto the base. Checkpoints keep only the positions that differ from the base.
+    """
+
+    def __init__(self, assignments, base_stages):
+        self.assignments = pd.Index(assignments)
+        self.labels: List = []
+        self._label_codes: Dict = {}
+
+        self.base = self.encode(base_stages)
+        self.current = self.base.copy()
+        self.entries: List[EditEntry] = []
+        self.cursor = 0
+        self.checkpoints: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def encode(self, stages) -> np.ndarray:
+        codes = np.empty(len(stages), dtype=np.int16)
+        for i, stage in enumerate(stages):
+            if stage is None or (not isinstance(stage, str) and pd.isna(stage)):
+                codes[i] = NO_STAGE
+                continue
+            if stage not in self._label_codes:
+                self._label_codes[stage] = len(self.labels)
+                self.labels.append(stage)
+            codes[i] = self._label_codes[stage]
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        lookup = np.array(self.labels + [None], dtype=object)
+        return lookup[codes]
+
+    @property
+    def can_undo(self) -> bool:
+        return self.cursor > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self.cursor < len(self.entries)
+
+    def record(self, label: str, positions, stages) -> Optional[EditEntry]:
+        """Logs new stages for the assignment positions; cells already at that stage are left out. Drops anything that was undone."""
+        positions = np.asarray(positions, dtype=np.int32)
+        new = self.encode(stages)
+        changed = self.current[positions] != new
+        if not changed.any():
+            return None
+
+        entry = EditEntry(label, positions[changed], self.current[positions[changed]], new[changed])
+        del self.entries[self.cursor:]
+        self.entries.append(entry)
+        self.cursor += 1
+        self.current[entry.positions] = entry.new
+        return entry
+
+    def record_assignments(self, label: str, assignments, stages) -> Optional[EditEntry]:
+        positions = self.assignments.get_indexer(list(assignments))
+        found = positions >= 0
+        return self.record(label, positions[found], np.asarray(stages, dtype=object)[found])
+
+    def undo(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(positions, stage labels) that take the simulator one edit back."""
+        if not self.can_undo:
+            return None
+        self.cursor -= 1
+        entry = self.entries[self.cursor]
+        self.current[entry.positions] = entry.old
+        return entry.positions, self.decode(entry.old)
+
+    def redo(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if not self.can_redo:
+            return None
+        entry = self.entries[self.cursor]
+        self.cursor += 1
+        self.current[entry.positions] = entry.new
+        return entry.positions, self.decode(entry.new)
+
+    def codes_at(self, cursor: int) -> np.ndarray:
+        """Stage codes after the first 'cursor' entries, replayed onto the base."""
+        codes = self.base.copy()
+        for entry in self.entries[:cursor]:
+            codes[entry.positions] = entry.new
+        return codes
+
+    def goto(self, cursor: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions, stage labels) that take the simulator to the point after the first 'cursor' entries, as if undone or redone step by step."""
+        cursor = min(max(cursor, 0), len(self.entries))
+        positions, stages = self.target_edit(self.codes_at(cursor))
+        self.current[positions] = self.encode(stages)
+        self.cursor = cursor
+        return positions, stages
+
+    def add_checkpoint(self, name: str):
+        differs = np.flatnonzero(self.current != self.base).astype(np.int32)
+        self.checkpoints[name] = (differs, self.current[differs])
+
+    def checkpoint_codes(self, name: str) -> np.ndarray:
+        positions, codes = self.checkpoints[name]
+        target = self.base.copy()
+        target[positions] = codes
+        return target
+
+    def target_edit(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions, stage labels) that move the current stages to 'codes'."""
+        positions = np.flatnonzero(self.current != codes).astype(np.int32)
+        return positions, self.decode(codes[positions])
+
+    def log(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "Edit": [entry.label for entry in self.entries],
+                "Cells": [len(entry.positions) for entry in self.entries],
+                "Applied": np.arange(len(self.entries)) < self.cursor,
+            }
+        )
@@ -0,0 +1,115 @@
+import weakref
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+from applications.data_processing.frame_cache import frame_cached
+
+
+class ColumnPostings:
+    """Value -> rows lookup of one column. 'codes' holds the value number of every row (NaN is numbered last) and rows[ptr[v]:ptr[v + 1]] are the rows holding value v, in row order."""
+
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(values)
+        codes = np.where(codes < 0, len(uniques), codes)
+
+        self.uniques = pd.Series(uniques)
+        self.codes = codes
+        self.rows = np.argsort(codes, kind="stable")
+        self.ptr = np.searchsorted(codes[self.rows], np.arange(len(uniques) + 2))
+
+    def selected(self, selected: Any) -> np.ndarray:
+        """Boolean per value number (NaN last) telling whether the value passes the filter, with the same semantics as Series.isin for lists and == for scalars."""
+        is_list = isinstance(selected, (list, tuple, set))
+        values = list(selected) if is_list else [selected]
+
+        flags = np.zeros(len(self.uniques) + 1, dtype=bool)
+        flags[:-1] = self.uniques.isin(values).to_numpy()
+        # isin matches missing values, == never does
+        flags[-1] = is_list and any(pd.isna(v) for v in values if np.ndim(v) == 0)
+
+        return flags
+
+    def rows_of(self, flags: np.ndarray) -> np.ndarray:
+        value_ids = np.flatnonzero(flags)
+        return np.sort(
+            np.concatenate([self.rows[self.ptr[v]:self.ptr[v + 1]] for v in value_ids])
+        )
+
+    def match_count(self, flags: np.ndarray) -> int:
+        value_ids = np.flatnonzero(flags)
+        return int((self.ptr[value_ids + 1] - self.ptr[value_ids]).sum())
+
+
+class FilterIndex:
+    """Per-column value -> row postings of a frame, built lazily for the columns that get filtered.
+
+    A set of filters is resolved by taking the rows of the most selective filter and checking the remaining ones on those candidate rows only, so the cost follows the number of matching rows rather than frame size times number of filters.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = weakref.ref(df)
+        self.n_rows = len(df)
+        self._columns: Dict[str, ColumnPostings] = {}
+
+    def column(self, col: str) -> ColumnPostings:
+        postings = self._columns.get(col)
+        if postings is None:
+            postings = ColumnPostings(self.df()[col])
+            self._columns[col] = postings
+        return postings
+
+    def rows(self, filters: List[Tuple[str, Any]]) -> np.ndarray:
+        """Positions of the rows passing every (column, selected) filter, in frame order."""
+        if not filters:
+            return np.arange(self.n_rows)
+
+        resolved = []
+        for col, selected in filters:
+            postings = self.column(col)
+            flags = postings.selected(selected)
+            resolved.append((postings.match_count(flags), postings, flags))
+
+        resolved.sort(key=lambda item: item[0])
+        _, postings, flags = resolved[0]
+
+        if not flags.any():
+            return np.empty(0, dtype=np.int64)
+
+        rows = postings.rows_of(flags)
+        for _, postings, flags in resolved[1:]:
+            rows = rows[flags[postings.codes[rows]]]
+
+        return rows
+
+    def all_in(self, rows: np.ndarray, columns: List[str], values: List[Any]) -> np.ndarray:
+        """Boolean per given row: True when every column holds a missing value or one of 'values'."""
+        result = np.ones(len(rows), dtype=bool)
+        for col in columns:
+            postings = self.column(col)
+            flags = postings.selected(values)
+            flags[-1] = True
+            result &= flags[postings.codes[rows]]
+        return result
+
+
+def filter_index(df: pd.DataFrame) -> FilterIndex:
+    """Returns the filter index of 'df', creating it on first use."""
+    return frame_cached(df, "filter_index", FilterIndex)
+
+
+def active_filters(filters: Dict, columns: pd.Index) -> List[Tuple[str, Any]]:
+    """The (column, selected) pairs of 'filters' that actually restrict 'columns', skipping empty selections and unknown keys."""
+    return [
+        (col, selected)
+        for col, selected in filters.items()
+        if not (selected is None or selected == [] or col not in columns)
+    ]
+
+
+def take_rows(
+    df: pd.DataFrame, rows: np.ndarray, columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """Materializes the selected rows (and columns) of 'df'. Rows are taken first so only the matching rows get copied."""
+    result = df.take(rows)
+
+    return result if columns is None else result[columns]
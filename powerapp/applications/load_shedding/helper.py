@@ -1,7 +1,14 @@
+import numpy as np
 import pandas as pd
-from typing import List, Optional, Sequence, Tuple, Any, Union, Set
+from typing import Dict, List, Optional, Sequence, Tuple, Any, Union, Set
 from functools import wraps
 
+# Aggregations understood by groupby_agg on top of the regular pandas ones.
+# UNIQUE_JOIN           == lambda x: ", ".join(x.astype(str).unique())
+# UNIQUE_JOIN_NON_EMPTY == join_unique_non_empty (drops NaN/blank, None when nothing left)
+UNIQUE_JOIN = "unique_join"
+UNIQUE_JOIN_NON_EMPTY = "unique_join_non_empty"
+
 
 def columns_list(
     df: Optional[pd.DataFrame],
@@ -51,6 +58,119 @@ def column_data_list(
     return unique_ordered
 
 
+def unique_join_codes(
+    df: pd.DataFrame,
+    group_ids: np.ndarray,
+    n_groups: int,
+    columns: Sequence[str],
+    skip_empty: bool = False,
+    sep: str = ", ",
+) -> Dict[str, np.ndarray]:
+    """Joins the distinct values of each column per group, in first-seen order, without calling Python per group.
+
+    Every column is factorized once; the (column, group, value) code triples of all columns are then de-duplicated, ordered and concatenated together with np.add.reduceat. 'group_ids' are the row positions' group numbers (e.g. GroupBy.ngroup()). Returns one object array of length 'n_groups' per column.
+    """
+    n_rows = len(df)
+    result = {}
+
+    if n_rows == 0 or not columns:
+        for col in columns:
+            result[col] = np.full(n_groups, None if skip_empty else "", dtype=object)
+        return result
+
+    rows, labels = [], []
+    label_offset = 0
+
+    for col_pos, col in enumerate(columns):
+        values = df[col]
+        if skip_empty:
+            codes, uniques = pd.factorize(values)
+            col_labels = np.array([str(v) for v in uniques], dtype=object)
+            keep = np.array([label.strip() != "" for label in col_labels], dtype=bool)
+            valid = codes >= 0
+            valid[valid] = keep[codes[valid]]
+        else:
+            codes, uniques = pd.factorize(values.astype(str))
+            col_labels = np.asarray(uniques, dtype=object)
+            valid = np.ones(n_rows, dtype=bool)
+
+        row_pos = np.flatnonzero(valid)
+        # one slot per (column, group): global_group = col_pos * n_groups + group
+        global_group = col_pos * n_groups + group_ids[row_pos]
+        rows.append(np.column_stack((global_group, row_pos, codes[row_pos] + label_offset)))
+        labels.append(col_labels)
+        label_offset += len(col_labels)
+
+    triples = np.concatenate(rows)
+    all_labels = np.concatenate(labels)
+    all_keys = triples[:, 0] * max(label_offset, 1) + triples[:, 2]
+
+    # first occurrence of each (column, group, value), then back to group / row order
+    _, first = np.unique(all_keys, return_index=True)
+    triples = triples[first]
+    triples = triples[np.lexsort((triples[:, 1], triples[:, 0]))]
+
+    joined = np.full(len(columns) * n_groups, None, dtype=object)
+
+    if len(triples):
+        slots = triples[:, 0]
+        parts = all_labels[triples[:, 2]]
+        starts = np.flatnonzero(np.r_[True, slots[1:] != slots[:-1]])
+
+        not_first = np.ones(len(parts), dtype=bool)
+        not_first[starts] = False
+        parts[not_first] = sep + parts[not_first]
+
+        joined[slots[starts]] = np.add.reduceat(parts, starts)
+
+    for col_pos, col in enumerate(columns):
+        result[col] = joined[col_pos * n_groups:(col_pos + 1) * n_groups]
+
+    return result
+
+
+def groupby_agg(
+    df: pd.DataFrame,
+    by: Union[str, List[str]],
+    agg: Dict[str, Any],
+    as_index: bool = True,
+    dropna: bool = False,
+) -> pd.DataFrame:
+    """Drop-in for df.groupby(by, dropna=dropna, as_index=as_index).agg(agg) where 'agg' values may also be UNIQUE_JOIN or UNIQUE_JOIN_NON_EMPTY. Those columns are built by unique_join_codes instead of a Python lambda per group."""
+    if dropna:
+        df = df.dropna(subset=[by] if isinstance(by, str) else list(by))
+
+    grouped = df.groupby(by, dropna=False)
+
+    join_modes = (UNIQUE_JOIN, UNIQUE_JOIN_NON_EMPTY)
+    plain_agg = {
+        col: how for col, how in agg.items()
+        if not (isinstance(how, str) and how in join_modes)
+    }
+
+    if plain_agg:
+        out = grouped.agg(plain_agg)
+    else:
+        out = grouped.size().to_frame().iloc[:, :0]
+
+    group_ids = grouped.ngroup().to_numpy()
+
+    for mode in join_modes:
+        columns = [col for col, how in agg.items() if isinstance(how, str) and how == mode]
+        if not columns:
+            continue
+
+        joined = unique_join_codes(
+            df, group_ids, len(out), columns, skip_empty=(mode == UNIQUE_JOIN_NON_EMPTY)
+        )
+        for col in columns:
+            out[col] = joined[col]
+
+    out = out[list(agg)]
+
+    return out.reset_index() if not as_index else out
+
+
 # def handle_series_input(func):
 #     """Decorator to automatically handle Series inputs"""
 #     from functools import wraps
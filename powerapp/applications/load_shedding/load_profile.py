@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+from applications.data_processing.read_data import df_search_filter
 
 
 def load_profile_metric(df, zone, scheme=None):
@@ -17,15 +18,3 @@ def load_profile_metric(df, zone, scheme=None):
     ).agg({"Load (MW)": "sum"}
           )
     return zone_MW.loc[zone_MW["zone"] == zone]["Load (MW)"].to_numpy().sum()
-
-
-def df_search_filter(df: pd.DataFrame, query: str) -> pd.DataFrame:
-    if not query:
-        return df
-
-    df_str = df.astype(str)
-    mask = df_str.apply(
-        lambda row: row.str.contains(query, case=False, na=False).any(), axis=1
-    )
-
-    return df[mask]
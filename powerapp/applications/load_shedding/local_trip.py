@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable
+from applications.data_processing.frame_cache import frame_cached
+
+
+class LocalTripIncidence:
+    """Sparse assignment x local_trip_id incidence of a candidate frame, kept as the list of distinct (assignment, local trip) pairs.
+
+    For a set of active assignments the number of active assignments per local trip is a single bincount over the pairs (the column sums of the masked incidence matrix). A local trip held by more than one active assignment is in conflict.
+    """
+
+    def __init__(
+        self,
+        raw_candidate: pd.DataFrame,
+        assignment_col: str = "assignment_id",
+        local_trip_col: str = "local_trip_id",
+    ):
+        pairs = raw_candidate.loc[
+            raw_candidate[local_trip_col].notna(), [assignment_col, local_trip_col]
+        ].drop_duplicates()
+
+        # pairs stay in first-seen order, which is the order conflicts are reported in
+        self.assign_codes, self.assignments = pd.factorize(pairs[assignment_col])
+        self.trip_codes, self.local_trips = pd.factorize(pairs[local_trip_col])
+        self.trip_labels = np.asarray(pd.Index(self.local_trips).astype(str), dtype=object)
+
+        # assignments in the order groupby(assignment_col) lists them
+        self.assign_rank = np.empty(len(self.assignments), dtype=np.int64)
+        self.assign_rank[
+            pd.Series(self.assignments).sort_values(kind="stable").index
+        ] = np.arange(len(self.assignments))
+
+        # assignment -> its pairs (CSR layout)
+        self.by_assign = np.argsort(self.assign_codes, kind="stable")
+        self.assign_ptr = np.searchsorted(
+            self.assign_codes[self.by_assign], np.arange(len(self.assignments) + 1)
+        )
+
+    def active_pairs(self, active_assignments: Iterable) -> np.ndarray:
+        """Boolean per pair: True when its assignment is active."""
+        active = self.assignments.isin(list(active_assignments))
+        return active[self.assign_codes]
+
+    def trip_counts(self, active_assignments: Iterable) -> np.ndarray:
+        """Number of active assignments holding each local trip."""
+        pair_active = self.active_pairs(active_assignments)
+        return np.bincount(
+            self.trip_codes[pair_active], minlength=len(self.local_trips)
+        )
+
+    def conflict_pairs(self, active_assignments: Iterable) -> np.ndarray:
+        """Indices of the active pairs whose local trip is held by another active assignment too, ordered by assignment then first-seen order."""
+        pair_active = self.active_pairs(active_assignments)
+        counts = np.bincount(
+            self.trip_codes[pair_active], minlength=len(self.local_trips)
+        )
+
+        selected = np.flatnonzero(pair_active & (counts > 1)[self.trip_codes])
+
+        return selected[
+            np.lexsort((selected, self.assign_rank[self.assign_codes[selected]]))
+        ]
+
+    def conflict_map(self, active_assignments: Iterable) -> Dict:
+        """{assignment: [conflicting local trip ids as str]} for the active assignments, as detect_local_trip_conflict reports it."""
+        conflict_map: Dict = {}
+
+        for pair in self.conflict_pairs(active_assignments):
+            labels = conflict_map.setdefault(self.assignments[self.assign_codes[pair]], [])
+            label = self.trip_labels[self.trip_codes[pair]]
+            if label not in labels:
+                labels.append(label)
+
+        return conflict_map
+
+
+def local_trip_incidence(
+    raw_candidate: pd.DataFrame,
+    assignment_col: str = "assignment_id",
+    local_trip_col: str = "local_trip_id",
+) -> LocalTripIncidence:
+    """Returns the incidence of 'raw_candidate', building it on first use."""
+    return frame_cached(
+        raw_candidate,
+        f"local_trip_incidence:{assignment_col}:{local_trip_col}",
+        lambda df: LocalTripIncidence(df, assignment_col, local_trip_col),
+    )
@@ -0,0 +1,295 @@
+import os
+import sys
+import time
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # sidecar cache is optional, fall back to plain xlsx reads
+    pa = None
+
+# (absolute path, mtime in ns, size in bytes) - changes whenever the workbook is re-saved
+FileSignature = Tuple[str, int, int]
+
+# Cleaned workbooks are mirrored as Arrow IPC files in this sub-folder of the data dir.
+# Bump SIDECAR_VERSION whenever the cleaning in read_ls_data changes.
+SIDECAR_DIR = ".sidecar"
+SIDECAR_VERSION = "1"
+
+# Process-wide store shared by every Streamlit session. Frames held here are
+# shared objects and must be treated as read-only by callers.
+_REFERENCE_STORE: Dict[str, Tuple[FileSignature, pd.DataFrame]] = {}
+_STORE_LOCK = threading.Lock()
+
+
+def read_ls_data(file_path: str, use_sidecar: bool = True) -> Optional[pd.DataFrame]:
+    if use_sidecar:
+        df = read_sidecar(file_path)
+        if df is not None:
+            return df
+
+    try:
+        df = pd.read_excel(file_path)
+
+        # Clean column names
+        df.columns = (
+            df.columns.astype(str).str.replace(r"[\"']", "", regex=True).str.strip()
+        )
+
+        # Clean only non-null string values in object columns
+        obj_cols = df.select_dtypes(include="object").columns
+        for col in obj_cols:
+            df[col] = df[col].str.strip().str.replace(r"[\"']", "", regex=True)
+
+        if use_sidecar:
+            write_sidecar(file_path, df)
+
+        return df
+
+    except FileNotFoundError:
+        log_error(f"File not found: {file_path}")
+    except Exception as e:
+        log_error(f"Error processing file '{file_path}': {e}")
+
+    return None
+
+
+def log_error(message: str) -> None:
+    print(f"[ERROR] {message}", file=sys.stderr)
+
+
+def log_info(message: str) -> None:
+    print(f"[INFO] {message}", file=sys.stderr)
+
+
+def get_path(filename: str, data_dir: str = "data") -> str:
+    return os.path.join(data_dir, filename)
+
+
+def sidecar_path(file_path: str) -> str:
+    folder, filename = os.path.split(file_path)
+    return os.path.join(folder, SIDECAR_DIR, f"{filename}.arrow")
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_sidecar(file_path: str) -> Optional[pd.DataFrame]:
+    """Returns the cleaned frame from the memory-mapped Arrow sidecar when it still matches the source workbook (same mtime and size, or same content hash), otherwise None."""
+    if pa is None:
+        return None
+
+    path = sidecar_path(file_path)
+
+    try:
+        stat = os.stat(file_path)
+        with pa.memory_map(path, "r") as source:
+            table = pa_ipc.open_file(source).read_all()
+    except (OSError, pa.ArrowException):
+        return None
+
+    meta = table.schema.metadata or {}
+    if meta.get(b"sidecar_version", b"").decode() != SIDECAR_VERSION:
+        return None
+
+    same_stat = (
+        meta.get(b"source_mtime_ns", b"").decode() == str(stat.st_mtime_ns)
+        and meta.get(b"source_size", b"").decode() == str(stat.st_size)
+    )
+    if not same_stat:
+        # e.g. a checkout touched the file without changing it
+        if meta.get(b"source_size", b"").decode() != str(stat.st_size):
+            return None
+        if meta.get(b"source_sha256", b"").decode() != file_sha256(file_path):
+            return None
+
+        # record the new mtime so later loads match on stat again instead of re-hashing
+        table = table.replace_schema_metadata(
+            {**meta, b"source_mtime_ns": str(stat.st_mtime_ns).encode()}
+        )
+        _write_sidecar_table(path, table)
+
+    return _restore_nulls(table.to_pandas())
+
+
+def write_sidecar(file_path: str, df: pd.DataFrame) -> None:
+    """Stores the cleaned frame next to the workbook. The sidecar is only kept when it reads back identical to 'df'."""
+    if pa is None:
+        return
+
+    try:
+        stat = os.stat(file_path)
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        table = table.replace_schema_metadata(
+            {
+                **(table.schema.metadata or {}),
+                b"sidecar_version": SIDECAR_VERSION.encode(),
+                b"source_mtime_ns": str(stat.st_mtime_ns).encode(),
+                b"source_size": str(stat.st_size).encode(),
+                b"source_sha256": file_sha256(file_path).encode(),
+            }
+        )
+    except (OSError, pa.ArrowException):
+        # a frame Arrow cannot hold, keep reading the xlsx
+        return
+
+    if _identical(df, _restore_nulls(table.to_pandas())):
+        _write_sidecar_table(sidecar_path(file_path), table)
+
+
+def _write_sidecar_table(path: str, table) -> None:
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    except (OSError, pa.ArrowException):
+        # read-only data dir, keep reading the xlsx
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _restore_nulls(df: pd.DataFrame) -> pd.DataFrame:
+    # Arrow hands back None for missing strings, read_ls_data produces NaN
+    for col in df.select_dtypes(include="object").columns:
+        missing = df[col].isna()
+        if missing.any():
+            df[col] = df[col].where(~missing, np.nan)
+
+    return df
+
+
+def _identical(left: pd.DataFrame, right: pd.DataFrame) -> bool:
+    if not (
+        left.columns.equals(right.columns)
+        and left.index.equals(right.index)
+        and left.dtypes.equals(right.dtypes)
+        and left.equals(right)
+    ):
+        return False
+
+    for col in left.select_dtypes(include="object").columns:
+        if not left[col].map(type).equals(right[col].map(type)):
+            return False
+
+    return True
+
+
+def file_signature(file_path: str) -> Optional[FileSignature]:
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+
+    return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+def load_reference_data(file_path: str) -> Optional[pd.DataFrame]:
+    """Returns the cleaned workbook from the process-wide store. The file is only re-read when its path, mtime or size no longer matches the cached entry, so every session reuses the same parsed frame until the workbook changes on disk."""
+
+    signature = file_signature(file_path)
+
+    if signature is None:
+        # Let read_ls_data report the missing file exactly as before
+        return read_ls_data(file_path)
+
+    with _STORE_LOCK:
+        cached = _REFERENCE_STORE.get(signature[0])
+
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    df = read_ls_data(file_path)
+
+    if df is not None:
+        with _STORE_LOCK:
+            _REFERENCE_STORE[signature[0]] = (signature, df)
+
+    return df
+
+
+def timed_read_ls_data(file_path: str) -> Tuple[Optional[pd.DataFrame], float]:
+    start = time.perf_counter()
+    df = read_ls_data(file_path)
+    return df, time.perf_counter() - start
+
+
+def load_reference_batch(
+    file_paths: Dict[str, str], max_workers: Optional[int] = None
+) -> Dict[str, Optional[pd.DataFrame]]:
+    """Loads several workbooks through the process-wide store, parsing the ones not yet cached concurrently in a process pool. 'file_paths' maps a caller-chosen name to a path; the result uses the same names. Per-file timings are logged, and errors are reported through log_error as read_ls_data does."""
+
+    frames: Dict[str, Optional[pd.DataFrame]] = {}
+    pending: Dict[str, Tuple[str, FileSignature]] = {}
+
+    for name, file_path in file_paths.items():
+        signature = file_signature(file_path)
+
+        if signature is None:
+            frames[name] = read_ls_data(file_path)
+            continue
+
+        with _STORE_LOCK:
+            cached = _REFERENCE_STORE.get(signature[0])
+
+        if cached is not None and cached[0] == signature:
+            frames[name] = cached[1]
+        else:
+            pending[name] = (file_path, signature)
+
+    if not pending:
+        return {name: frames[name] for name in file_paths}
+
+    workers = min(len(pending), max_workers or os.cpu_count() or 1)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            name: pool.submit(timed_read_ls_data, file_path)
+            for name, (file_path, _) in pending.items()
+        }
+
+        for name, future in futures.items():
+            file_path, signature = pending[name]
+            try:
+                df, elapsed = future.result()
+            except Exception as e:
+                log_error(f"Error processing file '{file_path}': {e}")
+                frames[name] = None
+                continue
+
+            # failures were already reported by read_ls_data in the worker
+            frames[name] = df
+            if df is None:
+                continue
+
+            log_info(f"Loaded '{file_path}' in {elapsed:.2f}s")
+            with _STORE_LOCK:
+                _REFERENCE_STORE[signature[0]] = (signature, df)
+
+    log_info(
+        f"Loaded {len(pending)} workbook(s) with {workers} worker(s) in "
+        f"{time.perf_counter() - start:.2f}s"
+    )
+
+    return {name: frames[name] for name in file_paths}
+
+
+def clear_reference_data() -> None:
+    with _STORE_LOCK:
+        _REFERENCE_STORE.clear()
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+LOCAL_TRIP_CONFLICT = "Local Trip Conflict"
+
+
+class ScenarioResults:
+    """Outcome of ScenarioBatch.evaluate for n scenarios.
+
+    'zone_stage_mw' is (scenarios x zones x stages), 'stage_mw' (scenarios x stages, rows without a zone included), 'zone_mw' (scenarios x zones) and 'summary' one row per scenario with the dashboard totals and the flag counts.
+    """
+
+    def __init__(self, zone_stage_mw, stage_mw, zone_mw, summary):
+        self.zone_stage_mw = zone_stage_mw
+        self.stage_mw = stage_mw
+        self.zone_mw = zone_mw
+        self.summary = summary
+
+
+class ScenarioBatch:
+    """Evaluates many stage allocations of the same simulator assignments at once.
+
+    A scenario is one row of stage numbers (-1 for none) over the assignments. Totals follow sim_dashboard (stage and zone MW rounded per cell before summing) and flags follow raise_flags: 'warning_masks' and 'alert_mask' are (assignments x stages) bool, True where the stage raises that flag for the assignment, and assignments sharing a local trip while both staged are Warning too. Alert wins over Warning like in raise_flags.
+    """
+
+    def __init__(
+        self,
+        load: np.ndarray,
+        zones: List,
+        stages: List,
+        target_mw: float,
+        warning_masks: Optional[Dict[str, np.ndarray]] = None,
+        alert_mask: Optional[np.ndarray] = None,
+        local_pairs: Optional[tuple] = None,
+    ):
+        self.zones = list(zones)
+        self.stages = list(stages)
+        self.target_mw = target_mw
+        self.n_assign = len(load)
+
+        n_zones = len(self.zones)
+        self.total_load = load.sum(axis=1)
+        # (assignment, zone, MW) of the non-zero zone loads
+        self.entry_assign, self.entry_zone = np.nonzero(load[:, :n_zones])
+        self.entry_load = load[self.entry_assign, self.entry_zone]
+
+        self.warning_masks = warning_masks or {}
+        self.alert_mask = alert_mask
+
+        if local_pairs is None:
+            self.pair_assign = self.pair_trip = np.empty(0, dtype=np.int64)
+        else:
+            self.pair_assign, self.pair_trip = (
+                np.asarray(a, dtype=np.int64) for a in local_pairs
+            )
+        self.n_trips = int(self.pair_trip.max()) + 1 if len(self.pair_trip) else 0
+
+    def codes(self, frame: pd.DataFrame) -> np.ndarray:
+        """Scenario matrix of a frame holding one stage label column per scenario (rows are the assignments). Labels outside 'stages' count as no stage."""
+        stage_ids = {stage: i for i, stage in enumerate(self.stages)}
+        return np.stack(
+            [
+                np.array([stage_ids.get(label, -1) for label in frame[col]], dtype=np.int64)
+                for col in frame.columns
+            ]
+        ) if len(frame.columns) else np.empty((0, len(frame)), dtype=np.int64)
+
+    def _flag_hits(self, codes: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """(scenarios x assignments) bool: the stage of the scenario hits 'mask'."""
+        # last column stands for no stage and never hits
+        padded = np.zeros((self.n_assign, len(self.stages) + 1), dtype=bool)
+        padded[:, :-1] = mask
+        return padded[np.arange(self.n_assign)[None, :], np.where(codes >= 0, codes, len(self.stages))]
+
+    def _local_conflicts(self, codes: np.ndarray) -> np.ndarray:
+        n_scen = len(codes)
+        if not len(self.pair_assign):
+            return np.zeros(codes.shape, dtype=bool)
+
+        pair_active = codes[:, self.pair_assign] >= 0
+        scen = np.repeat(np.arange(n_scen), len(self.pair_assign))
+
+        counts = np.bincount(
+            scen * self.n_trips + np.tile(self.pair_trip, n_scen),
+            weights=pair_active.ravel(),
+            minlength=n_scen * self.n_trips,
+        ).reshape(n_scen, self.n_trips)
+
+        conflicted_pair = pair_active & (counts[:, self.pair_trip] > 1)
+        return np.bincount(
+            scen * self.n_assign + np.tile(self.pair_assign, n_scen),
+            weights=conflicted_pair.ravel(),
+            minlength=n_scen * self.n_assign,
+        ).reshape(n_scen, self.n_assign) > 0
+
+    def evaluate(self, codes: np.ndarray, names: Optional[List] = None) -> ScenarioResults:
+        """Totals and flag counts of every scenario row of 'codes'."""
+        codes = np.atleast_2d(np.asarray(codes, dtype=np.int64))
+        n_scen, n_zones, n_stages = len(codes), len(self.zones), len(self.stages)
+        names = list(names) if names is not None else list(range(n_scen))
+
+        scen = np.repeat(np.arange(n_scen), self.n_assign)
+        flat = codes.ravel()
+        staged = flat >= 0
+
+        stage_mw = np.bincount(
+            scen[staged] * n_stages + flat[staged],
+            weights=np.tile(self.total_load, n_scen)[staged],
+            minlength=n_scen * n_stages,
+        ).reshape(n_scen, n_stages)
+
+        entry_codes = codes[:, self.entry_assign]
+        entry_scen = np.repeat(np.arange(n_scen), len(self.entry_assign))
+        entry_flat = entry_codes.ravel()
+        entry_staged = entry_flat >= 0
+        cells = (
+            entry_scen * n_zones * n_stages
+            + np.tile(self.entry_zone, n_scen) * n_stages
+            + entry_flat
+        )
+        zone_stage_mw = np.bincount(
+            cells[entry_staged],
+            weights=np.tile(self.entry_load, n_scen)[entry_staged],
+            minlength=n_scen * n_zones * n_stages,
+        ).reshape(n_scen, n_zones, n_stages)
+
+        # the dashboard rounds every stage / zone x stage cell before adding them up
+        total_mw = np.round(stage_mw).sum(axis=1)
+        zone_mw = np.round(zone_stage_mw).sum(axis=2)
+        achievement = total_mw / self.target_mw * 100 if self.target_mw > 0 else np.zeros(n_scen)
+
+        summary = pd.DataFrame(
+            {
+                "Scenario": names,
+                "Total (MW)": total_mw,
+                "Achievement (%)": achievement,
+                "Assigned": (codes >= 0).sum(axis=1),
+            }
+        )
+        for zone_id, zone in enumerate(self.zones):
+            summary[f"{zone} (MW)"] = zone_mw[:, zone_id]
+
+        warning = np.zeros(codes.shape, dtype=bool)
+        for name, mask in self.warning_masks.items():
+            hits = self._flag_hits(codes, mask)
+            summary[name] = hits.sum(axis=1)
+            warning |= hits
+
+        local = self._local_conflicts(codes)
+        summary[LOCAL_TRIP_CONFLICT] = local.sum(axis=1)
+        warning |= local
+
+        alert = (
+            self._flag_hits(codes, self.alert_mask)
+            if self.alert_mask is not None else np.zeros(codes.shape, dtype=bool)
+        )
+        summary["Warnings"] = (warning & ~alert).sum(axis=1)
+        summary["Alerts"] = alert.sum(axis=1)
+
+        return ScenarioResults(zone_stage_mw, stage_mw, zone_mw, summary)
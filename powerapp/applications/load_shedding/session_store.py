@@ -0,0 +1,129 @@
+import time
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Set
+
+MAX_DEPTH = 4
+
+
+def object_nbytes(obj: Any, seen: Optional[Set[int]] = None, depth: int = 0) -> int:
+    """Approximate memory held by frames and arrays reachable from 'obj' through containers and object attributes. Objects whose id is in 'seen' (e.g. frames shared between entries) are counted once or not at all."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen or depth > MAX_DEPTH:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(object_nbytes(v, seen, depth + 1) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(object_nbytes(v, seen, depth + 1) for v in obj)
+
+    attrs = getattr(obj, "__dict__", None)
+    if attrs is None and hasattr(obj, "__slots__"):
+        attrs = {name: getattr(obj, name, None) for name in obj.__slots__}
+    if attrs:
+        return sum(object_nbytes(v, seen, depth + 1) for v in attrs.values())
+
+    return 0
+
+
+class StoreEntry:
+    """A stored state: 'live' while in use, otherwise only its 'compact' form."""
+
+    __slots__ = ("live", "compact", "nbytes", "last_used")
+
+    def __init__(self, live):
+        self.live = live
+        self.compact = None
+        self.nbytes = 0
+        self.last_used = time.time()
+
+
+class SessionStore:
+    """LRU store of per-key states under a memory budget.
+
+    The key in use stays live. When the total goes over the budget, the least recently used live entries are first turned into their compact form through 'compact(live)', and compact entries are then dropped, oldest first. Sizes come from 'measure(state)' when an entry is put or compacted; callers call refresh(key) after changing a live state.
+    """
+
+    def __init__(self, budget_bytes: int, compact: Callable[[Any], Any], measure: Callable[[Any], int]):
+        self.budget_bytes = budget_bytes
+        self._compact = compact
+        self._measure = measure
+        self._entries: "OrderedDict[Hashable, StoreEntry]" = OrderedDict()
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key) -> Optional[StoreEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry.last_used = time.time()
+        return entry
+
+    def put(self, key, live) -> StoreEntry:
+        entry = self._entries.get(key) or StoreEntry(live)
+        entry.live = live
+        entry.compact = None
+        entry.last_used = time.time()
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self.refresh(key)
+        return entry
+
+    def refresh(self, key):
+        entry = self._entries[key]
+        entry.nbytes = self._measure(entry.live if entry.live is not None else entry.compact)
+
+    def compact(self, key):
+        """Replaces the live state of 'key' with its compact form."""
+        entry = self._entries[key]
+        if entry.live is not None:
+            entry.compact = self._compact(entry.live)
+            entry.live = None
+            self.refresh(key)
+
+    def live_items(self) -> List:
+        return [(key, entry.live) for key, entry in self._entries.items() if entry.live is not None]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def evict(self, keep) -> List[Hashable]:
+        """Compacts, then drops, least recently used entries other than 'keep' until the store fits its budget. Returns the keys whose live state was released."""
+        released = []
+
+        for key in list(self._entries):
+            if self.total_bytes <= self.budget_bytes:
+                return released
+            entry = self._entries[key]
+            if key == keep or entry.live is None:
+                continue
+            self.compact(key)
+            released.append(key)
+
+        for key in list(self._entries):
+            if self.total_bytes <= self.budget_bytes:
+                break
+            if key != keep:
+                del self._entries[key]
+
+        return released
+
+    def usage(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "Key": [key for key in self._entries],
+                "State": ["live" if e.live is not None else "compact" for e in self._entries.values()],
+                "Size (KB)": [e.nbytes / 1024 for e in self._entries.values()],
+                "Last Used": [pd.Timestamp(e.last_used, unit="s") for e in self._entries.values()],
+            }
+        )
@@ -0,0 +1,405 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+LOCAL_TRIP = "Shared local_trip_id"
+EPS = 1e-9
+
+
+class StageAllocation:
+    """Stage allocation returned by allocate_stages.
+
+    'codes' holds the chosen stage number of every assignment (-1 for none), 'mw' the resulting zone x stage MW matrix, 'stage_mw' the stage totals (rows without a zone included) and 'binding' one row per constraint telling whether it kept the allocation from getting closer to the targets.
+    """
+
+    def __init__(self, codes, mw, stage_mw, objective, churn, moves, binding):
+        self.codes = codes
+        self.mw = mw
+        self.stage_mw = stage_mw
+        self.objective = objective
+        self.churn = churn
+        self.moves = moves
+        self.binding = binding
+
+
+class _Allocator:
+    """Best-improvement descent over single assignment moves (to another stage or to no stage).
+
+    The error is the sum of |allocated - target| over every zone x stage cell plus over every stage total. Moving an assignment only changes its old and new stage columns, so after a move only the cost of those two columns is recomputed.
+    """
+
+    def __init__(self, load, zone_targets, allowed, base, pair_assign, pair_trip, n_trips, churn_weight):
+        self.load = load
+        self.n_zones = zone_targets.shape[0]
+        self.zone_load = load[:, :self.n_zones]
+        self.total_load = load.sum(axis=1)
+        # (assignment, zone, MW) of the non-zero zone loads, most assignments sit in one zone
+        self.entry_assign, self.entry_zone = np.nonzero(self.zone_load)
+        self.entry_load = self.zone_load[self.entry_assign, self.entry_zone]
+        self.allowed = allowed
+        self.base = base
+        self.churn_weight = churn_weight
+
+        n_assign, n_stages = allowed.shape
+        self.n_stages = n_stages
+
+        self.pair_assign = pair_assign
+        self.pair_trip = pair_trip
+        self.n_trips = n_trips
+
+        self.codes = np.full(n_assign, -1, dtype=np.int64)
+        self.zone_gap = -zone_targets.astype(float)
+        self.stage_gap = -zone_targets.sum(axis=0).astype(float)
+
+        # churn of putting each assignment in each stage, last column is no stage
+        stage_ids = np.append(np.arange(n_stages), -1)
+        self.churn = churn_weight * (stage_ids[None, :] != base[:, None])
+
+    def place(self, code, stage_id):
+        old = self.codes[code]
+        if old >= 0:
+            self.zone_gap[:, old] -= self.zone_load[code]
+            self.stage_gap[old] -= self.total_load[code]
+        if stage_id >= 0:
+            self.zone_gap[:, stage_id] += self.zone_load[code]
+            self.stage_gap[stage_id] += self.total_load[code]
+        self.codes[code] = stage_id
+
+    def load_state(self, codes):
+        """Puts every assignment in its stage of 'codes' at once."""
+        self.codes = np.asarray(codes, dtype=np.int64).copy()
+        staged = self.codes >= 0
+        np.add.at(self.zone_gap.T, self.codes[staged], self.zone_load[staged])
+        np.add.at(self.stage_gap, self.codes[staged], self.total_load[staged])
+
+    def column_error(self, cols) -> float:
+        return float(np.abs(self.zone_gap[:, cols]).sum() + np.abs(self.stage_gap[cols]).sum())
+
+    def blocked(self) -> np.ndarray:
+        """True for the assignments that share a local trip with an active assignment."""
+        active = self.codes >= 0
+        pair_active = active[self.pair_assign]
+        counts = np.bincount(self.pair_trip[pair_active], minlength=self.n_trips)
+        others = counts[self.pair_trip] - pair_active
+        return np.bincount(
+            self.pair_assign, weights=others > 0, minlength=len(self.codes)
+        ) > 0
+
+    def add_cost(self, stages=None) -> np.ndarray:
+        """Error change of adding every assignment to 'stages' (all stages by default)."""
+        stages = np.arange(self.n_stages) if stages is None else stages
+        zone_gap = self.zone_gap[:, stages]
+        stage_gap = self.stage_gap[stages]
+
+        gap = zone_gap[self.entry_zone]
+        entry_cost = np.abs(gap + self.entry_load[:, None]) - np.abs(gap)
+        zone_cost = np.stack(
+            [
+                np.bincount(self.entry_assign, weights=entry_cost[:, i], minlength=len(self.codes))
+                for i in range(len(stage_gap))
+            ],
+            axis=1,
+        )
+        stage_cost = np.abs(stage_gap[None] + self.total_load[:, None]) - np.abs(stage_gap)[None]
+
+        return zone_cost + stage_cost
+
+    def remove_cost(self, codes=None) -> np.ndarray:
+        """Error change of taking the given assignments (all by default) out of their stage."""
+        codes = np.arange(len(self.codes)) if codes is None else codes
+        stage = self.codes[codes]
+        staged = stage >= 0
+        cost = np.zeros(len(codes))
+
+        if staged.any():
+            rows, cols = codes[staged], stage[staged]
+            zone_gap = self.zone_gap[:, cols].T
+            stage_gap = self.stage_gap[cols]
+            cost[staged] = (
+                np.abs(zone_gap - self.zone_load[rows]) - np.abs(zone_gap)
+            ).sum(axis=1) + np.abs(stage_gap - self.total_load[rows]) - np.abs(stage_gap)
+
+        return cost
+
+    def deltas(self, add, remove, blocked, rows=None, cols=None, constrained=True) -> np.ndarray:
+        """Objective change of the moves of 'rows' (assignments) to 'cols' (stages, n_stages for no stage). Moves the constraints forbid are inf unless 'constrained' is False; staying put is always inf."""
+        rows = slice(None) if rows is None else rows
+        cols = np.arange(self.n_stages + 1) if cols is None else cols
+
+        codes = self.codes[rows]
+        current = np.where(codes >= 0, codes, self.n_stages)
+        to_stage = cols < self.n_stages
+        churn = self.churn[rows]
+
+        delta = np.empty((len(codes), len(cols)))
+        delta[:, to_stage] = add[rows][:, cols[to_stage]] + remove[rows, None]
+        delta[:, ~to_stage] = remove[rows, None]
+        delta += churn[:, cols] - churn[np.arange(len(codes)), current][:, None]
+
+        if constrained:
+            feasible = self.allowed[rows][:, cols[to_stage]]
+            feasible &= ~((codes < 0) & blocked[rows])[:, None]
+            delta[:, to_stage] = np.where(feasible, delta[:, to_stage], np.inf)
+
+        delta[current[:, None] == cols[None, :]] = np.inf
+        return delta
+
+    def descend(self, max_moves):
+        add = self.add_cost()
+        remove = self.remove_cost()
+        blocked = self.blocked()
+        delta = self.deltas(add, remove, blocked)
+        moves = 0
+
+        while moves < max_moves:
+            best = np.argmin(delta)
+            code, column = divmod(best, self.n_stages + 1)
+            if not delta[code, column] < -EPS:
+                break
+
+            old = self.codes[code]
+            stage_id = column if column < self.n_stages else -1
+            self.place(code, stage_id)
+            moves += 1
+
+            # only the two stage columns involved and their assignments change
+            touched = np.array([s for s in (old, stage_id) if s >= 0], dtype=np.int64)
+            add[:, touched] = self.add_cost(touched)
+            rows = np.union1d(np.flatnonzero(np.isin(self.codes, touched)), [code])
+            remove[rows] = self.remove_cost(rows)
+
+            if (old < 0) != (stage_id < 0):
+                now_blocked = self.blocked()
+                rows = np.union1d(rows, np.flatnonzero(now_blocked != blocked))
+                blocked = now_blocked
+
+            delta[:, touched] = self.deltas(add, remove, blocked, cols=touched)
+            delta[rows] = self.deltas(add, remove, blocked, rows=rows)
+
+        return moves
+
+    def objective(self) -> float:
+        error = np.abs(self.zone_gap).sum() + np.abs(self.stage_gap).sum()
+        return float(error + self.churn_weight * (self.codes != self.base).sum())
+
+
+def _build_allocator(load, zone_targets, base, banned, local_pairs, churn_weight) -> _Allocator:
+    allowed = np.ones((len(base), zone_targets.shape[1]), dtype=bool)
+    for mask in banned.values():
+        allowed &= ~mask
+
+    if local_pairs is None:
+        pair_assign = pair_trip = np.empty(0, dtype=np.int64)
+    else:
+        pair_assign, pair_trip = (np.asarray(a, dtype=np.int64) for a in local_pairs)
+    n_trips = int(pair_trip.max()) + 1 if len(pair_trip) else 0
+
+    return _Allocator(
+        load, zone_targets, allowed, base, pair_assign, pair_trip, n_trips, churn_weight
+    )
+
+
+def allocate_stages(
+    load: np.ndarray,
+    zone_targets: np.ndarray,
+    base: np.ndarray,
+    banned: Optional[Dict[str, np.ndarray]] = None,
+    local_pairs: Optional[tuple] = None,
+    churn_weight: float = 1.0,
+    max_moves: Optional[int] = None,
+) -> StageAllocation:
+    """Chooses a stage (or none) for every assignment so the zone x stage MW gets close to 'zone_targets' while changing as few stages as possible against 'base'.
+
+    Parameters:
+    -----------
+    load : ndarray (assignments x zones)
+        MW of every assignment per zone. Columns past the zones of 'zone_targets' (e.g. rows without a zone) only count towards the stage totals.
+    zone_targets : ndarray (zones x stages)
+        Target MW per zone and stage; the stage targets are its column sums.
+    base : ndarray
+        Stage number of every assignment in the reference allocation (-1 for none).
+    banned : dict, optional
+        {constraint name: assignments x stages bool}, True where the constraint forbids the stage.
+    local_pairs : tuple, optional
+        (assignment numbers, local trip numbers) of the assignment / local trip incidence. At most one assignment per local trip gets a stage.
+    churn_weight : float, default=1.0
+        Error in MW worth one stage change against 'base'.
+    """
+    banned = banned or {}
+    allocator = _build_allocator(load, zone_targets, base, banned, local_pairs, churn_weight)
+    allowed, pair_assign, pair_trip = allocator.allowed, allocator.pair_assign, allocator.pair_trip
+    n_assign, n_trips = len(base), allocator.n_trips
+
+    # start from the reference, dropping placements the constraints forbid
+    staged = np.flatnonzero(base >= 0)
+    forced = {
+        name: int(mask[staged, base[staged]].sum()) for name, mask in banned.items()
+    }
+    keep = staged[allowed[staged, base[staged]]]
+
+    # one assignment per local trip, the largest load wins
+    taken = np.zeros(n_trips, dtype=bool)
+    trips_of = pd.Series(pair_trip).groupby(pair_assign).agg(list).to_dict()
+    forced[LOCAL_TRIP] = 0
+    for code in keep[np.argsort(-allocator.total_load[keep], kind="stable")]:
+        trips = trips_of.get(code, [])
+        if taken[trips].any():
+            forced[LOCAL_TRIP] += 1
+            continue
+        taken[trips] = True
+        allocator.place(code, base[code])
+
+    moves = allocator.descend(max_moves if max_moves is not None else 10 * n_assign)
+
+    binding = _binding_constraints(allocator, banned, forced)
+
+    return StageAllocation(
+        codes=allocator.codes.copy(),
+        mw=allocator.zone_gap + zone_targets,
+        stage_mw=allocator.stage_gap + zone_targets.sum(axis=0),
+        objective=allocator.objective(),
+        churn=int((allocator.codes != base).sum()),
+        moves=moves,
+        binding=binding,
+    )
+
+
+def rebalance_stage(
+    load: np.ndarray,
+    zone_targets: np.ndarray,
+    codes: np.ndarray,
+    stage_id: int,
+    zone_id: int,
+    banned: Optional[Dict[str, np.ndarray]] = None,
+    local_pairs: Optional[tuple] = None,
+    move_cost: float = 1.0,
+    max_moves: int = 6,
+    swap_candidates: int = 20,
+) -> StageAllocation:
+    """Proposes a few moves or swaps that bring one zone x stage cell closer to its target, starting from the current stages in 'codes'.
+
+    Only assignments with load in the zone are touched, each at most once, and every move either puts an assignment into 'stage_id' or takes one out of it. A swap exchanges the stages of an assignment in the cell and one outside it, and is tried when no single move improves the error. Moves are checked against 'banned' and the local trips like allocate_stages, so they never create a new conflict. 'move_cost' is the error in MW a move has to save.
+    """
+    allocator = _build_allocator(load, zone_targets, codes, banned or {}, local_pairs, move_cost)
+    allocator.load_state(codes)
+
+    in_zone = np.flatnonzero(allocator.zone_load[:, zone_id] > 0)
+    moves = 0
+
+    while moves < max_moves and len(in_zone):
+        # every assignment moves at most once
+        in_zone = in_zone[allocator.codes[in_zone] == codes[in_zone]]
+
+        blocked = allocator.blocked()
+        delta = allocator.deltas(allocator.add_cost(), allocator.remove_cost(), blocked, rows=in_zone)
+
+        # into the stage from anywhere, or out of it to anywhere
+        involved = allocator.codes[in_zone] == stage_id
+        delta[~involved] = np.where(
+            np.arange(allocator.n_stages + 1) == stage_id, delta[~involved], np.inf
+        )
+
+        best = np.argmin(delta)
+        row, column = divmod(best, allocator.n_stages + 1)
+        if delta[row, column] < -EPS:
+            allocator.place(in_zone[row], column if column < allocator.n_stages else -1)
+            moves += 1
+            continue
+
+        swap = _best_swap(allocator, in_zone[involved], in_zone[~involved], delta, involved, stage_id, blocked, swap_candidates)
+        if swap is None or moves + 2 > max_moves:
+            break
+
+        out_code, in_code = swap
+        allocator.place(out_code, allocator.codes[in_code])
+        allocator.place(in_code, stage_id)
+        moves += 2
+
+    return StageAllocation(
+        codes=allocator.codes.copy(),
+        mw=allocator.zone_gap + zone_targets,
+        stage_mw=allocator.stage_gap + zone_targets.sum(axis=0),
+        objective=allocator.objective(),
+        churn=int((allocator.codes != codes).sum()),
+        moves=moves,
+        binding=None,
+    )
+
+
+def _best_swap(allocator, inside, outside, delta, involved, stage_id, blocked, n_candidates):
+    """Best improving (out, in) pair among the most promising assignments on each side of the cell, or None."""
+    if not len(inside) or not len(outside):
+        return None
+
+    # the cheapest ways out of the stage and into it, as single moves
+    out_rank = delta[involved].min(axis=1)
+    in_rank = delta[~involved][:, stage_id]
+    out_codes = inside[np.argsort(out_rank, kind="stable")[:n_candidates]]
+    in_codes = outside[np.argsort(in_rank, kind="stable")[:n_candidates]]
+    in_codes = in_codes[np.isfinite(np.sort(in_rank)[:n_candidates])]
+
+    best, best_gain = None, -EPS
+    for out_code in out_codes:
+        for in_code in in_codes:
+            other = allocator.codes[in_code]
+            if other >= 0 and not allocator.allowed[out_code, other]:
+                continue
+            if other < 0 and blocked[in_code]:
+                continue
+
+            cols = [stage_id] + ([other] if other >= 0 else [])
+            before = allocator.column_error(cols)
+            allocator.place(out_code, other)
+            allocator.place(in_code, stage_id)
+            change = allocator.column_error(cols) - before + 2 * allocator.churn_weight
+            allocator.place(in_code, other)
+            allocator.place(out_code, stage_id)
+
+            if change < best_gain:
+                best, best_gain = (out_code, in_code), change
+
+    return best
+
+
+def _binding_constraints(allocator: _Allocator, banned: Dict, forced: Dict) -> pd.DataFrame:
+    """A constraint is binding when it forbids at least one move that would improve the final allocation."""
+    blocked = allocator.blocked()
+    delta = allocator.deltas(
+        allocator.add_cost(), allocator.remove_cost(), blocked, constrained=False
+    )[:, :-1]
+    improving = delta < -EPS
+
+    blocked &= allocator.codes < 0
+    masks = dict(banned)
+    masks[LOCAL_TRIP] = np.broadcast_to(blocked[:, None], improving.shape)
+
+    rows = []
+    for name, mask in masks.items():
+        hit = improving & mask
+        rows.append(
+            {
+                "Constraint": name,
+                "Binding": bool(hit.any()),
+                "Blocked Moves": int(hit.sum()),
+                "Assignments": int(hit.any(axis=1).sum()),
+                "Best Blocked Gain (MW)": float(-delta[hit].min()) if hit.any() else 0.0,
+                "Base Changes Forced": forced.get(name, 0),
+            }
+        )
+
+    return pd.DataFrame(rows)
+
+
+def stage_summary(allocation: StageAllocation, zone_targets: np.ndarray, stages: List) -> pd.DataFrame:
+    """Target vs allocated MW per stage."""
+    target = zone_targets.sum(axis=0)
+    allocated = allocation.stage_mw
+
+    return pd.DataFrame(
+        {
+            "Stage": stages,
+            "Target (MW)": target,
+            "Allocated (MW)": allocated,
+            "Gap (MW)": allocated - target,
+        }
+    )
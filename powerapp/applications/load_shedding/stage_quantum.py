@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+
+class StageQuantum:
+    """Zone x stage MW matrix of a simulated assignment frame.
+
+    The load and row count of every (assignment, zone) pair of the candidate frame are computed once. Moving an assignment to another stage then subtracts its zone vector from the old stage column and adds it to the new one, so edits never regroup the candidate frame. Zones are kept in first-seen order with candidate rows without a zone in the last row of the matrix.
+    """
+
+    def __init__(
+        self,
+        raw_candidate: pd.DataFrame,
+        assignments: Iterable,
+        stage_col: str,
+        assignment_col: str = "assignment_id",
+        zone_col: str = "zone",
+        load_col: str = "Load (MW)",
+        frame_assignment_col: str = "Assignment",
+    ):
+        self.stage_col = stage_col
+        self.frame_assignment_col = frame_assignment_col
+        self.assignment_col = assignment_col
+        self.zone_col = zone_col
+        self.load_col = load_col
+
+        self.assignments = pd.Index(assignments)
+        self.n_rows = len(raw_candidate)
+
+        zone_codes, zones = pd.factorize(raw_candidate[zone_col])
+        self.zones: List = list(zones)
+        n_zones = len(self.zones) + 1
+        zone_codes = np.where(zone_codes < 0, len(self.zones), zone_codes)
+
+        # candidate rows of assignments outside the simulator never get a stage
+        assign_codes = self.assignments.get_indexer(raw_candidate[assignment_col])
+        known = assign_codes >= 0
+        cells = assign_codes[known] * n_zones + zone_codes[known]
+        size = len(self.assignments) * n_zones
+
+        loads = raw_candidate[load_col].to_numpy(dtype=float)[known]
+        self.load = np.bincount(
+            cells, weights=np.nan_to_num(loads), minlength=size
+        ).reshape(-1, n_zones)
+        self.count = np.bincount(cells, minlength=size).reshape(-1, n_zones)
+
+        self.stages: List = []
+        self.stage_ids: Dict = {}
+        self.mw = np.zeros((n_zones, 0))
+        self.rows = np.zeros((n_zones, 0), dtype=np.int64)
+
+        self.frame: Optional[pd.DataFrame] = None
+        self.positions = np.empty(0, dtype=np.int64)
+        self.codes = np.full(len(self.assignments), -1, dtype=np.int64)
+
+    @property
+    def empty(self) -> bool:
+        return self.n_rows == 0
+
+    def _stage_id(self, stage) -> int:
+        if pd.isna(stage):
+            return -1
+
+        stage_id = self.stage_ids.get(stage)
+        if stage_id is None:
+            stage_id = len(self.stages)
+            self.stage_ids[stage] = stage_id
+            self.stages.append(stage)
+            self.mw = np.column_stack([self.mw, np.zeros(len(self.mw))])
+            self.rows = np.column_stack([self.rows, np.zeros(len(self.rows), dtype=np.int64)])
+
+        return stage_id
+
+    def apply(self, frame: pd.DataFrame, changed: Optional[Iterable] = None) -> "StageQuantum":
+        """Brings the matrix in line with the stages of 'frame'. 'changed' lists the assignments edited since the last call when 'frame' still has the rows of the last frame; otherwise the whole frame is read."""
+        if changed is not None and self.frame is not None and len(frame) == len(self.frame):
+            self._update(frame, changed)
+        elif frame is not self.frame:
+            self._evaluate(frame)
+
+        self.frame = frame
+        return self
+
+    def _evaluate(self, frame: pd.DataFrame):
+        assign_codes = self.assignments.get_indexer(frame[self.frame_assignment_col])
+        known = assign_codes >= 0
+
+        self.positions = np.full(len(self.assignments), -1, dtype=np.int64)
+        self.positions[assign_codes[known]] = np.flatnonzero(known)
+
+        stage_codes, stages = pd.factorize(frame[self.stage_col])
+        stage_ids = np.array([self._stage_id(stage) for stage in stages] + [-1], dtype=np.int64)
+
+        self.codes = np.full(len(self.assignments), -1, dtype=np.int64)
+        self.codes[assign_codes[known]] = stage_ids[stage_codes[known]]
+
+        staged = self.codes >= 0
+        self.mw = np.zeros_like(self.mw)
+        self.rows = np.zeros_like(self.rows)
+        # zone x stage sums of every staged assignment in one pass
+        np.add.at(self.mw.T, self.codes[staged], self.load[staged])
+        np.add.at(self.rows.T, self.codes[staged], self.count[staged])
+
+    def _update(self, frame: pd.DataFrame, changed: Iterable):
+        codes = self.assignments.get_indexer(list(changed))
+        codes = codes[codes >= 0]
+        codes = codes[self.positions[codes] >= 0]
+
+        stage_values = frame[self.stage_col].to_numpy(dtype=object)
+
+        for code in codes:
+            self.move(code, self._stage_id(stage_values[self.positions[code]]))
+
+    def move(self, code: int, stage_id: int):
+        """Moves assignment number 'code' to stage number 'stage_id' (-1 for no stage)."""
+        old = self.codes[code]
+        if old == stage_id:
+            return
+
+        if old >= 0:
+            self.mw[:, old] -= self.load[code]
+            self.rows[:, old] -= self.count[code]
+            # an emptied cell is exactly zero, not the subtraction residue
+            self.mw[self.rows[:, old] == 0, old] = 0.0
+        if stage_id >= 0:
+            self.mw[:, stage_id] += self.load[code]
+            self.rows[:, stage_id] += self.count[code]
+
+        self.codes[code] = stage_id
+
+    def by_stage(self, with_unzoned: bool = True) -> pd.DataFrame:
+        """[stage, MW] per stage holding candidate rows, sorted by stage like groupby(stage)."""
+        zones = slice(None) if with_unzoned else slice(0, len(self.zones))
+        mw = self.mw[zones].sum(axis=0)
+        present = self.rows[zones].sum(axis=0) > 0
+
+        df = pd.DataFrame(
+            {
+                self.stage_col: np.array(self.stages, dtype=object)[present],
+                self.load_col: mw[present],
+            }
+        )
+
+        return df.sort_values(self.stage_col, kind="stable", ignore_index=True)
+
+    def by_zone_stage(self) -> pd.DataFrame:
+        """[zone, stage, MW] per zone and stage holding candidate rows, sorted like groupby([zone, stage])."""
+        zone_ids, stage_ids = np.nonzero(self.rows[:len(self.zones)] > 0)
+
+        df = pd.DataFrame(
+            {
+                self.zone_col: np.array(self.zones, dtype=object)[zone_ids],
+                self.stage_col: np.array(self.stages, dtype=object)[stage_ids],
+                self.load_col: self.mw[zone_ids, stage_ids],
+            }
+        )
+
+        return df.sort_values([self.zone_col, self.stage_col], kind="stable", ignore_index=True)
+
+    def stage_mw(self, stage) -> float:
+        """MW of 'stage' over the zoned candidate rows."""
+        stage_id = self.stage_ids.get(stage)
+        return 0.0 if stage_id is None else float(self.mw[:len(self.zones), stage_id].sum())
+
+    def zone_stage_mw(self, zone, stage) -> float:
+        stage_id = self.stage_ids.get(stage)
+        if stage_id is None or zone not in self.zones:
+            return 0.0
+        return float(self.mw[self.zones.index(zone), stage_id])
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+PMU_VOLTAGE_COL = "V1 Magnitude"
+
+
+def synthetic_voltage_traces(
+    times: np.ndarray,
+    dip_pu: np.ndarray,
+    settled_pu: np.ndarray,
+    recovery_time: np.ndarray,
+) -> np.ndarray:
+    """(groups x times) voltage in pu that falls to 'dip_pu' at t = 0 and recovers exponentially towards 'settled_pu' with time constant 'recovery_time'."""
+    dip_pu, settled_pu, recovery_time = (
+        np.asarray(a, dtype=float)[:, None] for a in (dip_pu, settled_pu, recovery_time)
+    )
+    elapsed = np.maximum(np.asarray(times, dtype=float), 0.0)[None, :]
+    trace = settled_pu + (dip_pu - settled_pu) * np.exp(-elapsed / np.maximum(recovery_time, 1e-6))
+
+    # pre-event samples sit at 1 pu
+    return np.where(np.asarray(times)[None, :] < 0, 1.0, trace)
+
+
+def pmu_voltage_trace(
+    df: pd.DataFrame,
+    time_col: Optional[str] = None,
+    sample_rate: float = 50.0,
+    base_samples: int = 10,
+):
+    """(seconds, pu) of a PMU 'V1 Magnitude' trace. The pu base is the median of the first 'base_samples' readings and time starts at the first sample; without a time column the samples are spaced at 'sample_rate' per second."""
+    if PMU_VOLTAGE_COL not in df.columns:
+        raise ValueError(f"Missing required column: {PMU_VOLTAGE_COL}")
+
+    magnitude = pd.to_numeric(df[PMU_VOLTAGE_COL], errors="coerce")
+    keep = magnitude.notna().to_numpy()
+    magnitude = magnitude.to_numpy(dtype=float)[keep]
+    if not len(magnitude):
+        raise ValueError(f"No readings in column: {PMU_VOLTAGE_COL}")
+
+    if time_col:
+        stamps = pd.to_datetime(df[time_col], errors="coerce").to_numpy()[keep]
+        seconds = (stamps - stamps[0]) / np.timedelta64(1, "s")
+    else:
+        seconds = np.arange(len(magnitude), dtype=float) / sample_rate
+
+    base = np.median(magnitude[:base_samples])
+    return np.asarray(seconds, dtype=float), magnitude / base
+
+
+class VoltageResults:
+    """Outcome of UVLSResponse.simulate.
+
+    'trip_time' is per assignment (NaN when it holds), 'shed_mw' the (stages x times) MW shed by each stage up to every sample.
+    """
+
+    def __init__(self, stages, times, trip_time, assign_stage, assign_mw, shed_mw):
+        self.stages = stages
+        self.times = times
+        self.trip_time = trip_time
+        self.assign_stage = assign_stage
+        self.assign_mw = assign_mw
+        self.shed_mw = shed_mw
+
+    def summary(self) -> pd.DataFrame:
+        tripped = ~np.isnan(self.trip_time)
+        staged = self.assign_stage >= 0
+        rows = []
+
+        for stage_id, stage in enumerate(self.stages):
+            in_stage = staged & (self.assign_stage == stage_id)
+            hit = in_stage & tripped
+            rows.append(
+                {
+                    "Stage": stage,
+                    "Assignments": int(in_stage.sum()),
+                    "Tripped": int(hit.sum()),
+                    "Shed (MW)": self.assign_mw[hit].sum(),
+                    "First Trip (s)": self.trip_time[hit].min() if hit.any() else np.nan,
+                    "Last Trip (s)": self.trip_time[hit].max() if hit.any() else np.nan,
+                }
+            )
+
+        return pd.DataFrame(rows)
+
+
+class UVLSResponse:
+    """Time-delayed UVLS stage tripping on given voltage trajectories.
+
+    An assignment trips once the voltage of one of its groups (zones or substations) has stayed at or below its stage voltage for the stage delay plus the breaker time. The trajectories are taken as given, shedding does not feed back into them. Timers are evaluated for every (group, stage, sample) at once.
+    """
+
+    def __init__(self, settings: pd.DataFrame, breaker_time: float = 0.1):
+        self.stages: List = settings.columns.tolist()
+        self.voltage = pd.to_numeric(settings.loc["voltage"], errors="coerce").to_numpy(dtype=float)
+        self.delay = pd.to_numeric(settings.loc["delay"], errors="coerce").to_numpy(dtype=float)
+        self.breaker_time = breaker_time
+
+    def trip_times(self, times: np.ndarray, voltage: np.ndarray, threshold: np.ndarray, pickup: np.ndarray) -> np.ndarray:
+        """First time each row of 'voltage' (rows x times) has been at or below 'threshold' for 'pickup' seconds, NaN if never. A sample holds until the next one; the last sample ends the trace."""
+        times = np.asarray(times, dtype=float)
+        below = voltage <= threshold[:, None]
+        n_times = len(times)
+
+        # start of the current run below the threshold, the sample after the latest one above it
+        index = np.arange(n_times, dtype=np.int32)
+        start_index = np.where(below, np.int32(0), index + 1)
+        np.maximum.accumulate(start_index, axis=1, out=start_index)
+        run_start = times[np.minimum(start_index, n_times - 1)]
+
+        # a run lasts until the next sample, so a pickup can run out between two samples
+        run_end = np.append(times[1:], times[-1:])
+        picked = below & (run_end - run_start >= pickup[:, None])
+        first = np.argmax(picked, axis=1)
+        rows = np.arange(len(voltage))
+
+        return np.where(picked[rows, first], run_start[rows, first] + pickup, np.nan)
+
+    def simulate(
+        self,
+        times: np.ndarray,
+        group_voltage: np.ndarray,
+        group_pairs: tuple,
+        assign_stage: np.ndarray,
+        assign_mw: np.ndarray,
+    ) -> VoltageResults:
+        """Trip time of every assignment, where 'group_voltage' is (groups x times) pu, 'group_pairs' the (assignment numbers, group rows) of the assignment / group incidence and 'assign_stage' the stage number of every assignment (-1 for none). An assignment spanning several groups trips with the first of them."""
+        times = np.asarray(times, dtype=float)
+        pair_assign, pair_group = (np.asarray(a, dtype=np.int64) for a in group_pairs)
+        assign_stage = np.asarray(assign_stage, dtype=np.int64)
+        assign_mw = np.nan_to_num(np.asarray(assign_mw, dtype=float))
+
+        pair_stage = assign_stage[pair_assign]
+        active = np.flatnonzero(pair_stage >= 0)
+
+        # pairs of the same group and stage share one timer
+        timers, timer_of = np.unique(
+            np.stack([pair_group[active], pair_stage[active]]), axis=1, return_inverse=True
+        )
+        group, stage = timers
+
+        pair_trip = self.trip_times(
+            times,
+            np.asarray(group_voltage, dtype=float)[group],
+            self.voltage[stage],
+            self.delay[stage] + self.breaker_time,
+        )[timer_of.ravel()]
+
+        trip_time = np.full(len(assign_stage), np.nan)
+        np.fmin.at(trip_time, pair_assign[active], pair_trip)
+
+        # MW shed per stage up to every sample
+        tripped = np.flatnonzero(~np.isnan(trip_time))
+        sample = np.searchsorted(times, trip_time[tripped], side="left")
+        shed = np.zeros((len(self.stages), len(times) + 1))
+        np.add.at(shed, (assign_stage[tripped], sample), assign_mw[tripped])
+
+        return VoltageResults(
+            stages=self.stages,
+            times=times,
+            trip_time=trip_time,
+            assign_stage=assign_stage,
+            assign_mw=assign_mw,
+            shed_mw=np.cumsum(shed, axis=1)[:, :-1],
+        )
@@ -0,0 +1,76 @@
+# Benchmark of groupby_agg against the per-group lambda joins it replaced.
+# Run from the powerapp folder: python -m debug.bench_unique_join
+import time
+import numpy as np
+import pandas as pd
+
+from applications.load_shedding.helper import (
+    groupby_agg,
+    UNIQUE_JOIN,
+    UNIQUE_JOIN_NON_EMPTY,
+)
+from pages.load_shedding.helper import join_unique_non_empty
+
+N_ROWS = 200_000
+N_ASSIGNMENTS = 20_000
+
+
+def synthetic_masterlist(n_rows: int = N_ROWS, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    assignment = rng.integers(0, N_ASSIGNMENTS, n_rows)
+    stages = np.array(["stage_1", "stage_2", "stage_3", "stage_4", "", None], dtype=object)
+
+    return pd.DataFrame(
+        {
+            "assignment_id": [f"A{a:05d}" for a in assignment],
+            "mnemonic": [f"S{a // 4:04d}" for a in assignment],
+            "zone": rng.choice(["NORTH", "SOUTH", "EAST", "WEST"], n_rows),
+            "feeder_id": [f"F{v}" for v in rng.integers(0, 60_000, n_rows)],
+            "breaker_id": [f"B{v}" for v in rng.integers(0, 60_000, n_rows)],
+            "ufls_2025": rng.choice(stages, n_rows),
+            "uvls_2025": rng.choice(stages, n_rows),
+            "Load (MW)": rng.random(n_rows) * 10,
+        }
+    )
+
+
+def timed(func, repeat: int = 3):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    df = synthetic_masterlist()
+    group_cols = ["assignment_id", "mnemonic"]
+    lambda_join = lambda x: ", ".join(x.astype(str).unique())
+
+    cases = {
+        "unique join": (
+            {"Load (MW)": "sum", "feeder_id": lambda_join, "breaker_id": lambda_join},
+            {"Load (MW)": "sum", "feeder_id": UNIQUE_JOIN, "breaker_id": UNIQUE_JOIN},
+        ),
+        "unique join non empty": (
+            {"ufls_2025": join_unique_non_empty, "uvls_2025": join_unique_non_empty, "zone": join_unique_non_empty},
+            {"ufls_2025": UNIQUE_JOIN_NON_EMPTY, "uvls_2025": UNIQUE_JOIN_NON_EMPTY, "zone": UNIQUE_JOIN_NON_EMPTY},
+        ),
+    }
+
+    print(f"{len(df)} rows, {df.groupby(group_cols).ngroups} groups")
+
+    for name, (old_agg, new_agg) in cases.items():
+        t_old, old = timed(
+            lambda: df.groupby(group_cols, as_index=False, dropna=False).agg(old_agg), repeat=1
+        )
+        t_new, new = timed(lambda: groupby_agg(df, group_cols, new_agg, as_index=False))
+
+        pd.testing.assert_frame_equal(old, new)
+        print(f"{name:<24} lambda {t_old:7.3f}s  groupby_agg {t_new:7.3f}s  x{t_old / t_new:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
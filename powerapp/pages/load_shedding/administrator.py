@@ -9,6 +9,7 @@ def update_meta():
 
     ls_obj = st.session_state["loadshedding"]
     subsmeta_container = st.container()
+    cache_container = st.container()
 
     if ls_obj is None:
         st.warning("Please upload a load profile to access administrator features.")
@@ -46,3 +47,12 @@ def update_meta():
             gm_subzone = subs_meta["gm_subzone"].unique().tolist()
             st.write("GM Subzones in the metadata:", gm_subzone)
             st.write()
+
+    with cache_container:
+        with st.expander("Resident Reference Data", expanded=False):
+            st.caption("Reference workbooks loaded by this session (loaded on first use, shared across sessions).")
+            st.dataframe(ls_obj.resident_datasets(), hide_index=True, width="stretch")
+
+        with st.expander("Derived Data Cache", expanded=False):
+            st.caption("Hit/miss counts of the memoized LoadShedding frames for this session.")
+            st.dataframe(ls_obj.memo_stats(), hide_index=True, width="stretch")
@@ -8,6 +8,7 @@ from collections import defaultdict
 from applications.load_shedding.load_profile import (
     load_profile_metric,
 )
+from applications.load_shedding.helper import groupby_agg, UNIQUE_JOIN
 
 
 def display_ls_metrics(scheme, df, load_profile):
@@ -90,6 +91,13 @@ def show_temporary_message(message_type, message, duration=3):
     placeholder.empty()
 
 
+def persist_widget_state(keys=(), prefixes=()):
+    """Re-commits widget values to session state. Streamlit drops the state of widgets that are not rendered in a run, so views that are not currently shown would otherwise lose their selections."""
+    for key in list(st.session_state.keys()):
+        if key in keys or str(key).startswith(tuple(prefixes)):
+            st.session_state[key] = st.session_state[key]
+
+
 def find_latest_assignment(ls_scheme_list):
     # Filter: remove items with extra characters after numbers
     pattern = r"^(\w+)_(\d+)$"  # word_numbers (nothing after numbers)
@@ -197,15 +205,15 @@ def process_display_data(
         "dp_type",
     ]
     agg_map = {
-        "Zone": lambda x: ", ".join(x.astype(str).unique()),
-        "Subzone": lambda x: ", ".join(x.astype(str).unique()),
-        "State": lambda x: ", ".join(x.astype(str).unique()),
-        "Breaker(s)": lambda x: ", ".join(x.astype(str).unique()),
-        "Feeder Assignment": lambda x: ", ".join(x.astype(str).unique()),
-        "Voltage Level": lambda x: ", ".join(x.astype(str).unique()),
+        "Zone": UNIQUE_JOIN,
+        "Subzone": UNIQUE_JOIN,
+        "State": UNIQUE_JOIN,
+        "Breaker(s)": UNIQUE_JOIN,
+        "Feeder Assignment": UNIQUE_JOIN,
+        "Voltage Level": UNIQUE_JOIN,
     }
 
-    return df_merged.groupby(group_cols, as_index=False, dropna=False).agg(agg_map)
+    return groupby_agg(df_merged, group_cols, agg_map, as_index=False)
 
 # def remove_duplicates_keep_nan(df, columns):
 #     is_duplicate = df[columns].duplicated()
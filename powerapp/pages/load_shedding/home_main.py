@@ -8,6 +8,75 @@ from pages.load_shedding.tab3_analytics import ls_analytics_main
 from pages.load_shedding.tab4_simulator import simulator
 from pages.load_shedding.tab5_critical_list import critical_list_main
 from pages.load_shedding.administrator import update_meta
+from pages.load_shedding.helper import persist_widget_state
+
+
+# only the selected view is executed on a rerun
+LS_VIEWS = {
+    "Load Profile": loadprofile_main,
+    "Assignments": ls_assignment_main,
+    "Analytics": ls_analytics_main,
+    "Simulator": simulator,
+    "Critical Load List": critical_list_main,
+    "Administrator": update_meta,
+}
+
+# value widgets of the views, kept alive while their view is hidden
+VIEW_WIDGET_KEYS = (
+    "search_box",
+    "subs_finder",
+    "ls_search",
+    "assign_comparison_ref",
+    "assign_comparison_base",
+    "ls_analytics_scheme",
+    "analytic_flag_scheme",
+    "base_review_year",
+    "sim_review_year",
+    "flaglist_zones",
+    "flaglist_subzones",
+    "flaglist_state",
+    "flaglist_critical_list",
+    "flaglist_search_box",
+)
+VIEW_WIDGET_PREFIXES = (
+    "ls_assign_",
+    "zone_filter_",
+    "subs_search_",
+    "sim_oper_stage_",
+    "simls_colname_",
+    # simulator panels; buttons, uploaders and data editors are read-only in session state
+    "bulk_zone_",
+    "bulk_dp_type_",
+    "bulk_kV_",
+    "bulk_stage_filter_",
+    "bulk_critical_",
+    "bulk_action_",
+    "bulk_target_",
+    "bulk_other_",
+    "bulk_offset_",
+    "auto_assign_churn_",
+    "rebalance_stage_",
+    "rebalance_zone_",
+    "mc_group_",
+    "mc_feeder_sigma_",
+    "mc_samples_",
+    "fr_inertia_",
+    "fr_damping_",
+    "fr_droop_",
+    "fr_governor_",
+    "fr_loss_",
+    "fr_cases_",
+    "sweep_loss_",
+    "sweep_step_",
+    "uvls_group_",
+    "uvls_source_",
+    "uvls_duration_",
+    "uvls_pmu_time_",
+    "uvls_pmu_rate_",
+    "uvls_pmu_groups_",
+    "history_checkpoint_name_",
+    "history_checkpoint_pick_",
+)
 
 
 st.set_page_config(layout="wide", page_title="UFLS")
@@ -29,39 +98,34 @@ load_profile_uploader = st.sidebar.file_uploader(
 st.title("Defense Scheme - Load Shedding")
 
 if load_profile_uploader is not None:
-    file_bytes = load_profile_uploader.read()
-    load_file = read_raw_data(file_bytes, load_profile_uploader.name)
-    loadprofile = LoadProfile(load_profile=load_file)
-    st.session_state["loadprofile"] = loadprofile
-    st.session_state["loadshedding"] = LoadShedding(load_df=loadprofile.df)
-
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "Load Profile",
-        "Assignments",
-        "Analytics",
-        "Simulator",
-        "Critical Load List",
-        "Administrator",
-    ])
-
-    with tab1:
-        loadprofile_main()
-
-    with tab2:
-        ls_assignment_main()
-
-    with tab3:
-        ls_analytics_main()
-
-    with tab4:
-        simulator()
-
-    with tab5:
-        critical_list_main()
-
-    with tab6:
-        update_meta()
-    
+    # only re-parse the upload when a different file is selected
+    if st.session_state.get("loadprofile_file_id") != load_profile_uploader.file_id:
+        file_bytes = load_profile_uploader.read()
+        load_file = read_raw_data(file_bytes, load_profile_uploader.name)
+        st.session_state["loadprofile"] = LoadProfile(load_profile=load_file)
+        st.session_state["loadprofile_file_id"] = load_profile_uploader.file_id
+
+    loadprofile = st.session_state["loadprofile"]
+
+    # keep one model per session so its derived frames survive reruns; reference workbooks
+    # come from the process-wide store and are re-read only when changed on disk
+    if st.session_state["loadshedding"] is None:
+        st.session_state["loadshedding"] = LoadShedding(load_df=loadprofile.df)
+    else:
+        st.session_state["loadshedding"].load_profile = loadprofile.df
+        st.session_state["loadshedding"].refresh()
+
+    persist_widget_state(VIEW_WIDGET_KEYS, VIEW_WIDGET_PREFIXES)
+
+    active_view = st.radio(
+        "View",
+        options=list(LS_VIEWS),
+        key="ls_active_view",
+        horizontal=True,
+        label_visibility="collapsed",
+    )
+
+    LS_VIEWS[active_view]()
 
 else:
     st.info("Please upload or set a load profile first.")
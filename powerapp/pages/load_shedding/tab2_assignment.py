@@ -56,8 +56,10 @@ def loadshedding_assignment() -> None:
                 ufls_latest = [
                     ls for ls in latest_assignment if 'ufls' in str(ls).lower()]
 
+                # default set through session state so the selection can persist across views
+                st.session_state.setdefault("ls_assign_scheme", [ufls_latest[0]])
                 schemes = st.multiselect(
-                    "Scheme", options=ls_scheme_cols, default=ufls_latest[0]
+                    "Scheme", options=ls_scheme_cols, key="ls_assign_scheme"
                 )
 
             with zones_input:
@@ -65,6 +67,7 @@ def loadshedding_assignment() -> None:
                     "Zone",
                     options=ls_obj.ls_assignment_masterlist()[
                         "zone"].dropna().unique(),
+                    key="ls_assign_zone",
                 )
 
             with subzone_input:
@@ -73,7 +76,7 @@ def loadshedding_assignment() -> None:
                     "gm_subzone",
                 )
                 subzone = st.multiselect(
-                    label="Grid Maintenace Subzone", options=subzone_list
+                    label="Grid Maintenace Subzone", options=subzone_list, key="ls_assign_subzone"
                 )
 
             with state_input:
@@ -85,6 +88,7 @@ def loadshedding_assignment() -> None:
                 state = st.multiselect(
                     label="State",
                     options=state_list,
+                    key="ls_assign_state",
                 )
 
             with oper_stg_input:
@@ -94,7 +98,8 @@ def loadshedding_assignment() -> None:
                         stage_opts = ls_obj.uvls_setting.columns.tolist()
                     elif schemes[0] == "EMLS":
                         stage_opts = []
-                stages = st.multiselect("Operating Stage", options=stage_opts)
+                stages = st.multiselect(
+                    "Operating Stage", options=stage_opts, key="ls_assign_stage")
 
             with dp_input:
                 dp_type_list = (
@@ -104,6 +109,7 @@ def loadshedding_assignment() -> None:
                 dp_type = st.multiselect(
                     label="Tripping Assignment",
                     options=dp_type_list,
+                    key="ls_assign_dp_type",
                 )
 
             filters = {
@@ -127,7 +133,9 @@ def loadshedding_assignment() -> None:
                 search_query = st.text_input(
                     "Search", placeholder="Enter keyword...", key="ls_search"
                 )
-                searched_df = df_search_filter(filtered_data, search_query)
+                searched_df = df_search_filter(
+                    filtered_data, search_query, base=ls_obj.searchable_masterlist()
+                )
 
         # Data Display
         with table_container:
@@ -37,8 +37,10 @@ def ls_analytics():
             ufls_latest = [
                 ls for ls in latest_assignment if 'ufls' in str(ls).lower()]
 
+            # default set through session state so the selection can persist across views
+            st.session_state.setdefault("ls_analytics_scheme", [ufls_latest[0]])
             schemes = st.multiselect(
-                "Scheme", options=ls_scheme_cols, default=ufls_latest[0], key="ls_analytics_scheme"
+                "Scheme", options=ls_scheme_cols, key="ls_analytics_scheme"
             )
 
         filters = {
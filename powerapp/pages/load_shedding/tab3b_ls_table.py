@@ -1,5 +1,10 @@
 import streamlit as st
-from applications.load_shedding.helper import scheme_col_sorted
+from applications.load_shedding.helper import (
+    scheme_col_sorted,
+    groupby_agg,
+    UNIQUE_JOIN,
+    UNIQUE_JOIN_NON_EMPTY,
+)
 from pages.load_shedding.helper import custom_table, find_latest_assignment
 
 
@@ -40,13 +45,16 @@ def ls_table(df, scheme):
         #     table_title=f"{scheme} Operating Staging and Load Quantum Table:", table_content=html_ls_table)
 
     with c2:
-        flaglist_table = flaglist[["assignment_id", scheme, "mnemonic"]].groupby(
+        flaglist_table = groupby_agg(
+            flaglist[["assignment_id", scheme, "mnemonic"]],
             [scheme],
-            as_index=False
-        ).agg({
-            "assignment_id": lambda x: ", ".join(x.astype(str).unique()),
-            "mnemonic": lambda x: ", ".join(x.astype(str).unique()),
-        }).rename(columns={"mnemonic": "Substation(s)", "assignment_id": "Assignments"})[[scheme, "Substation(s)", "Assignments"]]
+            {
+                "assignment_id": UNIQUE_JOIN,
+                "mnemonic": UNIQUE_JOIN,
+            },
+            as_index=False,
+            dropna=True,
+        ).rename(columns={"mnemonic": "Substation(s)", "assignment_id": "Assignments"})[[scheme, "Substation(s)", "Assignments"]]
 
         flaglist_table = scheme_col_sorted(flaglist_table, scheme)
         
@@ -76,12 +84,10 @@ def ls_table(df, scheme):
         group_keys = ["assignment_id", "mnemonic"]
         all_cols = list(group_keys + scheme_cols)
 
-        agg_dict = {col: join_unique_non_empty for col in scheme_cols}
+        agg_dict = {col: UNIQUE_JOIN_NON_EMPTY for col in scheme_cols}
 
-        selected_df = (
-            masterlist[all_cols]
-            .groupby(group_keys, as_index=False, dropna=False)
-            .agg(agg_dict)
+        selected_df = groupby_agg(
+            masterlist[all_cols], group_keys, agg_dict, as_index=False
         )
 
         selected_df = selected_df.loc[selected_df[scheme].notna()]
@@ -104,7 +110,3 @@ def ls_table(df, scheme):
         # custom_table(
         #     table_title=f"{scheme} Overlaps With Other Load Shedding Table:", table_content=html_overlap_ls_table)
 
-
-def join_unique_non_empty(series):
-    unique_vals = [str(v) for v in series.dropna().unique() if str(v).strip() != ""]
-    return ", ".join(unique_vals) if unique_vals else None
@@ -1,7 +1,8 @@
 import streamlit as st
 import numpy as np
-from pages.load_shedding.helper import find_latest_assignment, join_unique_non_empty
-from pages.load_shedding.tab4_simulator import display_conflicts, potential_ls_candidate
+from applications.load_shedding.helper import groupby_agg, UNIQUE_JOIN_NON_EMPTY
+from pages.load_shedding.helper import find_latest_assignment
+from pages.load_shedding.tab4_simulator import display_conflicts
 from pages.load_shedding.tab4a_sim_conflict import raise_flags
 
 
@@ -18,7 +19,7 @@ def ls_assignment_flag():
         return
 
     master_df = ls_obj.ls_assignment_masterlist().copy()
-    df_raw_cand, _, _ = potential_ls_candidate(ls_obj)
+    df_raw_cand, _, _ = ls_obj.potential_ls_candidate()
 
     scheme_cols = [
         c for c in master_df.columns if any(k in c for k in ls_obj.LOADSHED_SCHEME)
@@ -56,11 +57,11 @@ def ls_assignment_flag():
         ]
         sum_cols = ["Load (MW)"]
 
-        agg_dict = {col: join_unique_non_empty for col in join_cols} | {
+        agg_dict = {col: UNIQUE_JOIN_NON_EMPTY for col in join_cols} | {
             col: "sum" for col in sum_cols
         }
 
-        df = master_df.groupby(grp_cols, dropna=False).agg(agg_dict).reset_index()
+        df = groupby_agg(master_df, grp_cols, agg_dict, as_index=False)
 
         df = df.rename(columns={"assignment_id": "Assignment", "zone": "Zone"})
         df["Critical Subs"] = np.where(df["critical_list"].isna(), "No", "Yes")
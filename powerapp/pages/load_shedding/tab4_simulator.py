@@ -2,24 +2,53 @@ import re
 import pandas as pd
 import numpy as np
 import streamlit as st
-from pages.load_shedding.helper import join_unique_non_empty
+from applications.load_shedding.helper import (
+    groupby_agg,
+    UNIQUE_JOIN,
+    UNIQUE_JOIN_NON_EMPTY,
+)
 from pages.load_shedding.tab4b_sim_dashboard import sim_dashboard
-from pages.load_shedding.tab4a_sim_conflict import conflict_assignment
+from pages.load_shedding.tab4a_sim_conflict import ConflictEngine
 from pages.load_shedding.tab4c_sim_save import save_sim_data, col_sim_validation
+from pages.load_shedding.tab4d_sim_autoassign import (
+    auto_assign_panel,
+    rebalance_panel,
+)
+from pages.load_shedding.tab4e_sim_history import (
+    sim_history,
+    history_panel,
+    reset_to_base_reference,
+    reset_to_empty_sim_df,
+    undo_sim_edit,
+    redo_sim_edit,
+)
+from pages.load_shedding.tab4f_sim_store import open_simulation, store_usage_panel
+from pages.load_shedding.tab4g_sim_bulk import bulk_edit_panel
+from pages.load_shedding.tab4h_sim_compare import compare_schemes_panel
+from pages.load_shedding.tab4i_sim_uncertainty import load_uncertainty_panel
+from pages.load_shedding.tab4j_sim_frequency import frequency_response_panel
+from pages.load_shedding.tab4k_sim_uvls import uvls_response_panel
 from applications.load_shedding.helper import scheme_col_sorted
+from applications.load_shedding.stage_quantum import StageQuantum
+from applications.data_processing.frame_cache import frame_cached
 from css.streamlit_css import custom_metric, custom_metric_two_line, scrollable_text_box, custom_metric_one_line
 
 SIM_STAGE = "Sim. Stage"
+CONFLICT_SUBS_COLS = [
+    "mnemonic",
+    "substation_name",
+    "gm_subzone",
+    "zone",
+    "state",
+    "critical_list",
+    "short_text",
+]
 
 
 def simulator():
     st.subheader("Load Shedding Assignment Simulator")
 
     input_container = st.container()
-    editor_container = st.container()
-    save_sim_container = st.container()
-    alarm_container = st.container()
-    dashboard_container = st.container()
 
     ls_obj = st.session_state.get("loadshedding")
 
@@ -59,55 +88,23 @@ def simulator():
                 key="sim_review_year"
             )
 
-        master_df_key = f"master_df_key_{base_scheme}_{sim_scheme}"
-        sim_key = f"sim_data_{base_scheme}_{sim_scheme}"
         editor_key = f"sim_editor_{base_scheme}_{sim_scheme}"
         export_sim_key = f"show_export_{base_scheme}_{sim_scheme}"
 
-        df_raw_cand, _, _ = potential_ls_candidate(ls_obj)
+        df_raw_cand, _, _ = ls_obj.potential_ls_candidate()
 
         if export_sim_key not in st.session_state:
             st.session_state[export_sim_key] = False
 
-        if master_df_key not in st.session_state:
-
-            st.session_state[master_df_key] = {
-                "raw_candidate": df_raw_cand,
-                "master_df": generate_sim_df(df_raw_cand, base_scheme, sim_scheme),
-            }
-
-        raw_candidate = st.session_state[master_df_key]["raw_candidate"]
-        master_df = st.session_state[master_df_key]["master_df"]
-
-        if sim_key not in st.session_state:
-            st.session_state[sim_key] = {
-                "sim_df": master_df.copy(),
-                "last_editor_state": {},
-            }
-
-        sim_data = st.session_state[sim_key]
-        sim_df = sim_data["sim_df"]
-
-        current_editor_state = st.session_state.get(editor_key, {})
-        last_editor_state = sim_data.get("last_editor_state", {})
-
-        current_edits = current_editor_state.get("edited_rows", {})
-        last_edits = last_editor_state.get("edited_rows", {})
-
-        if current_edits != last_edits:
-            if current_edits:
-                sim_df = update_sim_df_from_editor(
-                    sim_df, current_editor_state, base_scheme
-                )
-
-            sim_data["last_editor_state"] = current_editor_state.copy()
-            st.session_state[export_sim_key] = False
-
-        sim_df = conflict_assignment(
-            sim_df, raw_candidate, ls_obj, base_scheme, SIM_STAGE
+        # frames of the combination, rebuilt from its stage codes when it was released
+        master_df_key, sim_key = open_simulation(
+            base_scheme,
+            sim_scheme,
+            df_raw_cand,
+            lambda: generate_sim_df(df_raw_cand, base_scheme, sim_scheme),
         )
 
-        sim_data["sim_df"] = sim_df
+        sim_df = st.session_state[sim_key]["sim_df"]
 
         with filter_zone:
             zone_options = sorted(sim_df["Zone"].dropna().unique())
@@ -131,16 +128,17 @@ def simulator():
                 subs_meta = df_raw_cand.loc[df_raw_cand["assignment_id"] == item]
 
                 if not subs_meta.empty:
-                    df = subs_meta.groupby(
+                    df = groupby_agg(
+                        subs_meta,
                         ["state", "zone", "gm_subzone", "mnemonic",
                             "dp_type", "kV", "substation_name", "coordinate"],
+                        {
+                            "Load (MW)": "sum",
+                            "feeder_id": UNIQUE_JOIN,
+                            "breaker_id": UNIQUE_JOIN,
+                        },
                         as_index=False,
-                        dropna=False
-                    ).agg({
-                        "Load (MW)": "sum",
-                        "feeder_id": lambda x: ", ".join(x.astype(str).unique()),
-                        "breaker_id": lambda x: ", ".join(x.astype(str).unique()),
-                    })
+                    )
 
                 if not df.empty:
                     for _, row in df.iterrows():
@@ -177,13 +175,6 @@ def simulator():
                     font_size="13px"
                 )
 
-        view_df = sim_df.copy()
-        if selected_zones:
-            view_df = view_df[view_df["Zone"].isin(selected_zones)]
-
-        if assignment_id:
-            view_df = view_df[view_df["Assignment"].isin(assignment_id)]
-
         if base_scheme.startswith("UFLS"):
             stage_options = ls_obj.ufls_setting.columns.tolist()
         elif base_scheme.startswith("UVLS"):
@@ -191,13 +182,125 @@ def simulator():
         else:
             stage_options = []
 
-        row_map_key = f"_row_map_{base_scheme}"
-        st.session_state[row_map_key] = (
-            view_df["Assignment"]
-            .reset_index(drop=True)
-            .to_dict()
+    # the conflict view sits above the editor but renders after it, once the edits are applied
+    alarm_container = st.container()
+
+    sim_data = st.session_state[sim_key]
+    sim_data["full_run"] = True
+
+    # edits rerun only the workspace, not the other tabs, the candidate set above or the tools below
+    simulator_workspace(
+        ls_obj,
+        master_df_key,
+        sim_key,
+        editor_key,
+        export_sim_key,
+        base_scheme,
+        stage_options,
+        selected_zones,
+        assignment_id,
+    )
+
+    with alarm_container:
+        conflict_view(sim_key, ls_obj, selected_zones, assignment_id)
+
+    sim_data["full_run"] = False
+
+    simulator_tools(ls_obj, master_df_key, sim_key, base_scheme, stage_options)
+
+
+@st.fragment
+def simulator_workspace(
+    ls_obj,
+    master_df_key,
+    sim_key,
+    editor_key,
+    export_sim_key,
+    base_scheme,
+    stage_options,
+    selected_zones,
+    assignment_id,
+):
+    editor_container = st.container()
+    save_sim_container = st.container()
+    dashboard_container = st.container()
+
+    raw_candidate = st.session_state[master_df_key]["raw_candidate"]
+    master_df = st.session_state[master_df_key]["master_df"]
+
+    sim_data = st.session_state[sim_key]
+    sim_df = sim_data["sim_df"]
+
+    # the editor is replaced whenever the history writes stages, so its edited rows never replay onto them
+    editor_key = f"{editor_key}_{sim_data.get('editor_revision', 0)}"
+    replaced_key = sim_data.get("editor_key")
+    if replaced_key != editor_key:
+        # drop the replaced editor's state with its edited rows; a simulation rebuilt from the
+        # store starts again at revision 0, where a state left from before would replay
+        st.session_state.pop(replaced_key or editor_key, None)
+        sim_data["editor_key"] = editor_key
+
+    current_editor_state = st.session_state.get(editor_key, {})
+    last_editor_state = sim_data.get("last_editor_state", {})
+
+    current_edits = current_editor_state.get("edited_rows", {})
+    last_edits = last_editor_state.get("edited_rows", {})
+
+    edited = None
+    if current_edits != last_edits:
+        if current_edits:
+            edited = list(editor_deltas(current_editor_state, base_scheme, last_editor_state))
+            sim_df = update_sim_df_from_editor(
+                sim_df, current_editor_state, base_scheme,
+                sim_history(sim_key, master_df), last_editor_state,
+            )
+
+        # the widget keeps its edited rows across reruns, only rows that changed since are applied
+        sim_data["last_editor_state"] = {
+            "edited_rows": {row: dict(changes) for row, changes in current_edits.items()}
+        }
+        st.session_state[export_sim_key] = False
+
+    # stages written in place by the panels (rebalance, bulk edit, undo / redo)
+    pending = sim_data.pop("pending_edits", None)
+    if pending:
+        edited = (edited or []) + pending
+        st.session_state[export_sim_key] = False
+
+    # flags are kept per assignment and only re-evaluated for the edited rows
+    if "conflict_engine" not in sim_data:
+        sim_data["conflict_engine"] = ConflictEngine(
+            master_df, raw_candidate, ls_obj.LOADSHED_SCHEME, base_scheme, SIM_STAGE
         )
 
+    sim_df = sim_data["conflict_engine"].apply(sim_df, edited)
+
+    # zone x stage MW, moved cell by cell as stages get edited
+    if "stage_quantum" not in sim_data:
+        sim_data["stage_quantum"] = StageQuantum(
+            raw_candidate, master_df["Assignment"], SIM_STAGE
+        )
+
+    sim_data["stage_quantum"].apply(sim_df, edited)
+
+    sim_data["sim_df"] = sim_df
+    if edited:
+        # the session store measures the combination again on the next full run
+        sim_data["store_dirty"] = True
+
+    view_df = sim_view(sim_df, selected_zones, assignment_id)
+
+    # the conflict view only reruns, with the whole page, when an edit changes the flagged rows it shows
+    if not sim_data.get("full_run") and conflict_token(view_df) != sim_data.get("conflict_token"):
+        st.rerun()
+
+    row_map_key = f"_row_map_{base_scheme}"
+    st.session_state[row_map_key] = (
+        view_df["Assignment"]
+        .reset_index(drop=True)
+        .to_dict()
+    )
+
     with editor_container:
         editor_table, _, metrics = st.columns([3, 0.01, 1.2])
 
@@ -229,8 +332,8 @@ def simulator():
                 },
             )
 
-            colname_input, save, reset, empty = st.columns(
-                [2, 1.5, 1.5, 1.5])
+            colname_input, save, reset, empty, undo, redo = st.columns(
+                [2, 1.5, 1.5, 1.5, 0.7, 0.7])
 
             with colname_input:
                 ls_colname = st.text_input(
@@ -271,58 +374,97 @@ def simulator():
                 st.button(
                     label="🧹 Clear",
                     on_click=reset_to_empty_sim_df,
-                    args=(sim_df, sim_key),
+                    args=(master_df, sim_key),
                     key=f"reset_to_empty_{base_scheme}",
                     width='stretch',
                 )
 
-        with metrics:
-            display_simulation_metrics(
-                sim_df, raw_candidate, ls_obj, base_scheme)
+            history = sim_history(sim_key, master_df)
+            with undo:
+                st.button(
+                    label="↩️",
+                    on_click=undo_sim_edit,
+                    args=(master_df, sim_key),
+                    disabled=not history.can_undo,
+                    key=f"undo_sim_{base_scheme}",
+                    width='stretch',
+                    help="Undo",
+                )
 
-    with alarm_container:
-        display_conflicts(view_df, ls_obj, ref_stage_col=SIM_STAGE)
+            with redo:
+                st.button(
+                    label="↪️",
+                    on_click=redo_sim_edit,
+                    args=(master_df, sim_key),
+                    disabled=not history.can_redo,
+                    key=f"redo_sim_{base_scheme}",
+                    width='stretch',
+                    help="Redo",
+                )
+
+            history_panel(sim_key, master_df, base_scheme)
+
+        with metrics:
+            display_simulation_metrics(sim_key, ls_obj, base_scheme)
 
     with dashboard_container:
-        sim_dashboard(simulator_df=sim_df,
-                      candidate_df=raw_candidate,
-                      scheme=base_scheme[:4])
+        simulation_dashboard(sim_key, base_scheme)
 
 
-def reset_to_empty_sim_df(sim_df, sim_key):
-    cleared_df = sim_df.copy()
-    cleared_df[SIM_STAGE] = None
-    cleared_df["conflict_assignment"] = ""
+def simulator_tools(ls_obj, master_df_key, sim_key, base_scheme, stage_options):
+    """Bulk edit and analysis panels. Each is a fragment of its own, so edits in the workspace do not rerun them and their inputs rerun only the panel."""
+    raw_candidate = st.session_state[master_df_key]["raw_candidate"]
+    master_df = st.session_state[master_df_key]["master_df"]
 
-    st.session_state[sim_key]["sim_df"] = cleared_df
+    bulk_edit_panel(sim_key, raw_candidate, master_df, base_scheme, stage_options)
+    auto_assign_panel(sim_key, master_df, base_scheme, stage_options)
+    rebalance_panel(sim_key, master_df, base_scheme, stage_options)
+    compare_schemes_panel(sim_key, master_df, base_scheme, stage_options)
+    load_uncertainty_panel(sim_key, raw_candidate, master_df, base_scheme, stage_options)
+    frequency_response_panel(sim_key, ls_obj.ufls_setting, master_df, base_scheme, stage_options)
+    uvls_response_panel(sim_key, ls_obj.uvls_setting, raw_candidate, master_df, base_scheme, stage_options)
+    store_usage_panel()
 
 
-def reset_to_base_reference(master_df, sim_key):
-    st.session_state[sim_key]["sim_df"] = master_df.copy()
+def sim_view(sim_df, selected_zones, assignment_id):
+    view_df = sim_df
+    if selected_zones:
+        view_df = view_df[view_df["Zone"].isin(selected_zones)]
 
+    if assignment_id:
+        view_df = view_df[view_df["Assignment"].isin(assignment_id)]
 
-def display_simulation_metrics(sim_df, raw_candidate, ls_obj, base_scheme):
+    return view_df
 
-    load_df = ls_obj.loadprofile_df()
 
-    sim_ls = pd.merge(
-        raw_candidate,
-        sim_df[["Assignment", SIM_STAGE]],
-        left_on="assignment_id",
-        right_on="Assignment",
-        how="left"
-    )
+def conflict_token(view_df):
+    """Identifies the flagged rows shown by the conflict view."""
+    flagged = view_df[view_df["Flag"].str.contains("Warning|Alert", na=False)]
+    return hash(tuple(zip(flagged["Assignment"], flagged[SIM_STAGE].astype(str), flagged["Flag"])))
+
+
+@st.fragment
+def conflict_view(sim_key, ls_obj, selected_zones, assignment_id):
+    view_df = sim_view(st.session_state[sim_key]["sim_df"], selected_zones, assignment_id)
 
-    # Calculate stage quantum
-    stg_quantum = sim_ls.groupby(
-        [SIM_STAGE, "zone"], as_index=False
-    ).agg({"Load (MW)": "sum"})
+    display_conflicts(view_df, ls_obj, ref_stage_col=SIM_STAGE)
+    st.session_state[sim_key]["conflict_token"] = conflict_token(view_df)
+
+
+@st.fragment
+def simulation_dashboard(sim_key, base_scheme):
+    sim_dashboard(stage_quantum=st.session_state[sim_key]["stage_quantum"],
+                  scheme=base_scheme[:4])
+
+
+@st.fragment
+def display_simulation_metrics(sim_key, ls_obj, base_scheme):
+
+    stage_quantum = st.session_state[sim_key]["stage_quantum"]
+    load_df = ls_obj.loadprofile_df()
 
     # Get available stages
-    stage = scheme_col_sorted(
-        sim_ls.loc[sim_ls[SIM_STAGE].notna()],
-        SIM_STAGE
-    )[SIM_STAGE]
+    stage = scheme_col_sorted(stage_quantum.by_stage(), SIM_STAGE)[SIM_STAGE]
 
     # Stage selector
     oper_stage = st.selectbox(
@@ -333,13 +475,7 @@ def display_simulation_metrics(sim_df, raw_candidate, ls_obj, base_scheme):
 
     if oper_stage is not None:
         # Calculate quantum
-        quantum_df = stg_quantum.groupby(
-            [SIM_STAGE], as_index=False
-        ).agg({"Load (MW)": "sum"})
-
-        quantum = quantum_df.loc[quantum_df[SIM_STAGE]
-                                 == oper_stage, "Load (MW)"]
-        quantum_val = quantum.values[0] if not quantum.empty else 0
+        quantum_val = stage_quantum.stage_mw(oper_stage)
 
         # Grid load percentage
         totalMW = load_df["Load (MW)"].sum()
@@ -353,11 +489,8 @@ def display_simulation_metrics(sim_df, raw_candidate, ls_obj, base_scheme):
         )
 
         # st.markdown("**Zone Breakdown:**")
-        for zone in sim_ls["zone"].dropna().unique().tolist():
-            sim_zone = stg_quantum.loc[stg_quantum["zone"] == zone]
-            sim_zone_stg = sim_zone.loc[sim_zone[SIM_STAGE]
-                                        == oper_stage]
-            mw_zone_stg = sim_zone_stg["Load (MW)"].values[0] if not sim_zone_stg.empty else 0
+        for zone in stage_quantum.zones:
+            mw_zone_stg = stage_quantum.zone_stage_mw(zone, oper_stage)
 
             zone_load = ls_obj.zone_load_profile(zone)
             zone_load_pct = (mw_zone_stg / zone_load *
@@ -410,63 +543,6 @@ def display_conflicts(view_df, ls_obj, ref_stage_col):
         st.balloons()
 
 
-def potential_ls_candidate(ls_obj):
-    masterlist = ls_obj.ls_assignment_masterlist().copy()
-    incomer = ls_obj.incomer_relay()
-
-    id_col = incomer["local_trip_id"].fillna("na").astype(str)
-    conditions = [
-        id_col.str.contains("132|275"),
-        id_col.str.contains("230"),
-        id_col.str.contains("11|22|33"),
-        id_col.str.contains("na"),
-    ]
-    choices = ["LPC", "Interconnector", "Local_Load", ""]
-
-    incomer["dp_type"] = np.select(conditions, choices, default="Pocket")
-
-    ls_cols = [
-        col for col in masterlist.columns
-        if str(col).lower().startswith(tuple(k.lower() for k in ls_obj.LOADSHED_SCHEME))
-    ]
-
-    auto_ls_cols = [
-        col for col in ls_cols if not str(col).lower().startswith('emls')
-    ]
-
-    auto_ls_master = masterlist.dropna(subset=auto_ls_cols, how="all")
-    required_cols = ["assignment_id", "local_trip_id", "state", "zone",
-                     "gm_subzone", "mnemonic", "critical_list", "dp_type", 'kV', 'breaker_id', 'substation_name', 'coordinate']
-
-    df_all = pd.merge(
-        auto_ls_master,
-        incomer,
-        on=required_cols + ["Load (MW)", "feeder_id"],
-        how="outer"
-    )
-
-    df_raw_cand = df_all.groupby(
-        ls_cols + required_cols,
-        dropna=False,
-        as_index=False
-    ).agg({
-        "Load (MW)": "sum",
-        "feeder_id": lambda x: ", ".join(x.astype(str).unique())
-    })
-
-    critical_list = df_raw_cand.loc[df_raw_cand["critical_list"].notna()]
-    critical_assign_ids = critical_list["assignment_id"].unique().tolist()
-
-    cand_with_crit = df_raw_cand.loc[df_raw_cand["assignment_id"].isin(
-        critical_assign_ids)]
-
-    cand_without_crit = df_raw_cand.loc[
-        ~df_raw_cand["assignment_id"].isin(critical_assign_ids)
-    ]
-
-    return df_raw_cand, cand_with_crit, cand_without_crit
-
-
 def generate_sim_df(df, base_scheme, sim_scheme):
 
     sim_review_cols = [base_scheme, sim_scheme]
@@ -487,11 +563,11 @@ def generate_sim_df(df, base_scheme, sim_scheme):
 
     agg_dict = {}
     for col in join_cols:
-        agg_dict[col] = join_unique_non_empty
+        agg_dict[col] = UNIQUE_JOIN_NON_EMPTY
     for col in sum_cols:
         agg_dict[col] = "sum"
 
-    df = df.groupby(group_cols, dropna=False).agg(agg_dict).reset_index()
+    df = groupby_agg(df, group_cols, agg_dict, as_index=False)
 
     rename_dict = {
         "zone": "Zone",
@@ -515,24 +591,71 @@ def generate_sim_df(df, base_scheme, sim_scheme):
     return sim_df
 
 
-def update_sim_df_from_editor(sim_df, editor_state, base_scheme):
-    row_map = st.session_state.get(f"_row_map_{base_scheme}", {})
-    edited_rows = editor_state.get("edited_rows", {})
+def assignment_index(sim_df):
+    # the Assignment column is never edited in place, only Sim. Stage is
+    return frame_cached(sim_df, "assignment_index", lambda df: pd.Index(df["Assignment"]))
 
-    if not row_map or not edited_rows:
-        return sim_df
 
-    updated_df = sim_df.copy()
+def editor_deltas(editor_state, base_scheme, last_state=None):
+    row_map = st.session_state.get(f"_row_map_{base_scheme}", {})
+    last_rows = (last_state or {}).get("edited_rows", {})
+    deltas = {}
 
-    for row_idx, changes in edited_rows.items():
+    for row_idx, changes in editor_state.get("edited_rows", {}).items():
+        if last_rows.get(row_idx) == changes:
+            continue
         assignment = row_map.get(row_idx)
         if assignment and SIM_STAGE in changes:
-            updated_df.loc[
-                updated_df["Assignment"] == assignment,
-                SIM_STAGE
-            ] = changes[SIM_STAGE]
-    editor_state["edited_rows"] = {}
-    return updated_df
+            deltas[assignment] = changes[SIM_STAGE]
+
+    return deltas
+
+
+def update_sim_df_from_editor(sim_df, editor_state, base_scheme, history, last_state=None):
+    deltas = editor_deltas(editor_state, base_scheme, last_state)
+
+    if not deltas:
+        return sim_df
+
+    # one positional write into the session frame instead of copy + scan per edit
+    positions = assignment_index(sim_df).get_indexer(list(deltas))
+    stages = np.array(list(deltas.values()), dtype=object)
+    found = positions >= 0
+
+    # logged for undo / redo, cells already at the new stage are left out
+    label = (
+        f"Edit {next(iter(deltas))} → {next(iter(deltas.values()))}"
+        if len(deltas) == 1 else f"Edit {len(deltas)} assignments"
+    )
+    entry = history.record(label, positions[found], stages[found])
+    if entry is not None:
+        sim_df.iloc[entry.positions, sim_df.columns.get_loc(SIM_STAGE)] = history.decode(entry.new)
+
+    return sim_df
+
+
+def assignment_substations(ls_assign_mlist):
+    """Substation rows of every assignment for the conflict details, grouped once per masterlist frame instead of per flagged row."""
+
+    def build(df):
+        grouped = groupby_agg(
+            df,
+            ["assignment_id"] + CONFLICT_SUBS_COLS,
+            {
+                "feeder_id": UNIQUE_JOIN,
+                "breaker_id": UNIQUE_JOIN,
+            },
+            as_index=False,
+        )
+        substations = {
+            assignment: rows.drop(columns="assignment_id").reset_index(drop=True)
+            for assignment, rows in grouped.groupby("assignment_id", sort=False)
+        }
+        # assignments missing from the masterlist
+        substations[None] = grouped.iloc[:0].drop(columns="assignment_id")
+        return substations
+
+    return frame_cached(ls_assign_mlist, "conflict_substations", build)
 
 
 def render_conflict_block(rows, ls_assign_mlist, label, ref_stage_col):
@@ -552,26 +675,8 @@ def render_conflict_details(row, assignment, ls_assign_mlist, ref_stage_col):
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        assignment_df = ls_assign_mlist.loc[
-            ls_assign_mlist["assignment_id"] == assignment
-        ]
-
-        subs_name = assignment_df.groupby(
-            [
-                "mnemonic",
-                "substation_name",
-                "gm_subzone",
-                "zone",
-                "state",
-                "critical_list",
-                "short_text",
-            ],
-            as_index=False,
-            dropna=False,
-        ).agg({
-            "feeder_id": lambda x: ", ".join(x.astype(str).unique()),
-            "breaker_id": lambda x: ", ".join(x.astype(str).unique()),
-        })
+        substations = assignment_substations(ls_assign_mlist)
+        subs_name = substations.get(assignment, substations[None])
 
         # Build substation & flag text
         if len(subs_name) == 1:
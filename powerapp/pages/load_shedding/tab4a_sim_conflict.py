@@ -4,6 +4,27 @@ import numpy as np
 import streamlit as st
 from pages.load_shedding.helper import find_latest_assignment
 from collections import defaultdict
+from applications.load_shedding.local_trip import local_trip_incidence
+
+
+NON_OVERLAP_UFLS_STAGES = ["stage_1", "stage_2", "stage_3"]
+CRITICAL_UFLS_STAGES = [
+    "stage_1",
+    "stage_2",
+    "stage_3",
+    "stage_11",
+    "stage_12",
+    "stage_13",
+]
+NONCRITICAL_UFLS_STAGES = [
+    "stage_4",
+    "stage_5",
+    "stage_6",
+    "stage_7",
+    "stage_8",
+    "stage_9",
+    "stage_10",
+]
 
 
 def _join_warning(row):
@@ -11,27 +32,24 @@ def _join_warning(row):
     return "Warning: " + " & ".join(parts)
 
 
+def _overlap_details(subset):
+    return subset.apply(
+        lambda row: "[Overlap] - "
+        + ", ".join(
+            f"{col} ({val})"
+            for col, val in row.dropna().items()
+            if str(val).strip() != ""
+        ),
+        axis=1,
+    )
+
+
 # def raise_flags(df, ls_latest_cols, ref_scheme, SIM_STAGE):
 def raise_flags(df, raw_candidate, ls_latest_cols, ref_scheme, SIM_STAGE):
 
-    nonOverlap_ufls_stages = ["stage_1", "stage_2", "stage_3"]
-    critical_ufls_stages = [
-        "stage_1",
-        "stage_2",
-        "stage_3",
-        "stage_11",
-        "stage_12",
-        "stage_13",
-    ]
-    noncritical_ufls_stages = [
-        "stage_4",
-        "stage_5",
-        "stage_6",
-        "stage_7",
-        "stage_8",
-        "stage_9",
-        "stage_10",
-    ]
+    nonOverlap_ufls_stages = NON_OVERLAP_UFLS_STAGES
+    critical_ufls_stages = CRITICAL_UFLS_STAGES
+    noncritical_ufls_stages = NONCRITICAL_UFLS_STAGES
 
     if "conflict_assignment" not in df.columns:
         df["conflict_assignment"] = ""
@@ -58,15 +76,7 @@ def raise_flags(df, raw_candidate, ls_latest_cols, ref_scheme, SIM_STAGE):
     # 2. Extract Overlap Details
     if overlap.any():
         subset = df.loc[overlap, ls_latest_cols]
-        df.loc[overlap, "conflict_assignment"] = subset.apply(
-            lambda row: "[Overlap] - "
-            + ", ".join(
-                f"{col} ({val})"
-                for col, val in row.dropna().items()
-                if str(val).strip() != ""
-            ),
-            axis=1,
-        )
+        df.loc[overlap, "conflict_assignment"] = _overlap_details(subset)
 
     # 3. Critical Check
     critical_mask = df[SIM_STAGE].isin(critical_ufls_stages) & df[
@@ -85,38 +95,38 @@ def raise_flags(df, raw_candidate, ls_latest_cols, ref_scheme, SIM_STAGE):
     )
 
     if local_conflicts:
-        for assign_id, local_ids in local_conflicts.items():
-            msg = ""
-            value_to_keys = defaultdict(list)
-            for key, values in local_conflicts.items():
-                for val in values:
-                    value_to_keys[val].append(key)
-
-            for value, keys in value_to_keys.items():
-                if len(keys) > 1:
-                    keys_str = " and ".join([f'"{k}"' for k in keys])
-                    msg = (
-                        "[Local Trip Conflict] - "
-                        f"Similar load assignment ({value}) with assignment_id: {keys_str}"
-                    )
-
-            mask = df["Assignment"] == assign_id
-
-            existing = (
-                df.loc[mask, "conflict_assignment"]
-                .fillna("")
-                .str.strip()
-            )
-
-            df.loc[mask, "conflict_assignment"] = np.where(
-                existing.eq(""),
-                msg,
-                np.where(
-                    existing.str.contains(re.escape(msg)),
-                    existing,
-                    existing + " | " + msg
+        value_to_keys = defaultdict(list)
+        for key, values in local_conflicts.items():
+            for val in values:
+                value_to_keys[val].append(key)
+
+        # one message for every conflicting assignment: the last shared local trip
+        msg = ""
+        for value, keys in value_to_keys.items():
+            if len(keys) > 1:
+                keys_str = " and ".join([f'"{k}"' for k in keys])
+                msg = (
+                    "[Local Trip Conflict] - "
+                    f"Similar load assignment ({value}) with assignment_id: {keys_str}"
                 )
+
+        mask = df["Assignment"].isin(list(local_conflicts))
+
+        existing = (
+            df.loc[mask, "conflict_assignment"]
+            .fillna("")
+            .str.strip()
+        )
+
+        df.loc[mask, "conflict_assignment"] = np.where(
+            existing.eq(""),
+            msg,
+            np.where(
+                existing.str.contains(re.escape(msg)),
+                existing,
+                existing + " | " + msg
             )
+        )
 
     # 5. Final Flagging (Vectorized approach)
     flag_warning_mask = critical_mask | overlap
@@ -212,40 +222,256 @@ def detect_local_trip_conflict(
     if active_assignments.empty:
         return {}
 
-    active_raw = raw_candidate[
-        raw_candidate[raw_assignment_col].isin(active_assignments)
-        & raw_candidate[local_trip_col].notna()
-    ]
+    incidence = local_trip_incidence(raw_candidate, raw_assignment_col, local_trip_col)
 
-    if active_raw.empty:
-        return {}
+    return incidence.conflict_map(active_assignments)
 
-    overlapping_local = (
-        active_raw
-        .groupby(local_trip_col)[raw_assignment_col]
-        .nunique()
-        .gt(1)
-    )
 
-    conflict_local_ids = overlapping_local[overlapping_local].index.tolist()
+class ConflictEngine:
+    """Incremental version of conflict_assignment for one simulator frame.
 
-    if not conflict_local_ids:
-        return {}
+    Everything that does not depend on the simulated stage (overlap text, critical substations, the local trips of each assignment) is resolved once from the master frame. Edits then only re-evaluate the edited assignments and the assignments sharing a local trip with them. The Flag / conflict_assignment values written are the ones conflict_assignment returns for the same stages on a fresh frame.
+    """
 
-    conflict_map = {}
-
-    for assign_id, grp in active_raw.groupby(raw_assignment_col):
-        conflicted_ids = (
-            grp.loc[
-                grp[local_trip_col].isin(conflict_local_ids),
-                local_trip_col
-            ]
-            .astype(str)
-            .unique()
-            .tolist()
+    def __init__(
+        self,
+        master_df,
+        raw_candidate,
+        ls_schemes,
+        base_scheme,
+        sim_stage_col,
+        assignment_col="Assignment",
+        raw_assignment_col="assignment_id",
+        local_trip_col="local_trip_id",
+    ):
+        self.sim_stage_col = sim_stage_col
+        self.assignment_col = assignment_col
+        self.ref_scheme = base_scheme[:4]
+        self.enabled = self.ref_scheme in ls_schemes
+        self.frame = None
+
+        if not self.enabled:
+            return
+
+        all_ls_columns = [
+            col for col in master_df.columns
+            if any(col.startswith(scheme) for scheme in ls_schemes)
+        ]
+        lshedding_columns = [
+            col for col in all_ls_columns if not col.startswith(self.ref_scheme)
+        ]
+        ls_latest_cols = find_latest_assignment(lshedding_columns)
+
+        self.drop_columns = [
+            col for col in all_ls_columns
+            if col != base_scheme and col not in lshedding_columns
+        ] + ls_latest_cols
+
+        self.assignments = master_df[assignment_col].to_numpy()
+        self.position = {a: i for i, a in enumerate(self.assignments)}
+        n = len(self.assignments)
+
+        self.critical = (
+            master_df["Critical Subs"].str.contains("Yes", na=False).to_numpy()
         )
 
-        if conflicted_ids:
-            conflict_map[assign_id] = conflicted_ids
+        # overlap = stage condition & value condition, one of them fixed per row
+        if self.ref_scheme == "UFLS":
+            self.flags_enabled = True
+            static_overlap = master_df[ls_latest_cols].notna().any(axis=1)
+        else:
+            ufls_cols = [col for col in ls_latest_cols if col.startswith("UFLS")]
+            self.flags_enabled = bool(ufls_cols)
+            static_overlap = (
+                master_df[ufls_cols[0]].isin(NON_OVERLAP_UFLS_STAGES)
+                if ufls_cols else pd.Series(False, index=master_df.index)
+            )
+
+        self.static_overlap = static_overlap.to_numpy()
+        self.overlap_text = np.full(n, "", dtype=object)
+        if self.static_overlap.any():
+            self.overlap_text[self.static_overlap] = _overlap_details(
+                master_df.loc[static_overlap, ls_latest_cols]
+            ).to_numpy()
+
+        # local trips (incidence trip codes) of every assignment, in first-seen order
+        incidence = local_trip_incidence(raw_candidate, raw_assignment_col, local_trip_col)
+        self.local_label = incidence.trip_labels
+        self.local_ids = defaultdict(list)
+        for code, assign_id in enumerate(incidence.assignments):
+            pos = self.position.get(assign_id)
+            if pos is not None:
+                pairs = incidence.by_assign[
+                    incidence.assign_ptr[code]:incidence.assign_ptr[code + 1]
+                ]
+                self.local_ids[pos] = incidence.trip_codes[pairs].tolist()
+
+        # order in which detect_local_trip_conflict lists the assignments
+        self.rank = np.empty(n, dtype=np.int64)
+        self.rank[
+            pd.Series(self.assignments).sort_values(kind="stable").index
+        ] = np.arange(n)
+
+    def apply(self, frame, changed=None):
+        """Returns 'frame' with Flag / conflict_assignment up to date. 'changed' lists the assignments edited since the last call when 'frame' is a copy of the last returned frame; otherwise the whole frame is evaluated."""
+        if not self.enabled:
+            return frame
+
+        if changed is not None and self.frame is not None and len(frame) == len(self.frame):
+            self._update(frame, changed)
+        elif frame is not self.frame:
+            frame = self._evaluate(frame)
+
+        self.frame = frame
+        return frame
+
+    def _evaluate(self, frame):
+        frame = frame.drop(columns=self.drop_columns, errors="ignore")
+
+        if "conflict_assignment" not in frame.columns:
+            frame["conflict_assignment"] = ""
+
+        self.rows = np.empty(len(self.assignments), dtype=np.int64)
+        self.rows[
+            pd.Index(self.assignments).get_indexer(frame[self.assignment_col])
+        ] = np.arange(len(frame))
+
+        self.stage = frame[self.sim_stage_col].to_numpy(dtype=object)[self.rows]
+        self.active = pd.notna(self.stage)
+
+        self.holders = defaultdict(set)
+        for pos, local_ids in self.local_ids.items():
+            if self.active[pos]:
+                for local_id in local_ids:
+                    self.holders[local_id].add(pos)
+        self.conflicted = {
+            local_id for local_id, holders in self.holders.items() if len(holders) > 1
+        }
+        self.local_msg, self.local_members = self._local_conflicts()
+
+        if not self.flags_enabled:
+            frame["conflict_assignment"] = ""
+            return frame
+
+        results = [self._row_result(pos) for pos in range(len(self.assignments))]
+        texts = np.empty(len(frame), dtype=object)
+        flags = np.empty(len(frame), dtype=object)
+        texts[self.rows] = [text for text, _ in results]
+        flags[self.rows] = [flag for _, flag in results]
+
+        frame["conflict_assignment"] = texts
+        frame["Flag"] = flags
+
+        return frame
+
+    def _update(self, frame, changed):
+        stages = frame[self.sim_stage_col]
+        touched = set()
+        local_changed = False
+
+        for assign_id in changed:
+            pos = self.position.get(assign_id)
+            if pos is None:
+                continue
+
+            touched.add(pos)
+            stage = stages.iat[self.rows[pos]]
+            self.stage[pos] = stage
+            active = pd.notna(stage)
+
+            if active == self.active[pos]:
+                continue
+
+            self.active[pos] = active
+            for local_id in self.local_ids.get(pos, ()):
+                holders = self.holders[local_id]
+                was_conflicted = len(holders) > 1
+                if active:
+                    holders.add(pos)
+                else:
+                    holders.discard(pos)
+                local_changed = True
+
+                if was_conflicted != (len(holders) > 1):
+                    touched |= holders
+                    if len(holders) > 1:
+                        self.conflicted.add(local_id)
+                    else:
+                        self.conflicted.discard(local_id)
+
+        if local_changed:
+            old_msg, old_members = self.local_msg, self.local_members
+            self.local_msg, self.local_members = self._local_conflicts()
+            touched |= old_members ^ self.local_members
+            if old_msg != self.local_msg:
+                touched |= self.local_members
+
+        if not self.flags_enabled or not touched:
+            return
+
+        positions = sorted(touched)
+        results = [self._row_result(pos) for pos in positions]
+        rows = self.rows[positions]
+
+        frame.iloc[rows, frame.columns.get_loc("conflict_assignment")] = [
+            text for text, _ in results
+        ]
+        frame.iloc[rows, frame.columns.get_loc("Flag")] = [flag for _, flag in results]
+
+    def _local_conflicts(self):
+        """Message and members of the local trip conflicts, as raise_flags builds them from detect_local_trip_conflict."""
+        members = set()
+        for local_id in self.conflicted:
+            members |= self.holders[local_id]
+
+        value_to_keys = defaultdict(list)
+        for pos in sorted(members, key=lambda p: self.rank[p]):
+            labels = []
+            for local_id in self.local_ids[pos]:
+                label = self.local_label[local_id]
+                if local_id in self.conflicted and label not in labels:
+                    labels.append(label)
+            for label in labels:
+                value_to_keys[label].append(self.assignments[pos])
+
+        msg = ""
+        for value, keys in value_to_keys.items():
+            if len(keys) > 1:
+                keys_str = " and ".join([f'"{k}"' for k in keys])
+                msg = (
+                    "[Local Trip Conflict] - "
+                    f"Similar load assignment ({value}) with assignment_id: {keys_str}"
+                )
+
+        return msg, members
+
+    def _row_result(self, pos):
+        stage = self.stage[pos]
+
+        if self.ref_scheme == "UFLS":
+            overlap = stage in NON_OVERLAP_UFLS_STAGES and self.static_overlap[pos]
+        else:
+            overlap = self.static_overlap[pos] and self.active[pos]
+
+        text = self.overlap_text[pos] if overlap else ""
+
+        if pos in self.local_members:
+            existing = text.strip()
+            msg = self.local_msg
+            if existing == "":
+                text = msg
+            elif msg not in existing:
+                text = existing + " | " + msg
+            else:
+                text = existing
+
+        critical = self.critical[pos] and stage in CRITICAL_UFLS_STAGES
+        alert = self.critical[pos] and stage in NONCRITICAL_UFLS_STAGES
+
+        flag = "OK"
+        if critical or overlap or "Local Trip Conflict" in text:
+            flag = _join_warning([text.strip(), "[Critical Sub]" if critical else ""])
+        if alert:
+            flag = "Alert: [Critical Sub]"
 
-    return conflict_map
+        return text, flag
@@ -10,7 +10,7 @@ from css.streamlit_css import custom_metric
 SIM_STAGE = "Sim. Stage"
 
 
-def sim_dashboard(simulator_df, candidate_df, scheme):
+def sim_dashboard(stage_quantum, scheme):
     st.subheader("📊 Load Shedding Assignment Simulator")
 
     ls_obj = st.session_state.get("loadshedding")
@@ -32,21 +32,8 @@ def sim_dashboard(simulator_df, candidate_df, scheme):
     st.caption(
         f"Target Load Shed: {target_quantum_ls:,.1f} MW ({target_quantum*100}% of {total_system_mw:,.0f} MW)")
 
-    simulator = simulator_df.copy().rename(
-        columns={"Assignment": "assignment_id", })
-
-    sim_ls = pd.merge(
-        candidate_df,
-        simulator[["assignment_id", SIM_STAGE]],
-        on="assignment_id",
-        how="left"
-    ).rename(columns={"Load (MW)": "Load Shed (MW)"})
-
-    # Optional: Show merged data
-    # st.dataframe(sim_ls)
-
     # Check if we have data
-    if sim_ls.empty:
+    if stage_quantum.empty:
         st.warning("No load shedding assignments found for simulation.")
         return
 
@@ -55,9 +42,9 @@ def sim_dashboard(simulator_df, candidate_df, scheme):
     with c1:
         st.markdown("**📈 By Stage**")
 
-        # Group by stage
-        sim_stage = sim_ls.groupby([SIM_STAGE], as_index=False)[
-            "Load Shed (MW)"].sum()
+        # Stage totals straight from the zone x stage matrix
+        sim_stage = stage_quantum.by_stage().rename(
+            columns={"Load (MW)": "Load Shed (MW)"})
 
         if not sim_stage.empty:
             # Round and convert to int
@@ -100,10 +87,9 @@ def sim_dashboard(simulator_df, candidate_df, scheme):
     with c2:
         st.markdown("**⚖️ By Zone & Stage**")
 
-        # Group by zone and stage
-        sim_zone_stage = sim_ls.groupby(
-            ["zone", SIM_STAGE], as_index=False
-        ).agg({"Load Shed (MW)": "sum"})
+        # Zone and stage cells of the matrix
+        sim_zone_stage = stage_quantum.by_zone_stage().rename(
+            columns={"Load (MW)": "Load Shed (MW)"})
 
         if not sim_zone_stage.empty:
             # Round and convert to int
@@ -0,0 +1,313 @@
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from applications.load_shedding.stage_optimizer import (
+    allocate_stages,
+    rebalance_stage,
+    stage_summary,
+)
+from applications.load_shedding.scenario_batch import ScenarioBatch
+from applications.load_shedding.ufls_setting import UFLS_TARGET_QUANTUM
+from applications.load_shedding.uvls_setting import UVLS_TARGET_QUANTUM
+from pages.load_shedding.tab4e_sim_history import record_sim_stages, rerun_on_panel_edit
+from pages.load_shedding.tab4a_sim_conflict import (
+    CRITICAL_UFLS_STAGES,
+    NON_OVERLAP_UFLS_STAGES,
+    NONCRITICAL_UFLS_STAGES,
+)
+
+SIM_STAGE = "Sim. Stage"
+
+CRITICAL_CONSTRAINT = "Critical substation in stage 1-3 / 11-13"
+OVERLAP_CONSTRAINT = "Overlap with UVLS / EMLS"
+UFLS_OVERLAP_CONSTRAINT = "Overlap with UFLS stage 1-3"
+
+
+def scheme_target_quantum(base_scheme):
+    return {"UFLS": UFLS_TARGET_QUANTUM, "UVLS": UVLS_TARGET_QUANTUM}.get(base_scheme[:4], 0)
+
+
+def auto_assign_problem(master_df, engine, stage_quantum, base_scheme, stages):
+    """Inputs of allocate_stages for the simulator assignments, in master_df order.
+
+    The constraints mirror raise_flags: the static parts (critical substations, overlap with the other schemes) come from the conflict engine and the local trips from its incidence. Zone x stage targets split the scheme target quantum evenly over the stages and over the zones by zone load.
+    """
+    ls_obj = st.session_state["loadshedding"]
+    lprofile_obj = st.session_state["loadprofile"]
+
+    scheme = base_scheme[:4]
+    target_mw = scheme_target_quantum(base_scheme) * lprofile_obj.totalMW()
+
+    zone_loads = ls_obj.zone_loads().reindex(stage_quantum.zones).fillna(0).to_numpy()
+    zone_share = zone_loads / zone_loads.sum() if zone_loads.sum() > 0 else zone_loads
+    zone_targets = np.outer(zone_share, np.full(len(stages), target_mw / max(len(stages), 1)))
+
+    stage_ids = {stage: i for i, stage in enumerate(stages)}
+    base = np.array(
+        [stage_ids.get(stage, -1) for stage in master_df[base_scheme]], dtype=np.int64
+    )
+
+    critical_stage = np.isin(stages, CRITICAL_UFLS_STAGES)
+    banned = {CRITICAL_CONSTRAINT: engine.critical[:, None] & critical_stage[None, :]}
+
+    if scheme == "UFLS":
+        overlap_stage = np.isin(stages, NON_OVERLAP_UFLS_STAGES)
+        banned[OVERLAP_CONSTRAINT] = engine.static_overlap[:, None] & overlap_stage[None, :]
+    else:
+        # UFLS stage 1-3 rows overlap with any stage of the other schemes
+        banned[UFLS_OVERLAP_CONSTRAINT] = np.repeat(
+            engine.static_overlap[:, None], len(stages), axis=1
+        )
+
+    pair_assign = [pos for pos, trips in engine.local_ids.items() for _ in trips]
+    pair_trip = [trip for trips in engine.local_ids.values() for trip in trips]
+
+    return stage_quantum.load, zone_targets, base, banned, (pair_assign, pair_trip)
+
+
+def scenario_batch(master_df, engine, stage_quantum, base_scheme, stages):
+    """ScenarioBatch over the simulator assignments with the targets and flag rules of auto-assign."""
+    load, zone_targets, _, banned, local_pairs = auto_assign_problem(
+        master_df, engine, stage_quantum, base_scheme, stages
+    )
+    alert_mask = engine.critical[:, None] & np.isin(stages, NONCRITICAL_UFLS_STAGES)[None, :]
+
+    return ScenarioBatch(
+        load,
+        stage_quantum.zones,
+        stages,
+        zone_targets.sum(),
+        warning_masks=banned,
+        alert_mask=alert_mask,
+        local_pairs=local_pairs,
+    )
+
+
+def run_auto_assign(sim_key, master_df, base_scheme, stages, churn_weight):
+    sim_data = st.session_state[sim_key]
+    engine = sim_data["conflict_engine"]
+    stage_quantum = sim_data["stage_quantum"]
+
+    start = time.perf_counter()
+    load, zone_targets, base, banned, local_pairs = auto_assign_problem(
+        master_df, engine, stage_quantum, base_scheme, stages
+    )
+    allocation = allocate_stages(
+        load, zone_targets, base,
+        banned=banned,
+        local_pairs=local_pairs,
+        churn_weight=churn_weight,
+    )
+    elapsed = time.perf_counter() - start
+
+    labels = np.array(list(stages) + [None], dtype=object)[allocation.codes]
+    record_sim_stages(sim_key, master_df, "Auto-assign", np.arange(len(labels)), labels)
+
+    sim_data["auto_assign"] = {
+        "binding": allocation.binding,
+        "summary": stage_summary(allocation, zone_targets, stages),
+        "codes": allocation.codes,
+        "churn": allocation.churn,
+        "moves": allocation.moves,
+        "seconds": elapsed,
+    }
+
+
+def current_stage_codes(stage_quantum, stages):
+    """Stage number in 'stages' of every simulator assignment, read from the stage matrix (-1 for none or an unknown stage)."""
+    stage_ids = {stage: i for i, stage in enumerate(stages)}
+    lookup = np.array(
+        [stage_ids.get(stage, -1) for stage in stage_quantum.stages] + [-1], dtype=np.int64
+    )
+    return lookup[stage_quantum.codes]
+
+
+def propose_rebalance(sim_key, master_df, base_scheme, stages, stage, zone):
+    sim_data = st.session_state[sim_key]
+    stage_quantum = sim_data["stage_quantum"]
+
+    start = time.perf_counter()
+    load, zone_targets, _, banned, local_pairs = auto_assign_problem(
+        master_df, sim_data["conflict_engine"], stage_quantum, base_scheme, stages
+    )
+    codes = current_stage_codes(stage_quantum, stages)
+    stage_id, zone_id = stages.index(stage), stage_quantum.zones.index(zone)
+
+    allocation = rebalance_stage(
+        load, zone_targets, codes, stage_id, zone_id,
+        banned=banned,
+        local_pairs=local_pairs,
+    )
+    elapsed = time.perf_counter() - start
+
+    labels = np.array(list(stages) + [None], dtype=object)
+    moved = np.flatnonzero(allocation.codes != codes)
+
+    sim_data["rebalance"] = {
+        "stage": stage,
+        "zone": zone,
+        "target": zone_targets[zone_id, stage_id],
+        "before": stage_quantum.zone_stage_mw(zone, stage),
+        "after": allocation.mw[zone_id, stage_id],
+        "seconds": elapsed,
+        "moves": pd.DataFrame(
+            {
+                "Assignment": master_df["Assignment"].to_numpy()[moved],
+                "Zone MW": load[moved, zone_id],
+                "From": labels[codes[moved]],
+                "To": labels[allocation.codes[moved]],
+            }
+        ),
+    }
+
+
+def apply_rebalance(sim_key, master_df):
+    sim_data = st.session_state[sim_key]
+    proposal = sim_data.pop("rebalance", None)
+    if not proposal or proposal["moves"].empty:
+        return
+
+    moves = proposal["moves"]
+    sim_df = sim_data["sim_df"]
+    positions = pd.Index(sim_df["Assignment"]).get_indexer(moves["Assignment"])
+
+    # moves whose assignment was edited since the proposal are skipped
+    current = sim_df[SIM_STAGE].to_numpy(dtype=object)[positions]
+    still_valid = (positions >= 0) & np.array(
+        [c == f or (pd.isna(c) and f is None) for c, f in zip(current, moves["From"])],
+        dtype=bool,
+    )
+
+    record_sim_stages(
+        sim_key,
+        master_df,
+        f"Rebalance {proposal['zone']} {proposal['stage']}",
+        positions[still_valid],
+        moves["To"].to_numpy(dtype=object)[still_valid],
+    )
+
+
+@st.fragment
+def rebalance_panel(sim_key, master_df, base_scheme, stages):
+
+    if not stages:
+        return
+
+    rerun_on_panel_edit(sim_key)
+
+    stage_quantum = st.session_state[sim_key]["stage_quantum"]
+
+    with st.expander("🎯 Rebalance Stage"):
+        stage_col, zone_col, button_col = st.columns([1.5, 1.5, 1])
+
+        with stage_col:
+            stage = st.selectbox(
+                "Stage", options=stages, key=f"rebalance_stage_{base_scheme}"
+            )
+        with zone_col:
+            zone = st.selectbox(
+                "Zone", options=stage_quantum.zones, key=f"rebalance_zone_{base_scheme}"
+            )
+        with button_col:
+            st.button(
+                label="🔍 Propose",
+                on_click=propose_rebalance,
+                args=(sim_key, master_df, base_scheme, stages, stage, zone),
+                key=f"rebalance_propose_{base_scheme}",
+                disabled=zone is None,
+                width="stretch",
+            )
+
+        proposal = st.session_state[sim_key].get("rebalance")
+        if not proposal:
+            return
+
+        st.caption(
+            f"{proposal['zone']} {proposal['stage']}: {proposal['before']:,.0f} MW → "
+            f"{proposal['after']:,.0f} MW (target {proposal['target']:,.0f} MW, "
+            f"{proposal['seconds'] * 1000:.0f} ms)"
+        )
+
+        if proposal["moves"].empty:
+            st.info("No move brings this stage closer to its target without new conflicts.")
+            return
+
+        st.dataframe(
+            proposal["moves"].style.format({"Zone MW": "{:,.1f}"}),
+            hide_index=True,
+            width="stretch",
+        )
+
+        st.button(
+            label="✅ Apply Moves",
+            on_click=apply_rebalance,
+            args=(sim_key, master_df),
+            key=f"rebalance_apply_{base_scheme}",
+        )
+
+
+@st.fragment
+def auto_assign_panel(sim_key, master_df, base_scheme, stages):
+
+    if not stages:
+        return
+
+    rerun_on_panel_edit(sim_key)
+
+    with st.expander("🤖 Auto-assign Stages"):
+        st.caption(
+            f"Chooses stages from {base_scheme} towards the per-stage and per-zone target quantum, "
+            "keeping critical substations, scheme overlaps and shared local trips out."
+        )
+
+        weight_col, button_col = st.columns([2, 1])
+
+        with weight_col:
+            churn_weight = st.number_input(
+                "Churn penalty (MW per changed assignment)",
+                min_value=0.0,
+                value=1.0,
+                step=0.5,
+                key=f"auto_assign_churn_{base_scheme}",
+            )
+
+        with button_col:
+            st.button(
+                label="⚙️ Auto-assign",
+                on_click=run_auto_assign,
+                args=(sim_key, master_df, base_scheme, stages, churn_weight),
+                key=f"auto_assign_{base_scheme}",
+                width="stretch",
+            )
+
+        report = st.session_state[sim_key].get("auto_assign")
+        if not report:
+            return
+
+        st.caption(
+            f"{report['churn']:,} assignments changed against {base_scheme} "
+            f"({report['moves']:,} moves, {report['seconds']:.2f}s)"
+        )
+
+        summary_col, binding_col = st.columns(2)
+
+        with summary_col:
+            st.dataframe(
+                report["summary"].style.format({
+                    "Target (MW)": "{:,.0f}",
+                    "Allocated (MW)": "{:,.0f}",
+                    "Gap (MW)": "{:+,.0f}",
+                }),
+                hide_index=True,
+                width="stretch",
+            )
+
+        with binding_col:
+            st.dataframe(
+                report["binding"].style.format({
+                    "Best Blocked Gain (MW)": "{:,.1f}",
+                }),
+                hide_index=True,
+                width="stretch",
+            )
@@ -0,0 +1,166 @@
+import numpy as np
+import streamlit as st
+from applications.load_shedding.edit_history import EditHistory
+
+SIM_STAGE = "Sim. Stage"
+
+
+def sim_history(sim_key, master_df):
+    sim_data = st.session_state[sim_key]
+    if "history" not in sim_data:
+        sim_data["history"] = EditHistory(master_df["Assignment"], master_df[SIM_STAGE])
+    return sim_data["history"]
+
+
+def sim_stage_token(sim_key, master_df):
+    """Identifies the current stage vector; results computed from the stages keep it to tell when they went stale."""
+    return hash(sim_history(sim_key, master_df).current.tobytes())
+
+
+def stale_result_warning(sim_key, master_df, report):
+    stale = report.get("stages") != sim_stage_token(sim_key, master_df)
+    if stale:
+        st.warning("⚠️ Stages changed since this was run, run it again to update.")
+    return stale
+
+
+def write_sim_stages(sim_key, positions, stages):
+    """Writes stages in place into the simulator frame and queues the assignments for the incremental conflict / metrics refresh."""
+    sim_data = st.session_state[sim_key]
+    sim_df = sim_data["sim_df"]
+    positions = np.asarray(positions, dtype=np.int64)
+    if not len(positions):
+        return
+
+    sim_df.iloc[positions, sim_df.columns.get_loc(SIM_STAGE)] = np.asarray(stages, dtype=object)
+    sim_data.setdefault("pending_edits", []).extend(sim_df["Assignment"].to_numpy()[positions])
+
+    # the editor still holds the rows edited before this write, a new widget starts without them
+    sim_data["editor_revision"] = sim_data.get("editor_revision", 0) + 1
+    sim_data["last_editor_state"] = {}
+
+
+def record_sim_stages(sim_key, master_df, label, positions, stages):
+    """Logs an edit in the history and writes it into the simulator frame."""
+    history = sim_history(sim_key, master_df)
+    entry = history.record(label, positions, stages)
+    if entry is not None:
+        write_sim_stages(sim_key, entry.positions, history.decode(entry.new))
+    return entry
+
+
+def rerun_on_panel_edit(sim_key):
+    """Panels run as fragments of their own; stages written by their callbacks reach the workspace through a rerun of the page."""
+    if st.session_state[sim_key].get("pending_edits"):
+        st.rerun()
+
+
+def reset_to_base_reference(master_df, sim_key):
+    history = sim_history(sim_key, master_df)
+    positions, stages = history.target_edit(history.base)
+    record_sim_stages(sim_key, master_df, "Reset", positions, stages)
+
+
+def reset_to_empty_sim_df(master_df, sim_key):
+    history = sim_history(sim_key, master_df)
+    positions, stages = history.target_edit(np.full(len(history.base), -1, dtype=history.base.dtype))
+    record_sim_stages(sim_key, master_df, "Clear", positions, stages)
+
+
+def undo_sim_edit(master_df, sim_key):
+    step = sim_history(sim_key, master_df).undo()
+    if step:
+        write_sim_stages(sim_key, *step)
+
+
+def redo_sim_edit(master_df, sim_key):
+    step = sim_history(sim_key, master_df).redo()
+    if step:
+        write_sim_stages(sim_key, *step)
+
+
+def goto_sim_edit(master_df, sim_key, cursor):
+    write_sim_stages(sim_key, *sim_history(sim_key, master_df).goto(cursor))
+
+
+def add_sim_checkpoint(master_df, sim_key, name_key, pick_key):
+    name = st.session_state.get(name_key, "").strip()
+    if name:
+        sim_history(sim_key, master_df).add_checkpoint(name)
+        st.session_state[name_key] = ""
+        st.session_state[pick_key] = name
+
+
+def restore_sim_checkpoint(master_df, sim_key, name):
+    history = sim_history(sim_key, master_df)
+    if name not in history.checkpoints:
+        return
+    positions, stages = history.target_edit(history.checkpoint_codes(name))
+    record_sim_stages(sim_key, master_df, f"Restore {name}", positions, stages)
+
+
+def history_panel(sim_key, master_df, base_scheme):
+    history = sim_history(sim_key, master_df)
+
+    with st.expander(f"🕘 Edit History ({history.cursor} / {len(history.entries)})"):
+        name_col, add_col, pick_col, restore_col = st.columns([2, 1, 2, 1])
+        name_key = f"history_checkpoint_name_{base_scheme}"
+        pick_key = f"history_checkpoint_pick_{base_scheme}"
+
+        with name_col:
+            st.text_input(
+                "Checkpoint",
+                placeholder="Checkpoint name",
+                label_visibility="collapsed",
+                key=name_key,
+            )
+        with add_col:
+            st.button(
+                label="📌 Save",
+                on_click=add_sim_checkpoint,
+                args=(master_df, sim_key, name_key, pick_key),
+                key=f"history_checkpoint_add_{base_scheme}",
+                width="stretch",
+            )
+        with pick_col:
+            checkpoint = st.selectbox(
+                "Checkpoints",
+                options=list(history.checkpoints),
+                label_visibility="collapsed",
+                placeholder="No checkpoints",
+                key=pick_key,
+            )
+        with restore_col:
+            st.button(
+                label="⏪ Restore",
+                on_click=restore_sim_checkpoint,
+                args=(master_df, sim_key, checkpoint),
+                disabled=checkpoint is None,
+                key=f"history_checkpoint_restore_{base_scheme}",
+                width="stretch",
+            )
+
+        if not history.entries:
+            return
+
+        log = history.log()
+        log.index = np.arange(1, len(log) + 1)
+        st.dataframe(log.iloc[::-1], width="stretch", height=min(35 * (len(log) + 1) + 3, 250))
+
+        goto_col, goto_btn = st.columns([3, 1])
+        with goto_col:
+            cursor = st.number_input(
+                "Go to edit",
+                min_value=0,
+                max_value=len(history.entries),
+                value=history.cursor,
+                key=f"history_goto_{base_scheme}_{len(history.entries)}",
+            )
+        with goto_btn:
+            st.button(
+                label="Go",
+                on_click=goto_sim_edit,
+                args=(master_df, sim_key, int(cursor)),
+                key=f"history_goto_btn_{base_scheme}",
+                width="stretch",
+            )
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from applications.load_shedding.edit_history import EditHistory
+from applications.load_shedding.session_store import SessionStore, object_nbytes
+
+SIM_STAGE = "Sim. Stage"
+SIM_STORE_KEY = "sim_store"
+SIM_STORE_BUDGET_MB = 64
+
+
+def sim_session_keys(base_scheme, sim_scheme):
+    return f"master_df_key_{base_scheme}_{sim_scheme}", f"sim_data_{base_scheme}_{sim_scheme}"
+
+
+def compact_simulation(live):
+    """Stage codes of a simulation: its edit history, or a one-edit history when nothing was logged."""
+    sim_data = live["sim_data"]
+    history = sim_data.get("history")
+
+    if history is None:
+        master_df = live["master"]["master_df"]
+        history = EditHistory(master_df["Assignment"], master_df[SIM_STAGE])
+        history.record(
+            "Restore",
+            np.arange(len(master_df)),
+            sim_data["sim_df"][SIM_STAGE].to_numpy(dtype=object),
+        )
+
+    return history
+
+
+def measure_simulation(state):
+    # live combinations all hold the current candidate set, it is not charged to any
+    shared = {id(state["master"]["raw_candidate"])} if isinstance(state, dict) else set()
+    return object_nbytes(state, seen=shared)
+
+
+def simulator_store():
+    if SIM_STORE_KEY not in st.session_state:
+        st.session_state[SIM_STORE_KEY] = SessionStore(
+            SIM_STORE_BUDGET_MB * 1024 ** 2,
+            compact=compact_simulation,
+            measure=measure_simulation,
+        )
+    return st.session_state[SIM_STORE_KEY]
+
+
+def open_simulation(base_scheme, sim_scheme, raw_candidate, build_master_df):
+    """Puts the frames of a (base, simulator) combination in session state, rebuilt from the candidate set and its stage codes when it was compacted or built from another candidate set, and releases the least recently used combinations over the budget."""
+    store = simulator_store()
+    key = (base_scheme, sim_scheme)
+    master_df_key, sim_key = sim_session_keys(base_scheme, sim_scheme)
+
+    # combinations built before the candidate set changed (e.g. a new load profile upload)
+    # keep only their stage codes and are rebuilt from the current one when opened
+    released = []
+    for live_key, live in store.live_items():
+        if live["master"]["raw_candidate"] is not raw_candidate:
+            store.compact(live_key)
+            released.append(live_key)
+
+    entry = store.get(key)
+    if entry is None or entry.live is None:
+        master_df = build_master_df()
+        sim_df = master_df.copy()
+        sim_data = {"sim_df": sim_df, "last_editor_state": {}}
+
+        # stage codes only carry over while the candidate set has the same assignments
+        if entry is not None and entry.compact.assignments.equals(pd.Index(master_df["Assignment"])):
+            history = entry.compact
+            sim_df[SIM_STAGE] = history.decode(history.current)
+            sim_data["history"] = history
+
+        entry = store.put(
+            key,
+            {
+                "master": {"raw_candidate": raw_candidate, "master_df": master_df},
+                "sim_data": sim_data,
+            },
+        )
+    elif entry.live["sim_data"].pop("store_dirty", False):
+        # sizes are only measured again after the simulation was edited
+        store.refresh(key)
+
+    st.session_state[master_df_key] = entry.live["master"]
+    st.session_state[sim_key] = entry.live["sim_data"]
+
+    for released_key in released + store.evict(keep=key):
+        if released_key == key:
+            continue
+        for session_key in sim_session_keys(*released_key):
+            st.session_state.pop(session_key, None)
+
+    return master_df_key, sim_key
+
+
+@st.fragment
+def store_usage_panel():
+    store = simulator_store()
+    usage = store.usage()
+
+    with st.expander(
+        f"💾 Session Memory ({store.total_bytes / 1024 ** 2:,.1f} / {SIM_STORE_BUDGET_MB} MB)"
+    ):
+        usage["Key"] = [f"{base} ← {sim}" for base, sim in usage["Key"]]
+        st.dataframe(
+            usage.rename(columns={"Key": "Base ← Simulator"}).style.format({"Size (KB)": "{:,.0f}"}),
+            hide_index=True,
+            width="stretch",
+        )
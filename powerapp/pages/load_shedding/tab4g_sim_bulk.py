@@ -0,0 +1,137 @@
+import streamlit as st
+from applications.load_shedding.bulk_stage import BULK_ACTIONS, BulkStageEdit
+from pages.load_shedding.tab4e_sim_history import record_sim_stages, rerun_on_panel_edit
+
+SIM_STAGE = "Sim. Stage"
+NO_STAGE_LABEL = "No stage"
+CRITICAL_OPTIONS = {"Any": None, "Critical": True, "Non-critical": False}
+BULK_FILTER_COLS = {"zone": "Zone", "dp_type": "Type", "kV": "kV"}
+
+
+def bulk_stage_edit(sim_key, raw_candidate, master_df, stages):
+    sim_data = st.session_state[sim_key]
+    bulk = sim_data.get("bulk_stage")
+    if bulk is None or bulk.stages.tolist() != list(stages):
+        bulk = BulkStageEdit(raw_candidate, master_df["Assignment"], stages)
+        sim_data["bulk_stage"] = bulk
+    return bulk
+
+
+def bulk_selection(sim_key, raw_candidate, master_df, stages, filters, stage_filter, critical):
+    bulk = bulk_stage_edit(sim_key, raw_candidate, master_df, stages)
+    current = st.session_state[sim_key]["sim_df"][SIM_STAGE]
+    stage_filter = [None if stage == NO_STAGE_LABEL else stage for stage in stage_filter]
+
+    return bulk, current, bulk.mask(current, filters, stage_filter, CRITICAL_OPTIONS[critical])
+
+
+def apply_bulk_edit(sim_key, raw_candidate, master_df, stages, filters, stage_filter, critical, action, stage, other, offset):
+    """Applies one bulk action to every selected assignment as a single logged edit."""
+    bulk, current, mask = bulk_selection(
+        sim_key, raw_candidate, master_df, stages, filters, stage_filter, critical
+    )
+    positions, labels, skipped = bulk.apply(current, mask, action, stage, other, offset)
+
+    detail = {
+        "set": f"→ {stage}",
+        "shift": f"{offset:+d}",
+        "clear": "",
+        "swap": f"{stage} ↔ {other}",
+    }[action]
+    record_sim_stages(sim_key, master_df, f"Bulk {action} {detail}".strip(), positions, labels)
+
+    st.session_state[sim_key]["bulk_edit"] = {
+        "selected": int(mask.sum()),
+        "changed": len(positions),
+        "skipped": skipped,
+    }
+
+
+@st.fragment
+def bulk_edit_panel(sim_key, raw_candidate, master_df, base_scheme, stages):
+
+    if not stages:
+        return
+
+    rerun_on_panel_edit(sim_key)
+
+    with st.expander("🧰 Bulk Edit"):
+        filters = {}
+        for col, filter_col in zip(BULK_FILTER_COLS, st.columns(len(BULK_FILTER_COLS))):
+            with filter_col:
+                filters[col] = st.multiselect(
+                    BULK_FILTER_COLS[col],
+                    options=sorted(raw_candidate[col].dropna().unique()),
+                    key=f"bulk_{col}_{base_scheme}",
+                )
+
+        stage_col, critical_col = st.columns([2, 1])
+
+        with stage_col:
+            stage_filter = st.multiselect(
+                "Current Stage",
+                options=list(stages) + [NO_STAGE_LABEL],
+                key=f"bulk_stage_filter_{base_scheme}",
+            )
+        with critical_col:
+            critical = st.selectbox(
+                "Critical Subs",
+                options=list(CRITICAL_OPTIONS),
+                key=f"bulk_critical_{base_scheme}",
+            )
+
+        _, _, mask = bulk_selection(
+            sim_key, raw_candidate, master_df, stages, filters, stage_filter, critical
+        )
+        load = st.session_state[sim_key]["sim_df"]["Load (MW)"].to_numpy()
+        st.caption(f"{mask.sum():,} assignments selected ({load[mask].sum():,.1f} MW)")
+
+        action_col, first_col, second_col, button_col = st.columns([1, 1.2, 1.2, 1])
+        stage = other = None
+        offset = 0
+
+        with action_col:
+            action = st.selectbox("Action", options=BULK_ACTIONS, key=f"bulk_action_{base_scheme}")
+
+        if action in ("set", "swap"):
+            with first_col:
+                stage = st.selectbox(
+                    "To stage" if action == "set" else "Stage",
+                    options=stages,
+                    key=f"bulk_target_{base_scheme}",
+                )
+        if action == "swap":
+            with second_col:
+                other = st.selectbox(
+                    "With stage", options=stages, index=min(1, len(stages) - 1), key=f"bulk_other_{base_scheme}"
+                )
+        if action == "shift":
+            with first_col:
+                offset = int(
+                    st.number_input(
+                        "Stages",
+                        min_value=-(len(stages) - 1),
+                        max_value=len(stages) - 1,
+                        value=min(1, len(stages) - 1),
+                        step=1,
+                        key=f"bulk_offset_{base_scheme}",
+                        help="Positive moves to later stages",
+                    )
+                )
+
+        with button_col:
+            st.button(
+                label="⚡ Apply",
+                on_click=apply_bulk_edit,
+                args=(sim_key, raw_candidate, master_df, stages, filters, stage_filter, critical, action, stage, other, offset),
+                disabled=not mask.any(),
+                key=f"bulk_apply_{base_scheme}",
+                width="stretch",
+            )
+
+        report = st.session_state[sim_key].get("bulk_edit")
+        if report:
+            st.caption(
+                f"Last bulk edit: {report['changed']:,} of {report['selected']:,} selected assignments moved"
+                + (f", {report['skipped']:,} left in place (no stage, or shifted past either end of the scheme)" if report["skipped"] else "")
+            )
@@ -0,0 +1,66 @@
+import time
+import numpy as np
+import streamlit as st
+from pages.load_shedding.tab4d_sim_autoassign import current_stage_codes, scenario_batch
+from pages.load_shedding.tab4e_sim_history import sim_stage_token, stale_result_warning
+
+
+def run_compare_schemes(sim_key, master_df, base_scheme, stages):
+    sim_data = st.session_state[sim_key]
+    stage_quantum = sim_data["stage_quantum"]
+
+    start = time.perf_counter()
+    batch = scenario_batch(
+        master_df, sim_data["conflict_engine"], stage_quantum, base_scheme, stages
+    )
+
+    scheme_cols = [c for c in master_df.columns if c.startswith(base_scheme[:4])]
+    codes = [batch.codes(master_df[scheme_cols])]
+    names = scheme_cols
+
+    codes.append(current_stage_codes(stage_quantum, stages)[None, :])
+    names = names + ["Simulator"]
+
+    auto_assign = sim_data.get("auto_assign")
+    if auto_assign:
+        codes.append(auto_assign["codes"][None, :])
+        names = names + ["Auto-assign"]
+
+    results = batch.evaluate(np.concatenate(codes), names)
+
+    sim_data["compare_schemes"] = {
+        "summary": results.summary,
+        "stages": sim_stage_token(sim_key, master_df),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+@st.fragment
+def compare_schemes_panel(sim_key, master_df, base_scheme, stages):
+
+    if not stages:
+        return
+
+    with st.expander("📚 Compare Schemes"):
+        # evaluated on demand, the expander body runs on every rerun even when collapsed
+        st.button(
+            label="▶️ Compare",
+            on_click=run_compare_schemes,
+            args=(sim_key, master_df, base_scheme, stages),
+            key=f"compare_schemes_run_{base_scheme}",
+        )
+
+        report = st.session_state[sim_key].get("compare_schemes")
+        if not report:
+            return
+
+        stale_result_warning(sim_key, master_df, report)
+        st.caption(f"{len(report['summary'])} schemes ({report['seconds']:.2f}s)")
+        st.dataframe(
+            report["summary"].style.format(
+                {"Achievement (%)": "{:.1f}%"}
+                | {col: "{:,.0f}" for col in report["summary"].columns if col.endswith("(MW)")}
+            ),
+            hide_index=True,
+            width="stretch",
+        )
@@ -0,0 +1,113 @@
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from applications.load_shedding.load_uncertainty import LoadUncertainty
+from pages.load_shedding.tab4d_sim_autoassign import current_stage_codes, scheme_target_quantum
+from pages.load_shedding.tab4e_sim_history import sim_stage_token, stale_result_warning
+
+
+def run_load_uncertainty(sim_key, raw_candidate, master_df, base_scheme, stages, group_by, params, feeder_sigma, n_samples):
+    sim_data = st.session_state[sim_key]
+    lprofile_obj = st.session_state["loadprofile"]
+
+    codes = current_stage_codes(sim_data["stage_quantum"], stages)
+    assign_pos = pd.Index(master_df["Assignment"]).get_indexer(raw_candidate["assignment_id"])
+    feeder_stage = np.where(assign_pos >= 0, codes[assign_pos], -1)
+
+    uncertainty = LoadUncertainty(
+        raw_candidate["Load (MW)"].to_numpy(),
+        raw_candidate[group_by].to_numpy(),
+        feeder_stage,
+        len(stages),
+        lprofile_obj.df["Load (MW)"].sum(),
+    )
+
+    start = time.perf_counter()
+    result = uncertainty.percentiles(
+        scale=dict(zip(params[group_by], params["Scale"])),
+        sigma=dict(zip(params[group_by], params["Sigma (%)"] / 100)),
+        target_quantum=scheme_target_quantum(base_scheme),
+        stages=stages,
+        feeder_sigma=feeder_sigma / 100,
+        n_samples=int(n_samples),
+    )
+
+    sim_data["load_uncertainty"] = {
+        "result": result,
+        "samples": int(n_samples),
+        "group_by": group_by,
+        "stages": sim_stage_token(sim_key, master_df),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+@st.fragment
+def load_uncertainty_panel(sim_key, raw_candidate, master_df, base_scheme, stages):
+
+    if not stages:
+        return
+
+    with st.expander("🎲 Load Uncertainty"):
+        group_col, noise_col, samples_col, button_col = st.columns([1.5, 1.2, 1.2, 1])
+
+        with group_col:
+            group_by = st.radio(
+                "Vary load by",
+                options=["zone", "dp_type"],
+                horizontal=True,
+                key=f"mc_group_{base_scheme}",
+            )
+        with noise_col:
+            feeder_sigma = st.number_input(
+                "Feeder noise (%)",
+                min_value=0.0,
+                max_value=100.0,
+                value=5.0,
+                step=1.0,
+                key=f"mc_feeder_sigma_{base_scheme}",
+            )
+        with samples_col:
+            n_samples = st.number_input(
+                "Samples",
+                min_value=100,
+                max_value=100_000,
+                value=10_000,
+                step=1_000,
+                key=f"mc_samples_{base_scheme}",
+            )
+
+        groups = sorted(raw_candidate[group_by].dropna().unique())
+        params = st.data_editor(
+            pd.DataFrame({group_by: groups, "Scale": 1.0, "Sigma (%)": 5.0}),
+            key=f"mc_params_{base_scheme}_{group_by}",
+            hide_index=True,
+            width="stretch",
+            column_config={group_by: st.column_config.Column(disabled=True)},
+        )
+
+        with button_col:
+            st.button(
+                label="▶️ Run",
+                on_click=run_load_uncertainty,
+                args=(sim_key, raw_candidate, master_df, base_scheme, stages, group_by, params, feeder_sigma, n_samples),
+                key=f"mc_run_{base_scheme}",
+                width="stretch",
+            )
+
+        report = st.session_state[sim_key].get("load_uncertainty")
+        if not report:
+            return
+
+        stale_result_warning(sim_key, master_df, report)
+        st.caption(
+            f"{report['samples']:,} samples by {report['group_by']} "
+            f"({report['seconds']:.2f}s), shed as % of system demand"
+        )
+        st.dataframe(
+            report["result"].style.format(
+                {col: "{:.1f}" for col in report["result"].columns if col != "Stage"}
+            ),
+            hide_index=True,
+            width="stretch",
+        )
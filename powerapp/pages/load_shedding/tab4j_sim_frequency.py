@@ -0,0 +1,225 @@
+import time
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from datetime import date
+from applications.data_processing.save_to import export_to_excel
+from applications.load_shedding.frequency_response import FrequencyResponse
+from pages.load_shedding.tab4d_sim_autoassign import current_stage_codes, scenario_batch
+from pages.load_shedding.tab4e_sim_history import sim_stage_token, stale_result_warning
+
+
+def run_frequency_response(sim_key, settings, master_df, stages, params, loss_range, n_cases):
+    sim_data = st.session_state[sim_key]
+    stage_quantum = sim_data["stage_quantum"]
+    lprofile_obj = st.session_state["loadprofile"]
+
+    by_stage = stage_quantum.by_stage().set_index(stage_quantum.stage_col)[stage_quantum.load_col]
+    response = FrequencyResponse(
+        settings[stages],
+        by_stage.reindex(stages, fill_value=0.0).to_numpy(),
+        lprofile_obj.df["Load (MW)"].sum(),
+        **params,
+    )
+
+    start = time.perf_counter()
+    results = response.simulate(np.linspace(loss_range[0], loss_range[1], int(n_cases)))
+
+    sim_data["frequency_response"] = {
+        "results": results,
+        "stages": sim_stage_token(sim_key, master_df),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run_contingency_sweep(sim_key, settings, master_df, base_scheme, stages, params, loss_range, loss_step):
+    sim_data = st.session_state[sim_key]
+    stage_quantum = sim_data["stage_quantum"]
+    lprofile_obj = st.session_state["loadprofile"]
+
+    batch = scenario_batch(master_df, sim_data["conflict_engine"], stage_quantum, base_scheme, stages)
+    scheme_cols = [c for c in master_df.columns if c.startswith(base_scheme[:4])]
+    codes = np.concatenate(
+        [batch.codes(master_df[scheme_cols]), current_stage_codes(stage_quantum, stages)[None, :]]
+    )
+    scheme_stage_mw = batch.evaluate(codes).stage_mw
+
+    response = FrequencyResponse(
+        settings[stages],
+        scheme_stage_mw[-1],
+        lprofile_obj.df["Load (MW)"].sum(),
+        **params,
+    )
+
+    start = time.perf_counter()
+    table = response.sweep(
+        np.arange(loss_range[0], loss_range[1] + loss_step / 2, loss_step),
+        scheme_stage_mw,
+        scheme_cols + ["Simulator"],
+    )
+
+    sim_data["contingency_sweep"] = {
+        "table": table,
+        "stages": sim_stage_token(sim_key, master_df),
+        "seconds": time.perf_counter() - start,
+        # the workbook is built once here, not on every rerun of the panel
+        "excel": export_to_excel(table, sheet_name="Contingency Sweep"),
+    }
+
+
+def frequency_response_plot(results, base_scheme, n_lines=6):
+    picks = np.unique(np.linspace(0, len(results.loss_mw) - 1, n_lines).round().astype(int))
+    trace_df = pd.DataFrame(
+        {
+            "Time (s)": np.tile(results.times, len(picks)),
+            "Frequency (Hz)": results.trace[picks].ravel(),
+            "Loss (MW)": np.repeat([f"{results.loss_mw[i]:,.0f} MW" for i in picks], len(results.times)),
+        }
+    )
+
+    fig = px.line(trace_df, x="Time (s)", y="Frequency (Hz)", color="Loss (MW)")
+    fig.update_layout(height=320, margin=dict(t=30, b=40, l=40, r=20))
+    st.plotly_chart(fig, width="content", key=f"fr_plot_{base_scheme}")
+
+
+@st.fragment
+def frequency_response_panel(sim_key, settings, master_df, base_scheme, stages):
+
+    if not stages or not base_scheme.startswith("UFLS"):
+        return
+
+    with st.expander("📉 Frequency Response"):
+        h_col, d_col, r_col, tg_col = st.columns(4)
+
+        with h_col:
+            inertia = st.number_input(
+                "Inertia H (s)", min_value=0.5, max_value=20.0, value=4.0, step=0.5,
+                key=f"fr_inertia_{base_scheme}",
+            )
+        with d_col:
+            damping = st.number_input(
+                "Load damping D (pu)", min_value=0.0, max_value=5.0, value=1.0, step=0.5,
+                key=f"fr_damping_{base_scheme}",
+            )
+        with r_col:
+            droop = st.number_input(
+                "Droop R (%)", min_value=1.0, max_value=20.0, value=5.0, step=0.5,
+                key=f"fr_droop_{base_scheme}",
+            )
+        with tg_col:
+            governor_time = st.number_input(
+                "Governor Tg (s)", min_value=0.5, max_value=30.0, value=8.0, step=0.5,
+                key=f"fr_governor_{base_scheme}",
+            )
+
+        params = {
+            "inertia": inertia,
+            "damping": damping,
+            "droop": droop / 100,
+            "governor_time": governor_time,
+        }
+
+        loss_col, cases_col, button_col = st.columns([2.5, 1.2, 1])
+        with loss_col:
+            loss_range = st.slider(
+                "Generation loss (MW)",
+                min_value=0,
+                max_value=10_000,
+                value=(500, 5_000),
+                step=100,
+                key=f"fr_loss_{base_scheme}",
+            )
+        with cases_col:
+            n_cases = st.number_input(
+                "Contingencies", min_value=1, max_value=1_000, value=200, step=50,
+                key=f"fr_cases_{base_scheme}",
+            )
+        with button_col:
+            st.button(
+                label="▶️ Run",
+                on_click=run_frequency_response,
+                args=(sim_key, settings, master_df, stages, params, loss_range, n_cases),
+                key=f"fr_run_{base_scheme}",
+                width="stretch",
+            )
+
+        report = st.session_state[sim_key].get("frequency_response")
+        if report:
+            stale_result_warning(sim_key, master_df, report)
+            results = report["results"]
+            st.caption(f"{len(results.loss_mw):,} contingencies ({report['seconds']:.2f}s)")
+            frequency_response_plot(results, base_scheme)
+            st.dataframe(
+                results.summary().style.format(
+                    {
+                        "Loss (MW)": "{:,.0f}",
+                        "Nadir (Hz)": "{:.3f}",
+                        "Time to Nadir (s)": "{:.2f}",
+                        "Settling (Hz)": "{:.3f}",
+                        "Shed (MW)": "{:,.0f}",
+                    }
+                ),
+                hide_index=True,
+                width="stretch",
+            )
+
+        contingency_sweep_section(sim_key, settings, master_df, base_scheme, stages, params)
+
+
+def contingency_sweep_section(sim_key, settings, master_df, base_scheme, stages, params):
+    st.markdown("**Contingency Sweep**")
+    range_col, step_col, button_col = st.columns([2.5, 1.2, 1])
+
+    with range_col:
+        loss_range = st.slider(
+            "Loss range (MW)",
+            min_value=0,
+            max_value=10_000,
+            value=(100, 3_000),
+            step=50,
+            key=f"sweep_loss_{base_scheme}",
+        )
+    with step_col:
+        loss_step = st.number_input(
+            "Step (MW)", min_value=10, max_value=1_000, value=50, step=10,
+            key=f"sweep_step_{base_scheme}",
+        )
+    with button_col:
+        st.button(
+            label="▶️ Sweep",
+            on_click=run_contingency_sweep,
+            args=(sim_key, settings, master_df, base_scheme, stages, params, loss_range, loss_step),
+            key=f"sweep_run_{base_scheme}",
+            width="stretch",
+        )
+
+    report = st.session_state[sim_key].get("contingency_sweep")
+    if not report:
+        return
+
+    stale_result_warning(sim_key, master_df, report)
+    table = report["table"]
+    st.caption(
+        f"{table['Scheme'].nunique()} schemes x {len(table) // table['Scheme'].nunique()} "
+        f"loss sizes ({report['seconds']:.2f}s)"
+    )
+    st.dataframe(
+        table.style.format(
+            {
+                "Loss (MW)": "{:,.0f}",
+                "Shed (MW)": "{:,.0f}",
+                "Min Frequency (Hz)": "{:.3f}",
+                "Settling (Hz)": "{:.3f}",
+            }
+        ),
+        hide_index=True,
+        width="stretch",
+    )
+    st.download_button(
+        label="Export to Excel",
+        data=report["excel"],
+        file_name=f"{base_scheme}_Contingency_Sweep_{date.today().strftime('%d%m%Y')}.xlsx",
+        key=f"sweep_export_{base_scheme}",
+        width="stretch",
+    )
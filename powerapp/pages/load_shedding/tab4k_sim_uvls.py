@@ -0,0 +1,184 @@
+import time
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from applications.data_processing.read_data import read_raw_data
+from applications.load_shedding.voltage_response import (
+    PMU_VOLTAGE_COL,
+    UVLSResponse,
+    pmu_voltage_trace,
+    synthetic_voltage_traces,
+)
+from pages.load_shedding.tab4d_sim_autoassign import current_stage_codes
+from pages.load_shedding.tab4e_sim_history import sim_stage_token, stale_result_warning
+
+
+def uvls_group_pairs(raw_candidate, master_df, group_col, groups):
+    """(assignment numbers, group rows) of the zones or substations each assignment's feeders sit in."""
+    pairs = raw_candidate[["assignment_id", group_col]].dropna().drop_duplicates()
+    assign = pd.Index(master_df["Assignment"]).get_indexer(pairs["assignment_id"])
+    group = pd.Index(groups).get_indexer(pairs[group_col])
+    known = (assign >= 0) & (group >= 0)
+    return assign[known], group[known]
+
+
+def run_uvls_response(sim_key, settings, raw_candidate, master_df, stages, group_col, source, params, duration, pmu):
+    sim_data = st.session_state[sim_key]
+    stage_quantum = sim_data["stage_quantum"]
+
+    groups = params[group_col].tolist()
+    if source == "PMU":
+        pmu_df, time_col, sample_rate, apply_to = pmu
+        times, trace = pmu_voltage_trace(pmu_df, time_col, sample_rate)
+        group_voltage = np.ones((len(groups), len(times)))
+        group_voltage[np.isin(groups, apply_to)] = trace
+    else:
+        times = np.arange(0.0, duration, 0.02)
+        group_voltage = synthetic_voltage_traces(
+            times,
+            params["Dip (pu)"].to_numpy(),
+            params["Settled (pu)"].to_numpy(),
+            params["Recovery (s)"].to_numpy(),
+        )
+
+    start = time.perf_counter()
+    results = UVLSResponse(settings[stages]).simulate(
+        times,
+        group_voltage,
+        uvls_group_pairs(raw_candidate, master_df, group_col, groups),
+        current_stage_codes(stage_quantum, stages),
+        stage_quantum.load.sum(axis=1),
+    )
+
+    sim_data["uvls_response"] = {
+        "results": results,
+        "source": source,
+        "group_col": group_col,
+        "stages": sim_stage_token(sim_key, master_df),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def uvls_shed_plot(results, base_scheme, max_points=2_000):
+    step = max(1, len(results.times) // max_points)
+    times = results.times[::step]
+    shed_df = pd.DataFrame(
+        {
+            "Time (s)": np.tile(times, len(results.stages)),
+            "Shed (MW)": results.shed_mw[:, ::step].ravel(),
+            "Stage": np.repeat(results.stages, len(times)),
+        }
+    )
+
+    fig = px.area(shed_df, x="Time (s)", y="Shed (MW)", color="Stage")
+    fig.update_layout(height=320, margin=dict(t=30, b=40, l=40, r=20))
+    st.plotly_chart(fig, width="content", key=f"uvls_plot_{base_scheme}")
+
+
+@st.fragment
+def uvls_response_panel(sim_key, settings, raw_candidate, master_df, base_scheme, stages):
+
+    if not stages or not base_scheme.startswith("UVLS"):
+        return
+
+    with st.expander("⚡ UVLS Voltage Response"):
+        group_input, source_input, duration_input = st.columns([1.5, 1.5, 1.2])
+
+        with group_input:
+            group_col = st.radio(
+                "Voltage by",
+                options=["zone", "substation_name"],
+                format_func=lambda c: "Substation" if c == "substation_name" else "Zone",
+                horizontal=True,
+                key=f"uvls_group_{base_scheme}",
+            )
+        with source_input:
+            source = st.radio(
+                "Trajectory",
+                options=["Synthetic", "PMU"],
+                horizontal=True,
+                key=f"uvls_source_{base_scheme}",
+            )
+        with duration_input:
+            duration = st.number_input(
+                "Duration (s)", min_value=10.0, max_value=3_600.0, value=600.0, step=30.0,
+                key=f"uvls_duration_{base_scheme}",
+                disabled=source == "PMU",
+            )
+
+        # zones / substations of the feeders; an assignment spanning several of them is in each
+        groups = sorted(raw_candidate[group_col].dropna().unique())
+        params = pd.DataFrame({group_col: groups})
+        pmu = None
+
+        if source == "PMU":
+            uploaded = st.file_uploader(
+                f"PMU trace with a '{PMU_VOLTAGE_COL}' column",
+                type=["csv", "xlsx", "xls"],
+                key=f"uvls_pmu_{base_scheme}",
+            )
+            if uploaded is None:
+                return
+
+            pmu_df = read_raw_data(uploaded.getvalue(), uploaded.name)
+            if PMU_VOLTAGE_COL not in pmu_df.columns:
+                st.warning(f"⚠️ Missing required column: {PMU_VOLTAGE_COL}")
+                return
+
+            time_input, rate_input, apply_input = st.columns([1.2, 1, 2])
+            with time_input:
+                time_col = st.selectbox(
+                    "Time column",
+                    options=[None] + [c for c in pmu_df.columns if c != PMU_VOLTAGE_COL],
+                    format_func=lambda c: "Sample rate" if c is None else c,
+                    key=f"uvls_pmu_time_{base_scheme}",
+                )
+            with rate_input:
+                sample_rate = st.number_input(
+                    "Samples / s", min_value=1.0, max_value=240.0, value=50.0,
+                    key=f"uvls_pmu_rate_{base_scheme}",
+                    disabled=time_col is not None,
+                )
+            with apply_input:
+                apply_to = st.multiselect(
+                    "Apply to",
+                    options=groups,
+                    default=groups,
+                    key=f"uvls_pmu_groups_{base_scheme}_{group_col}",
+                )
+            pmu = (pmu_df, time_col, sample_rate, apply_to)
+        else:
+            params = st.data_editor(
+                params.assign(**{"Dip (pu)": 0.8, "Settled (pu)": 0.95, "Recovery (s)": 60.0}),
+                key=f"uvls_params_{base_scheme}_{group_col}",
+                hide_index=True,
+                width="stretch",
+                column_config={group_col: st.column_config.Column(disabled=True)},
+            )
+
+        st.button(
+            label="▶️ Run",
+            on_click=run_uvls_response,
+            args=(sim_key, settings, raw_candidate, master_df, stages, group_col, source, params, duration, pmu),
+            key=f"uvls_run_{base_scheme}",
+        )
+
+        report = st.session_state[sim_key].get("uvls_response")
+        if not report:
+            return
+
+        stale_result_warning(sim_key, master_df, report)
+        results = report["results"]
+        st.caption(
+            f"{report['source']} trajectories by {report['group_col']}, "
+            f"{len(results.times):,} samples ({report['seconds']:.2f}s)"
+        )
+        uvls_shed_plot(results, base_scheme)
+        st.dataframe(
+            results.summary().style.format(
+                {"Shed (MW)": "{:,.0f}", "First Trip (s)": "{:.1f}", "Last Trip (s)": "{:.1f}"}
+            ),
+            hide_index=True,
+            width="stretch",
+        )
@@ -72,7 +72,12 @@ def critical_list():
             st.info("No active load shedding assignment found.")
             return
 
-        filtered_flaglist = filtered_flaglist.rename(
+        # search before renaming so the index of flaglist_subs can be reused
+        filtered_flaglist = df_search_filter(
+            filtered_flaglist, search_query, base=flaglist_subs
+        )
+
+        filtered_df = filtered_flaglist.rename(
             columns={
                 "substation_name": "Substation",
                 "state": "State",
@@ -92,7 +97,6 @@ def critical_list():
             "List by",
         ]
 
-        filtered_df = df_search_filter(filtered_flaglist, search_query)
         df_final_display = filtered_df.reindex(columns=columns_order)
         st.dataframe(
             df_final_display,
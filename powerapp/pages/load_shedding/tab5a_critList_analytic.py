@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 
-from pages.load_shedding.tab4_simulator import potential_ls_candidate
 from pages.load_shedding.tab5b_critList_dashboard import critical_list_metric
 from pages.load_shedding.helper_chart import create_groupBar_chart
 from pages.load_shedding.helper import remove_duplicates_keep_nan
@@ -23,8 +22,7 @@ def critical_list_analytic():
         st.error("Load shedding data not found in session state.")
         return
 
-    df_raw_cand, cand_with_crit, cand_without_crit = potential_ls_candidate(
-        ls_obj)
+    df_raw_cand, cand_with_crit, cand_without_crit = ls_obj.potential_ls_candidate()
 
     cand_with_crit_uniq = remove_duplicates_keep_nan(
         cand_with_crit, ["local_trip_id", "feeder_id"])
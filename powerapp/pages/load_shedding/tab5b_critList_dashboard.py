@@ -1,6 +1,5 @@
 import streamlit as st
 from css.streamlit_css import custom_metric_one_line
-from pages.load_shedding.tab4_simulator import potential_ls_candidate
 from pages.load_shedding.helper import remove_duplicates_keep_nan
 
 
@@ -14,8 +13,7 @@ def critical_list_metric():
         st.error("Load shedding data not found in session state.")
         return
 
-    df_raw_cand, cand_with_crit, cand_without_crit = potential_ls_candidate(
-        ls_obj)
+    df_raw_cand, cand_with_crit, cand_without_crit = ls_obj.potential_ls_candidate()
 
     cand_with_crit_uniq = remove_duplicates_keep_nan(
         cand_with_crit, ["local_trip_id", "feeder_id", "mnemonic"])
@@ -0,0 +1,68 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# modules import each other as applications.* / pages.*, relative to the app folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SIM_STAGE = "Sim. Stage"
+ZONES = ["North", "South", "East"]
+UFLS_STAGES = [f"stage_{i}" for i in range(1, 14)]
+UVLS_STAGES = ["stage_1", "stage_2", "stage_3"]
+
+
+def make_candidate(seed, n_assign=60, n_rows=180, n_trips=25):
+    """Random candidate feeders (raw_candidate) and the simulator frame (master_df) built from them."""
+    rng = np.random.default_rng(seed)
+    assignments = np.array([f"A{i:03d}" for i in range(n_assign)], dtype=object)
+
+    raw_candidate = pd.DataFrame(
+        {
+            "assignment_id": rng.choice(assignments, n_rows),
+            "local_trip_id": np.where(
+                rng.random(n_rows) < 0.4,
+                rng.integers(0, n_trips, n_rows).astype(str),
+                None,
+            ),
+            "zone": np.where(rng.random(n_rows) < 0.9, rng.choice(ZONES, n_rows), None),
+            "dp_type": rng.choice(["DP", "SSU", "PMU"], n_rows),
+            "kV": rng.choice([11, 22, 33], n_rows),
+            "critical_list": np.where(rng.random(n_rows) < 0.1, "Hospital", None),
+            "Load (MW)": rng.uniform(0.5, 20, n_rows).round(2),
+        }
+    )
+    raw_candidate["local_trip_id"] = raw_candidate["local_trip_id"].astype(object)
+
+    def stages(options, share):
+        picked = rng.choice(options, n_assign).astype(object)
+        picked[rng.random(n_assign) > share] = np.nan
+        return picked
+
+    critical = raw_candidate.groupby("assignment_id")["critical_list"].agg(
+        lambda s: s.notna().any()
+    )
+
+    master_df = pd.DataFrame(
+        {
+            "Zone": rng.choice(ZONES, n_assign),
+            "Assignment": assignments,
+            "UFLS_2024": stages(UFLS_STAGES, 0.5),
+            "UFLS_2023": stages(UFLS_STAGES, 0.5),
+            "UVLS_2024": stages(UVLS_STAGES, 0.3),
+            "EMLS_2023": stages(["stage_1"], 0.2),
+            "Load (MW)": rng.uniform(1, 50, n_assign).round(1),
+            "Critical Subs": np.where(
+                critical.reindex(assignments, fill_value=False).to_numpy(), "Yes", "No"
+            ),
+        }
+    )
+    master_df[SIM_STAGE] = master_df["UFLS_2024"]
+
+    return raw_candidate, master_df
+
+
+@pytest.fixture
+def candidate():
+    return make_candidate(0)
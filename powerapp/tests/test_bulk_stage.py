@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+from applications.load_shedding.bulk_stage import BulkStageEdit
+from conftest import SIM_STAGE, make_candidate
+
+STAGES = [f"stage_{i}" for i in range(1, 6)]
+
+
+def current_stages(master_df, seed):
+    rng = np.random.default_rng(seed)
+    current = rng.choice(STAGES + ["stage_9"], len(master_df)).astype(object)
+    current[rng.random(len(master_df)) < 0.3] = None
+    return current
+
+
+def expected_mask(raw_candidate, master_df, current, filters, stage, critical):
+    """Assignments with any feeder matching every filter, as a groupby over the candidate rows."""
+    mask = pd.Series(True, index=master_df["Assignment"])
+
+    for col, selected in filters.items():
+        if selected:
+            hit = raw_candidate[col].isin(selected).groupby(raw_candidate["assignment_id"]).any()
+            mask &= hit.reindex(mask.index, fill_value=False)
+
+    if stage:
+        mask &= pd.Series(current, index=mask.index).map(
+            lambda s: (s is None and None in stage) or s in stage
+        )
+
+    if critical is not None:
+        is_critical = raw_candidate["critical_list"].notna().groupby(raw_candidate["assignment_id"]).any()
+        mask &= is_critical.reindex(mask.index, fill_value=False) == critical
+
+    return mask.to_numpy()
+
+
+@pytest.mark.parametrize(
+    "filters, stage, critical",
+    [
+        ({"zone": ["North"]}, None, None),
+        ({"zone": ["North", "East"], "dp_type": ["DP"]}, None, None),
+        ({"kV": [11], "zone": []}, ["stage_1", "stage_2"], None),
+        ({}, [None, "stage_3"], None),
+        ({}, "stage_9", None),
+        ({"dp_type": ["SSU", "PMU"]}, None, True),
+        ({}, None, False),
+    ],
+)
+def test_mask_matches_a_groupby_over_the_feeders(filters, stage, critical):
+    raw_candidate, master_df = make_candidate(3)
+    current = current_stages(master_df, 3)
+    bulk = BulkStageEdit(raw_candidate, master_df["Assignment"], STAGES)
+
+    mask = bulk.mask(current, filters, stage, critical)
+
+    # a stage outside the scheme is never selected by the stage filter
+    wanted = [stage] if isinstance(stage, str) else stage
+    wanted = [s for s in wanted if s is None or s in STAGES] if wanted else wanted
+    if stage and not wanted:
+        assert not mask.any()
+        return
+
+    np.testing.assert_array_equal(
+        mask, expected_mask(raw_candidate, master_df, current, filters, wanted, critical)
+    )
+
+
+def apply_loop(current, mask, action, stage=None, other=None, offset=0):
+    """New stage of every assignment, one at a time, and the number of selected ones left in place."""
+    new, skipped = list(current), 0
+    for i, label in enumerate(current):
+        if not mask[i]:
+            continue
+        if action == "set":
+            new[i] = stage
+        elif action == "clear":
+            new[i] = None
+        elif action == "swap":
+            new[i] = other if label == stage else stage if label == other else label
+        else:
+            position = STAGES.index(label) + offset if label in STAGES else -1
+            if 0 <= position < len(STAGES):
+                new[i] = STAGES[position]
+            else:
+                skipped += 1
+    return new, skipped
+
+
+@pytest.mark.parametrize(
+    "action, stage, other, offset",
+    [
+        ("set", "stage_2", None, 0),
+        ("set", None, None, 0),
+        ("clear", None, None, 0),
+        ("shift", None, None, 2),
+        ("shift", None, None, -1),
+        ("swap", "stage_1", "stage_3", 0),
+        ("swap", "stage_2", None, 0),
+    ],
+)
+def test_actions_match_a_per_assignment_loop(action, stage, other, offset):
+    raw_candidate, master_df = make_candidate(4)
+    current = current_stages(master_df, 4)
+    bulk = BulkStageEdit(raw_candidate, master_df["Assignment"], STAGES)
+    mask = bulk.mask(current, {"zone": ["North", "South"]})
+
+    positions, labels, skipped = bulk.apply(current, mask, action, stage, other, offset)
+
+    expected, expected_skipped = apply_loop(current, mask, action, stage, other, offset)
+    changed = [i for i in range(len(current)) if expected[i] != current[i]]
+
+    np.testing.assert_array_equal(positions, changed)
+    np.testing.assert_array_equal(labels, np.array(expected, dtype=object)[changed])
+    assert skipped == expected_skipped
+
+
+def test_unknown_action_raises(candidate):
+    raw_candidate, master_df = candidate
+    bulk = BulkStageEdit(raw_candidate, master_df["Assignment"], STAGES)
+
+    with pytest.raises(ValueError, match="Unknown bulk action"):
+        bulk.apply(master_df[SIM_STAGE], np.ones(len(master_df), dtype=bool), "move")
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from applications.load_shedding.edit_history import EditHistory
+from conftest import UFLS_STAGES
+
+N_ASSIGN = 50
+
+
+def stage_vector(rng):
+    stages = rng.choice(UFLS_STAGES[:5], N_ASSIGN).astype(object)
+    stages[rng.random(N_ASSIGN) < 0.4] = None
+    return stages
+
+
+def apply_edit(stages, edit):
+    if edit is not None:
+        positions, labels = edit
+        stages[positions] = labels
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits_undo_redo_and_goto_match_snapshots(seed):
+    rng = np.random.default_rng(seed)
+    base = stage_vector(rng)
+    history = EditHistory([f"A{i}" for i in range(N_ASSIGN)], base)
+
+    # what the simulator holds, kept in step with the (positions, labels) the history hands out
+    stages = base.copy()
+    snapshots = [base.copy()]
+
+    for _ in range(80):
+        action = rng.choice(["record", "record", "undo", "redo", "goto"])
+
+        if action == "record":
+            positions = rng.choice(N_ASSIGN, rng.integers(1, 6), replace=False)
+            labels = rng.choice(UFLS_STAGES[:5] + [None], len(positions)).astype(object)
+            if history.record("Edit", positions, labels) is not None:
+                stages[positions] = labels
+                del snapshots[history.cursor:]
+                snapshots.append(stages.copy())
+        elif action == "undo":
+            apply_edit(stages, history.undo())
+        elif action == "redo":
+            apply_edit(stages, history.redo())
+        else:
+            apply_edit(stages, history.goto(int(rng.integers(0, len(history.entries) + 1))))
+
+        assert len(snapshots) == len(history.entries) + 1
+        np.testing.assert_array_equal(stages, snapshots[history.cursor])
+        np.testing.assert_array_equal(history.decode(history.current), stages)
+        np.testing.assert_array_equal(history.codes_at(history.cursor), history.current)
+
+    for cursor, snapshot in enumerate(snapshots):
+        np.testing.assert_array_equal(history.decode(history.codes_at(cursor)), snapshot)
+
+
+def test_unchanged_cells_are_not_logged():
+    history = EditHistory(["A", "B", "C"], ["stage_1", None, "stage_2"])
+
+    assert history.record("Same", [0, 1], ["stage_1", None]) is None
+    entry = history.record("Move", [0, 1, 2], ["stage_1", "stage_3", "stage_2"])
+
+    np.testing.assert_array_equal(entry.positions, [1])
+    assert history.log()["Cells"].tolist() == [1]
+
+
+def test_new_edit_drops_the_undone_ones():
+    history = EditHistory(["A", "B"], [None, None])
+    history.record("First", [0], ["stage_1"])
+    history.record("Second", [1], ["stage_2"])
+    history.undo()
+
+    history.record("Third", [0], ["stage_3"])
+
+    assert history.log()["Edit"].tolist() == ["First", "Third"]
+    assert not history.can_redo
+    np.testing.assert_array_equal(history.decode(history.current), ["stage_3", None])
+
+
+def test_record_assignments_skips_unknown_ones():
+    history = EditHistory(["A", "B"], [None, None])
+    history.record_assignments("Edit", ["B", "Z"], ["stage_1", "stage_2"])
+
+    np.testing.assert_array_equal(history.decode(history.current), [None, "stage_1"])
+
+
+def test_checkpoint_restores_its_stages():
+    history = EditHistory(["A", "B", "C"], ["stage_1", None, None])
+    history.record("Edit", [1, 2], ["stage_2", "stage_3"])
+    history.add_checkpoint("Plan")
+    history.record("Edit", [0, 1], [None, None])
+
+    positions, labels = history.target_edit(history.checkpoint_codes("Plan"))
+
+    np.testing.assert_array_equal(positions, [0, 1])
+    np.testing.assert_array_equal(labels, ["stage_1", "stage_2"])
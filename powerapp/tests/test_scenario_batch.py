@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+from applications.load_shedding.scenario_batch import LOCAL_TRIP_CONFLICT, ScenarioBatch
+
+ZONES = ["North", "South", "East"]
+STAGES = ["stage_1", "stage_2", "stage_3", "stage_4"]
+
+
+def make_batch(seed, n_assign=30, n_trips=8):
+    rng = np.random.default_rng(seed)
+
+    load = np.zeros((n_assign, len(ZONES) + 1))
+    load[np.arange(n_assign), rng.integers(0, len(ZONES) + 1, n_assign)] = rng.uniform(1, 30, n_assign)
+
+    critical = rng.random(n_assign) < 0.2
+    warning_masks = {"Critical Sub": critical[:, None] & (np.arange(len(STAGES)) < 2)[None, :]}
+    alert_mask = critical[:, None] & (np.arange(len(STAGES)) >= 3)[None, :]
+    local_pairs = (rng.integers(0, n_assign, 15), rng.integers(0, n_trips, 15))
+
+    batch = ScenarioBatch(load, ZONES, STAGES, 100.0, warning_masks, alert_mask, local_pairs)
+    codes = np.where(
+        rng.random((12, n_assign)) < 0.6, rng.integers(0, len(STAGES), (12, n_assign)), -1
+    )
+    return batch, load, warning_masks, alert_mask, local_pairs, codes
+
+
+def evaluate_one(scenario, load, warning_masks, alert_mask, local_pairs):
+    """Totals and flag counts of one scenario, assignment by assignment."""
+    stage_mw = np.zeros(len(STAGES))
+    zone_stage_mw = np.zeros((len(ZONES), len(STAGES)))
+    for code, stage in enumerate(scenario):
+        if stage >= 0:
+            stage_mw[stage] += load[code].sum()
+            zone_stage_mw[:, stage] += load[code, :len(ZONES)]
+
+    holders = {}
+    for assign, trip in zip(*local_pairs):
+        if scenario[assign] >= 0:
+            holders.setdefault(trip, set()).add(assign)
+    local = set()
+    for trip_holders in holders.values():
+        if len(trip_holders) > 1:
+            local |= trip_holders
+
+    warning, counts = set(local), {}
+    for name, mask in warning_masks.items():
+        hits = {code for code, stage in enumerate(scenario) if stage >= 0 and mask[code, stage]}
+        counts[name] = len(hits)
+        warning |= hits
+    alert = {code for code, stage in enumerate(scenario) if stage >= 0 and alert_mask[code, stage]}
+
+    return stage_mw, zone_stage_mw, counts, len(local), len(warning - alert), len(alert)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_batch_matches_scenario_by_scenario(seed):
+    batch, load, warning_masks, alert_mask, local_pairs, codes = make_batch(seed)
+    results = batch.evaluate(codes)
+
+    for i, scenario in enumerate(codes):
+        stage_mw, zone_stage_mw, counts, local, warnings, alerts = evaluate_one(
+            scenario, load, warning_masks, alert_mask, local_pairs
+        )
+        row = results.summary.iloc[i]
+
+        np.testing.assert_allclose(results.stage_mw[i], stage_mw, atol=1e-9)
+        np.testing.assert_allclose(results.zone_stage_mw[i], zone_stage_mw, atol=1e-9)
+        # the dashboard rounds each cell before adding them up
+        np.testing.assert_allclose(results.zone_mw[i], np.round(zone_stage_mw).sum(axis=1))
+        assert row["Total (MW)"] == np.round(stage_mw).sum()
+        assert row["Achievement (%)"] == pytest.approx(np.round(stage_mw).sum() / 100.0 * 100)
+        assert row["Assigned"] == (scenario >= 0).sum()
+        for zone_id, zone in enumerate(ZONES):
+            assert row[f"{zone} (MW)"] == results.zone_mw[i, zone_id]
+
+        assert row["Critical Sub"] == counts["Critical Sub"]
+        assert row[LOCAL_TRIP_CONFLICT] == local
+        assert row["Warnings"] == warnings
+        assert row["Alerts"] == alerts
+
+
+def test_single_scenario_matches_its_batch_row():
+    batch, *_, codes = make_batch(0)
+    together = batch.evaluate(codes)
+    alone = batch.evaluate(codes[5])
+
+    np.testing.assert_allclose(alone.zone_stage_mw[0], together.zone_stage_mw[5])
+    pd.testing.assert_series_equal(
+        alone.summary.drop(columns="Scenario").iloc[0],
+        together.summary.drop(columns="Scenario").iloc[5],
+        check_names=False,
+    )
+
+
+def test_codes_reads_stage_labels():
+    batch, *_ = make_batch(0, n_assign=3)
+    frame = pd.DataFrame(
+        {
+            "Base": ["stage_1", None, "stage_4"],
+            "Other": ["stage_9", "stage_2", np.nan],
+        }
+    )
+
+    np.testing.assert_array_equal(batch.codes(frame), [[0, -1, 3], [-1, 1, -1]])
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from applications.load_shedding.session_store import SessionStore, object_nbytes
+
+
+def make_store(budget, measured=None):
+    """Store of lists whose size is their length; the compact form keeps the first item."""
+    def measure(state):
+        if measured is not None:
+            measured.append(state)
+        return len(state)
+
+    return SessionStore(budget, compact=lambda live: live[:1], measure=measure)
+
+
+def states(store):
+    return dict(zip(store.usage()["Key"], store.usage()["State"]))
+
+
+def test_least_recently_used_entries_are_compacted_first():
+    store = make_store(10)
+    for key in "abc":
+        store.put(key, [key] * 4)
+    store.get("a")
+
+    released = store.evict(keep="c")
+
+    assert released == ["b"]
+    assert states(store) == {"b": "compact", "a": "live", "c": "live"}
+    assert store.get("b").compact == ["b"]
+    assert store.total_bytes == 9
+
+
+def test_compact_entries_are_dropped_once_compacting_is_not_enough():
+    store = make_store(4)
+    for key in "abc":
+        store.put(key, [key] * 4)
+
+    assert store.evict(keep="c") == ["a", "b"]
+    assert "a" not in store and "b" not in store
+    assert store.total_bytes == 4
+
+
+def test_kept_key_is_never_released():
+    store = make_store(1)
+    store.put("a", ["a"] * 4)
+
+    assert store.evict(keep="a") == []
+    assert store.get("a").live == ["a"] * 4
+
+
+def test_get_does_not_measure_again():
+    measured = []
+    store = make_store(100, measured)
+    store.put("a", ["a"])
+    store.get("a").live.append("b")
+    store.get("a")
+
+    assert len(measured) == 1
+    assert store.total_bytes == 1
+
+    store.refresh("a")
+    assert store.total_bytes == 2
+
+
+def test_put_over_a_compact_entry_makes_it_live_again():
+    store = make_store(100)
+    store.put("a", ["a", "a"])
+    store.compact("a")
+    assert store.live_items() == []
+
+    store.put("a", ["x", "y", "z"])
+
+    assert store.live_items() == [("a", ["x", "y", "z"])]
+    assert store.get("a").compact is None
+    assert store.total_bytes == 3
+
+
+def test_shared_frames_are_counted_once():
+    frame = pd.DataFrame({"x": np.arange(1_000)})
+    size = object_nbytes(frame)
+
+    assert object_nbytes({"a": frame, "b": [frame, frame]}) == size
+    assert object_nbytes({"a": frame}, seen={id(frame)}) == 0
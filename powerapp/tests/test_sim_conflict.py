@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import pytest
+from pages.load_shedding.tab4a_sim_conflict import ConflictEngine, conflict_assignment
+from conftest import SIM_STAGE, UFLS_STAGES, UVLS_STAGES, make_candidate
+
+LS_OBJ = SimpleNamespace(LOADSHED_SCHEME=["UFLS", "UVLS", "EMLS"])
+FLAG_COLS = ["Assignment", SIM_STAGE, "Flag", "conflict_assignment"]
+
+
+def expected_flags(master_df, frame, raw_candidate, base_scheme):
+    """conflict_assignment on a fresh copy of master_df holding the stages of 'frame'."""
+    fresh = master_df.copy()
+    fresh[SIM_STAGE] = frame[SIM_STAGE].to_numpy()
+    return conflict_assignment(fresh, raw_candidate, LS_OBJ, base_scheme, SIM_STAGE)
+
+
+def assert_same_flags(frame, expected):
+    pd.testing.assert_frame_equal(
+        frame[FLAG_COLS].reset_index(drop=True),
+        expected[FLAG_COLS].reset_index(drop=True),
+    )
+    assert list(frame.columns) == list(expected.columns)
+
+
+@pytest.mark.parametrize("base_scheme", ["UFLS_2024", "UVLS_2024"])
+def test_full_evaluation_matches_conflict_assignment(base_scheme):
+    raw_candidate, master_df = make_candidate(1)
+    master_df[SIM_STAGE] = master_df[base_scheme]
+
+    engine = ConflictEngine(master_df, raw_candidate, LS_OBJ.LOADSHED_SCHEME, base_scheme, SIM_STAGE)
+    frame = engine.apply(master_df.copy())
+
+    assert_same_flags(frame, expected_flags(master_df, master_df, raw_candidate, base_scheme))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("base_scheme, stages", [("UFLS_2024", UFLS_STAGES), ("UVLS_2024", UVLS_STAGES)])
+def test_incremental_edits_match_conflict_assignment(seed, base_scheme, stages):
+    raw_candidate, master_df = make_candidate(seed)
+    master_df[SIM_STAGE] = master_df[base_scheme]
+    rng = np.random.default_rng(100 + seed)
+
+    engine = ConflictEngine(master_df, raw_candidate, LS_OBJ.LOADSHED_SCHEME, base_scheme, SIM_STAGE)
+    frame = engine.apply(master_df.copy())
+
+    for _ in range(30):
+        rows = rng.choice(len(frame), rng.integers(1, 5), replace=False)
+        new = rng.choice(stages + [None], len(rows)).astype(object)
+
+        # the simulator edits a copy of the last frame and passes the edited assignments
+        frame = frame.copy()
+        frame.iloc[rows, frame.columns.get_loc(SIM_STAGE)] = new
+        frame = engine.apply(frame, frame["Assignment"].iloc[rows].tolist())
+
+        assert_same_flags(frame, expected_flags(master_df, frame, raw_candidate, base_scheme))
+
+
+def test_unchanged_frame_is_returned_as_is(candidate):
+    raw_candidate, master_df = candidate
+    engine = ConflictEngine(master_df, raw_candidate, LS_OBJ.LOADSHED_SCHEME, "UFLS_2024", SIM_STAGE)
+    frame = engine.apply(master_df.copy())
+
+    assert engine.apply(frame) is frame
+    assert engine.apply(frame, []) is frame
+
+
+def test_scheme_outside_loadshed_schemes_is_left_alone(candidate):
+    raw_candidate, master_df = candidate
+    engine = ConflictEngine(master_df, raw_candidate, ["UVLS"], "UFLS_2024", SIM_STAGE)
+    frame = master_df.copy()
+
+    assert engine.apply(frame) is frame
+    assert "Flag" not in frame.columns
@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+from applications.load_shedding.stage_optimizer import LOCAL_TRIP, allocate_stages, rebalance_stage
+
+N_ZONES = 3
+N_STAGES = 5
+
+
+def make_problem(seed, n_assign=40, n_trips=12):
+    rng = np.random.default_rng(seed)
+
+    # most assignments sit in one zone, the last column holds rows without a zone
+    load = np.zeros((n_assign, N_ZONES + 1))
+    load[np.arange(n_assign), rng.integers(0, N_ZONES + 1, n_assign)] = rng.uniform(1, 30, n_assign)
+    spread = rng.random(n_assign) < 0.2
+    load[spread, rng.integers(0, N_ZONES, spread.sum())] += rng.uniform(1, 10, spread.sum())
+
+    zone_targets = rng.uniform(5, 60, (N_ZONES, N_STAGES))
+    base = np.where(rng.random(n_assign) < 0.6, rng.integers(0, N_STAGES, n_assign), -1)
+
+    critical = rng.random(n_assign) < 0.15
+    banned = {"Critical Subs": critical[:, None] & (np.arange(N_STAGES) >= 3)[None, :]}
+
+    n_pairs = n_assign // 2
+    local_pairs = (rng.integers(0, n_assign, n_pairs), rng.integers(0, n_trips, n_pairs))
+
+    return load, zone_targets, base, banned, local_pairs
+
+
+def objective(load, zone_targets, codes, base, churn_weight):
+    mw = np.zeros((load.shape[1], N_STAGES))
+    for code, stage in enumerate(codes):
+        if stage >= 0:
+            mw[:, stage] += load[code]
+    error = np.abs(mw[:N_ZONES] - zone_targets).sum() + np.abs(mw.sum(axis=0) - zone_targets.sum(axis=0)).sum()
+    return error + churn_weight * (codes != base).sum()
+
+
+def trip_holders(codes, local_pairs):
+    pair_assign, pair_trip = local_pairs
+    holders = {}
+    for assign, trip in zip(pair_assign, pair_trip):
+        if codes[assign] >= 0:
+            holders.setdefault(trip, set()).add(assign)
+    return holders
+
+
+def feasible_moves(codes, banned, local_pairs):
+    """(assignment, stage) moves the constraints allow, stage -1 taking the assignment out."""
+    holders = trip_holders(codes, local_pairs)
+    blocked = set()
+    for assign, trip in zip(*local_pairs):
+        if holders.get(trip, set()) - {assign}:
+            blocked.add(assign)
+
+    for code, current in enumerate(codes):
+        for stage in range(-1, N_STAGES):
+            if stage == current:
+                continue
+            if stage >= 0 and any(mask[code, stage] for mask in banned.values()):
+                continue
+            if stage >= 0 and current < 0 and code in blocked:
+                continue
+            yield code, stage
+
+
+def assert_consistent(allocation, load, zone_targets, reference, churn_weight):
+    mw = np.zeros((load.shape[1], N_STAGES))
+    for code, stage in enumerate(allocation.codes):
+        if stage >= 0:
+            mw[:, stage] += load[code]
+
+    np.testing.assert_allclose(allocation.mw, mw[:N_ZONES], atol=1e-9)
+    np.testing.assert_allclose(allocation.stage_mw, mw.sum(axis=0), atol=1e-9)
+    assert allocation.objective == pytest.approx(
+        objective(load, zone_targets, allocation.codes, reference, churn_weight)
+    )
+    assert allocation.churn == (allocation.codes != reference).sum()
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_allocation_is_consistent_and_feasible(seed):
+    load, zone_targets, base, banned, local_pairs = make_problem(seed)
+    allocation = allocate_stages(load, zone_targets, base, banned, local_pairs, churn_weight=2.0)
+
+    assert_consistent(allocation, load, zone_targets, base, 2.0)
+
+    staged = allocation.codes >= 0
+    assert not banned["Critical Subs"][staged, allocation.codes[staged]].any()
+    assert all(len(holders) == 1 for holders in trip_holders(allocation.codes, local_pairs).values())
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_allocation_is_a_local_optimum(seed):
+    load, zone_targets, base, banned, local_pairs = make_problem(seed)
+    allocation = allocate_stages(load, zone_targets, base, banned, local_pairs, churn_weight=2.0)
+    best = objective(load, zone_targets, allocation.codes, base, 2.0)
+
+    # the incremental descent stops only when no single feasible move helps
+    for code, stage in feasible_moves(allocation.codes, banned, local_pairs):
+        moved = allocation.codes.copy()
+        moved[code] = stage
+        assert objective(load, zone_targets, moved, base, 2.0) >= best - 1e-6
+
+
+def test_allocation_keeps_a_base_on_target():
+    load, _, base, _, _ = make_problem(0)
+
+    # every load zoned, so the stage totals of the targets are the ones of the base too
+    load[:, 0] += load[:, N_ZONES]
+    load[:, N_ZONES] = 0
+    mw = np.zeros((N_ZONES + 1, N_STAGES))
+    for code, stage in enumerate(base):
+        if stage >= 0:
+            mw[:, stage] += load[code]
+
+    allocation = allocate_stages(load, mw[:N_ZONES], base)
+
+    np.testing.assert_array_equal(allocation.codes, base)
+    assert allocation.churn == 0
+    assert allocation.objective == pytest.approx(0)
+
+
+def test_binding_lists_every_constraint():
+    load, zone_targets, base, banned, local_pairs = make_problem(3)
+    allocation = allocate_stages(load, zone_targets, base, banned, local_pairs)
+
+    assert allocation.binding["Constraint"].tolist() == ["Critical Subs", LOCAL_TRIP]
+    assert (allocation.binding["Blocked Moves"] >= 0).all()
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_rebalance_moves_only_the_cell(seed):
+    load, zone_targets, base, banned, local_pairs = make_problem(seed)
+    codes = allocate_stages(load, zone_targets, base, banned, local_pairs).codes
+    stage_id, zone_id = seed % N_STAGES, seed % N_ZONES
+
+    # push the cell off target so there is something to rebalance
+    targets = zone_targets.copy()
+    targets[zone_id, stage_id] += 40
+
+    allocation = rebalance_stage(load, targets, codes, stage_id, zone_id, banned, local_pairs, max_moves=6)
+    assert_consistent(allocation, load, targets, codes, 1.0)
+
+    changed = np.flatnonzero(allocation.codes != codes)
+    assert allocation.moves <= 6
+    assert len(changed) == allocation.moves
+    assert (load[changed, zone_id] > 0).all()
+    assert ((codes[changed] == stage_id) | (allocation.codes[changed] == stage_id)).all()
+
+    staged = allocation.codes >= 0
+    assert not banned["Critical Subs"][staged, allocation.codes[staged]].any()
+    assert all(len(holders) == 1 for holders in trip_holders(allocation.codes, local_pairs).values())
+    assert allocation.objective <= objective(load, targets, codes, codes, 1.0) + 1e-6
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from applications.load_shedding.stage_quantum import StageQuantum
+from conftest import SIM_STAGE, UFLS_STAGES, make_candidate
+
+
+def staged_rows(raw_candidate, frame):
+    """Candidate rows with the simulated stage of their assignment, as the dashboard merged them."""
+    stages = frame.set_index("Assignment")[SIM_STAGE]
+    rows = raw_candidate.copy()
+    rows[SIM_STAGE] = rows["assignment_id"].map(stages)
+    return rows
+
+
+def assert_matches_groupby(quantum, raw_candidate, frame):
+    rows = staged_rows(raw_candidate, frame)
+
+    by_stage = rows.groupby(SIM_STAGE, as_index=False)["Load (MW)"].sum()
+    pd.testing.assert_frame_equal(quantum.by_stage(), by_stage, check_exact=False)
+
+    by_zone_stage = rows.groupby(["zone", SIM_STAGE], as_index=False)["Load (MW)"].sum()
+    pd.testing.assert_frame_equal(quantum.by_zone_stage(), by_zone_stage, check_exact=False)
+
+    zoned = rows[rows["zone"].notna()]
+    for stage in UFLS_STAGES:
+        expected = zoned.loc[zoned[SIM_STAGE] == stage, "Load (MW)"].sum()
+        assert quantum.stage_mw(stage) == pytest.approx(expected)
+
+        for zone in quantum.zones:
+            cell = zoned.loc[(zoned[SIM_STAGE] == stage) & (zoned["zone"] == zone), "Load (MW)"].sum()
+            assert quantum.zone_stage_mw(zone, stage) == pytest.approx(cell)
+
+
+def test_full_evaluation_matches_groupby(candidate):
+    raw_candidate, master_df = candidate
+    quantum = StageQuantum(raw_candidate, master_df["Assignment"], SIM_STAGE).apply(master_df)
+
+    assert_matches_groupby(quantum, raw_candidate, master_df)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_edits_match_groupby(seed):
+    raw_candidate, master_df = make_candidate(seed)
+    rng = np.random.default_rng(200 + seed)
+
+    quantum = StageQuantum(raw_candidate, master_df["Assignment"], SIM_STAGE)
+    frame = master_df.copy()
+    quantum.apply(frame)
+
+    for _ in range(40):
+        rows = rng.choice(len(frame), rng.integers(1, 6), replace=False)
+        frame = frame.copy()
+        frame.iloc[rows, frame.columns.get_loc(SIM_STAGE)] = rng.choice(
+            UFLS_STAGES + [None], len(rows)
+        ).astype(object)
+        quantum.apply(frame, frame["Assignment"].iloc[rows].tolist())
+
+        assert_matches_groupby(quantum, raw_candidate, frame)
+
+
+def test_emptied_stage_drops_out(candidate):
+    raw_candidate, master_df = candidate
+    frame = master_df.copy()
+    frame[SIM_STAGE] = None
+    frame.loc[:2, SIM_STAGE] = "stage_1"
+
+    quantum = StageQuantum(raw_candidate, master_df["Assignment"], SIM_STAGE).apply(frame)
+    frame = frame.copy()
+    frame.loc[:2, SIM_STAGE] = None
+    quantum.apply(frame, frame["Assignment"].iloc[:3].tolist())
+
+    assert quantum.by_stage().empty
+    assert quantum.by_zone_stage().empty
+    # exactly zero, not the residue of the subtraction
+    assert quantum.stage_mw("stage_1") == 0.0
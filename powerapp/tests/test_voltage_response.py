@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from applications.load_shedding.voltage_response import UVLSResponse
+
+SETTINGS = pd.DataFrame(
+    {"stage_1": [0.8, 1.0], "stage_2": [0.85, 3.0]},
+    index=["voltage", "delay"],
+)
+
+
+def held_trip_time(times, voltage, threshold, pickup):
+    """First trip of a step trace (each sample holding until the next), walked sample by sample."""
+    run_start = None
+    for i, t in enumerate(times):
+        if voltage[i] > threshold:
+            run_start = None
+            continue
+        if run_start is None:
+            run_start = t
+        run_end = times[i + 1] if i + 1 < len(times) else t
+        if run_end - run_start >= pickup:
+            return run_start + pickup
+    return np.nan
+
+
+def test_pickup_running_out_between_samples():
+    response = UVLSResponse(SETTINGS)
+
+    # below the threshold over [0, 3), back above at the next sample
+    trip = response.trip_times([0, 1, 3], np.array([[0.7, 0.7, 0.95]]), np.array([0.8]), np.array([1.5]))
+
+    assert trip[0] == pytest.approx(1.5)
+
+
+def test_run_shorter_than_pickup_holds():
+    response = UVLSResponse(SETTINGS)
+    trip = response.trip_times([0, 1, 2, 3], np.array([[0.7, 0.95, 0.7, 0.7]]), np.array([0.8]), np.array([1.5]))
+
+    assert np.isnan(trip[0])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_trip_times_match_a_sample_walk(seed):
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.uniform(0.05, 2.0, 40))
+    voltage = rng.uniform(0.7, 1.0, (12, 40))
+    threshold = rng.uniform(0.75, 0.9, 12)
+    pickup = rng.uniform(0.0, 4.0, 12)
+
+    trips = UVLSResponse(SETTINGS).trip_times(times, voltage, threshold, pickup)
+
+    for row in range(12):
+        expected = held_trip_time(times, voltage[row], threshold[row], pickup[row])
+        np.testing.assert_allclose(trips[row], expected)
+
+
+def test_assignment_over_several_groups_trips_with_the_first():
+    response = UVLSResponse(SETTINGS, breaker_time=0.0)
+    times = np.arange(0.0, 10.0, 0.5)
+    group_voltage = np.ones((2, len(times)))
+    group_voltage[0, times >= 4] = 0.7
+    group_voltage[1, times >= 1] = 0.7
+
+    # assignment 0 sits in both groups, 1 only in the first, 2 has no stage
+    group_pairs = ([0, 0, 1, 2], [0, 1, 0, 1])
+    results = response.simulate(times, group_voltage, group_pairs, [0, 0, -1], [10.0, 20.0, 5.0])
+
+    np.testing.assert_allclose(results.trip_time, [2.0, 5.0, np.nan])
+    np.testing.assert_allclose(results.shed_mw[0, times == 2.0], [10.0])
+    np.testing.assert_allclose(results.shed_mw[0, -1], 30.0)
+    assert results.summary()["Tripped"].tolist() == [2, 0]